@@ -1,5 +1,11 @@
 import os
+import sys
+
+import click
+from flask.cli import ScriptInfo
+
 from app import create_app
+from app.services import bulk_service
 
 app = create_app(os.getenv("FLASK_CONFIG") or "default")
 
@@ -22,5 +28,33 @@ def test():
         exit(1)
 
 
+@app.cli.command()
+@click.argument("requests", type=click.File("r"))
+@click.argument("results", type=click.File("w"), default="-")
+@click.option(
+    "--workers", type=int, help="number of worker threads, default BULK_WORKERS"
+)
+def generate(requests, results, workers):
+    """Generate the circuits of an NDJSON request file.
+
+    Every line of REQUESTS is an object with the fields type (e.g. algorithms/qft),
+    request and an optional id, as for POST /bulk. One result per line is written
+    to RESULTS (default stdout) as soon as it is generated.
+    """
+    if workers is not None:
+        bulk_service.runner.configure(workers, app.config["BULK_MAX_PENDING"])
+    errors = bulk_service.runner.errors
+    for line in bulk_service.ndjson_results(app, requests):
+        results.write(line)
+    failed = bulk_service.runner.errors - errors
+    if failed:
+        click.echo(f"{failed} request(s) failed", err=True)
+
+
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5073)
+    if len(sys.argv) > 1:
+        # "flask" resolves the app package instead of this module, so its commands run as
+        # python app.py test or python app.py generate requests.ndjson results.ndjson
+        app.cli.main(obj=ScriptInfo(create_app=lambda: app))
+    else:
+        app.run(host="0.0.0.0", port=5073)
@@ -1,6 +1,16 @@
 from flask import Flask
 from config import config
-from app.controller import register_blueprints
+from app import admission, compression
+from app.controller import register_blueprints, MODULES
+from app.services import (
+    builder_pool,
+    bulk_service,
+    generation_cache,
+    job_service,
+    persistent_cache,
+    visualization_service,
+)
+from app.services.algorithms import qaoa_templates
 from flask_smorest import Api
 
 
@@ -8,9 +18,19 @@ def create_app(config_name="default"):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
+    persistent_cache.init_app(app)
+    visualization_service.init_app(app)
+    builder_pool.init_app(app)
+    generation_cache.init_app(app)
+    qaoa_templates.init_app(app)
+    bulk_service.init_app(app)
+    job_service.init_app(app)
 
     api = Api(app)
     register_blueprints(api)
+    compression.init_app(app, [module.blp.name for module in MODULES])
+    # bulk and job requests are limited by their own worker pools, monitoring stays available
+    admission.init_app(app, ["encodings", "algorithms", "visualization"])
 
     @app.route("/")
     def heartbeat():
@@ -0,0 +1,201 @@
+import math
+import time
+from threading import Condition, Lock
+
+from flask import g, jsonify, request
+
+from app.services import metrics_service
+
+# moving average weight of the latest request duration
+DURATION_SMOOTHING = 0.2
+
+
+class Limiter:
+    """
+    Admits at most max_concurrent requests at once. Further requests wait in a queue of at most
+    max_queued entries for up to max_wait seconds; requests that find the queue full are rejected
+    with 429, requests that waited too long with 503.
+    """
+
+    def __init__(self, max_concurrent, max_queued, max_wait):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+        self._condition = Condition()
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_wait_timeout = 0
+        self.average_seconds = None
+
+    def acquire(self):
+        """
+        :return: None if the request was admitted, else the status code to reject it with
+        """
+        with self._condition:
+            if self.active < self.max_concurrent and self.queued == 0:
+                self.active += 1
+                self.admitted += 1
+                return None
+            if self.queued >= self.max_queued:
+                self.rejected_queue_full += 1
+                return 429
+            self.queued += 1
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while self.active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected_wait_timeout += 1
+                        return 503
+                    self._condition.wait(remaining)
+                self.active += 1
+                self.admitted += 1
+                return None
+            finally:
+                self.queued -= 1
+
+    def release(self, seconds):
+        """
+        :param seconds: duration of the finished request
+        """
+        with self._condition:
+            self.active -= 1
+            if self.average_seconds is None:
+                self.average_seconds = seconds
+            else:
+                self.average_seconds += DURATION_SMOOTHING * (
+                    seconds - self.average_seconds
+                )
+            self._condition.notify()
+
+    def retry_after(self):
+        """
+        :return: seconds after which the queue has likely drained, at least 1
+        """
+        with self._condition:
+            average = self.average_seconds or 1
+            backlog = self.queued + self.active
+            return max(1, math.ceil(average * backlog / self.max_concurrent))
+
+    def stats(self):
+        with self._condition:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queued": self.max_queued,
+                "active": self.active,
+                "queue_depth": self.queued,
+                "admitted": self.admitted,
+                "rejected_queue_full": self.rejected_queue_full,
+                "rejected_wait_timeout": self.rejected_wait_timeout,
+                "average_seconds": (
+                    None
+                    if self.average_seconds is None
+                    else round(self.average_seconds, 3)
+                ),
+            }
+
+
+class AdmissionControl:
+    """Limiters of all endpoints, created on first use with the limits of the endpoint's class"""
+
+    def __init__(self):
+        self._limiters = {}
+        self._lock = Lock()
+        self.limits = {}
+        self.endpoints = {}
+
+    def configure(self, limits, endpoints):
+        """
+        :param limits: limits per class, dicts with max_concurrent, max_queued and max_wait
+        :param endpoints: class per URL rule, rules not listed belong to the class "default"
+        """
+        with self._lock:
+            self.limits = limits
+            self.endpoints = endpoints
+            self._limiters = {}
+
+    def limiter(self, rule):
+        with self._lock:
+            limiter = self._limiters.get(rule)
+            if limiter is None:
+                limits = self.limits[self.endpoints.get(rule, "default")]
+                limiter = self._limiters[rule] = Limiter(**limits)
+            return limiter
+
+    def stats(self):
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {
+            rule: dict(
+                limiter.stats(), **{"class": self.endpoints.get(rule, "default")}
+            )
+            for rule, limiter in limiters.items()
+        }
+
+
+admission_control = AdmissionControl()
+metrics_service.register("admission", admission_control.stats)
+
+
+def _reject(status, retry_after):
+    if status == 429:
+        error, message = "too many requests", "Too many requests are waiting"
+    else:
+        error, message = "service unavailable", "Timed out waiting for capacity"
+    response = jsonify(
+        {
+            "code": status,
+            "error": error,
+            "message": f"{message} for this endpoint, retry after {retry_after} seconds.",
+        }
+    )
+    response.status_code = status
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+def init_app(app, blueprint_names):
+    """
+    Limits the number of concurrent requests per endpoint of the given blueprints, see Limiter.
+    Each endpoint gets the limits of its class in ADMISSION_LIMITS, the classes of the endpoints
+    are configured by ADMISSION_ENDPOINTS.
+    :param app: Flask application
+    :param blueprint_names: names of the blueprints whose endpoints are limited
+    """
+    blueprint_names = set(blueprint_names)
+    admission_control.configure(
+        app.config["ADMISSION_LIMITS"], app.config["ADMISSION_ENDPOINTS"]
+    )
+
+    @app.before_request
+    def admit():
+        if (
+            not app.config["ADMISSION_CONTROL_ENABLED"]
+            or request.blueprint not in blueprint_names
+            or request.url_rule is None
+        ):
+            return None
+        limiter = admission_control.limiter(request.url_rule.rule)
+        status = limiter.acquire()
+        if status is not None:
+            return _reject(status, limiter.retry_after())
+        g.admission = (limiter, time.monotonic())
+        return None
+
+    @app.after_request
+    def release_after_stream(response):
+        # streamed responses are generated while they are sent, after the request was torn down,
+        # so their slot is released once the stream has been closed
+        if response.is_streamed and "admission" in g:
+            limiter, start = g.pop("admission")
+            response.call_on_close(lambda: limiter.release(time.monotonic() - start))
+        return response
+
+    @app.teardown_request
+    def release(exception):
+        admission = g.pop("admission", None)
+        if admission is not None:
+            limiter, start = admission
+            limiter.release(time.monotonic() - start)
@@ -0,0 +1,68 @@
+import gzip
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli encoding is only offered if the package is installed
+    brotli = None
+
+
+def available_encodings():
+    """Content codings in order of preference"""
+    encodings = ["gzip", "deflate"]
+    if brotli is not None:
+        encodings.insert(0, "br")
+    return encodings
+
+
+def compress(data, encoding, level, brotli_quality):
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    return zlib.compress(data, level)
+
+
+def init_app(app, blueprint_names):
+    """
+    Compresses responses of the given blueprints if the client accepts gzip, deflate or br
+    and the body is at least COMPRESSION_MIN_SIZE bytes large
+    :param app: Flask application
+    :param blueprint_names: names of the blueprints whose responses are compressed
+    """
+    blueprint_names = set(blueprint_names)
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            not app.config["COMPRESSION_ENABLED"]
+            or request.blueprint not in blueprint_names
+            or response.direct_passthrough
+            or response.is_streamed
+            or not 200 <= response.status_code < 300
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+
+        encoding = request.accept_encodings.best_match(available_encodings())
+        data = response.get_data()
+        if encoding is None or len(data) < app.config["COMPRESSION_MIN_SIZE"]:
+            return response
+
+        response.set_data(
+            compress(
+                data,
+                encoding,
+                app.config["COMPRESSION_LEVEL"],
+                app.config["COMPRESSION_BROTLI_QUALITY"],
+            )
+        )
+        response.headers["Content-Encoding"] = encoding
+        # representations with a different content coding need a different entity tag
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(etag + "-" + encoding, weak)
+        return response
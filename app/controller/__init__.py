@@ -1,6 +1,6 @@
-from app.controller import encoding, algorithms
+from app.controller import encoding, algorithms, visualization, monitoring, bulk, jobs
 
-MODULES = (encoding, algorithms)
+MODULES = (encoding, algorithms, visualization, monitoring, bulk, jobs)
 
 
 def register_blueprints(api):
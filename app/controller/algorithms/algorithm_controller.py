@@ -1,8 +1,10 @@
 from flask_smorest import Blueprint
-from qiskit import QuantumCircuit
 
-from app.helpermethods import visualizeQasm
-from app.services import algorithm_service
+from app.request_etag import request_etag
+
+from app.services import algorithm_service, visualization_service
+from app.services.circuit_serialization import load_circuit
+from app.services.helper_service import bad_request
 from app.model.circuit_response import (
     CircuitResponseSchema,
     HHLResponseSchema,
@@ -13,6 +15,7 @@ from app.model.circuit_response import (
     GroverResponseSchema,
     CircuitDrawResponseSchema,
     CircuitDrawResponse,
+    CircuitSweepResponseSchema,
 )
 from app.model.algorithm_request import (
     HHLAlgorithmRequestSchema,
@@ -37,6 +40,10 @@ from app.model.algorithm_request import (
     CircuitDrawRequest,
     ShorDiscreteLogAlgorithmRequest,
     ShorDiscreteLogAlgorithmRequestSchema,
+    MaxCutQAOASweepRequest,
+    MaxCutQAOASweepRequestSchema,
+    QAOASweepAlgorithmRequest,
+    QAOASweepAlgorithmRequestSchema,
 )
 
 blp = Blueprint(
@@ -54,6 +61,7 @@ blp = Blueprint(
         matrix=[[1.5, 0.5], [0.5, 1.5]], vector=[0, 1], circuit_format="openqasm2"
     ),
 )
+@request_etag
 @blp.response(200, HHLResponseSchema)
 def encoding(json: HHLAlgorithmRequest):
     if json:
@@ -71,17 +79,38 @@ def encoding(json: HHLAlgorithmRequest):
         circuit_format="openqasm2",
     ),
 )
+@request_etag
 @blp.response(200, QAOAResponseSchema)
 def encoding(json: QAOAAlgorithmRequest):
     if json:
         return algorithm_service.generate_qaoa_circuit(QAOAAlgorithmRequest(**json))
 
 
+@blp.route("/qaoa/pauliOperator/sweep", methods=["POST"])
+@blp.arguments(
+    QAOASweepAlgorithmRequestSchema,
+    example=dict(
+        pauli_op_string="0.5 * ((I^Z^Z) + (Z^I^Z) + (Z^Z^I))",
+        gammas=[[1.0, 1.2], [1.1, 1.3]],
+        betas=[[0.4, 0.7], [0.5, 0.8]],
+        output="compact",
+        circuit_format="openqasm3",
+    ),
+    description="Returns the circuits of many angle sets of one problem, one row of gammas and betas per angle set.",
+)
+@request_etag
+@blp.response(200, CircuitSweepResponseSchema)
+def get_qaoa_sweep(json: dict):
+    if json:
+        return algorithm_service.generate_qaoa_sweep(QAOASweepAlgorithmRequest(**json))
+
+
 @blp.route("/qft", methods=["POST"])
 @blp.arguments(
     QFTAlgorithmRequestSchema,
     example=dict(n_qubits=4, inverse=False, barriers=True, circuit_format="openqasm2"),
 )
+@request_etag
 @blp.response(200, QFTResponseSchema)
 def encoding(json: QFTAlgorithmRequest):
     if json:
@@ -97,6 +126,7 @@ def encoding(json: QFTAlgorithmRequest):
         circuit_format="openqasm2",
     ),
 )
+@request_etag
 @blp.response(200, QPEResponseSchema)
 def encoding(json: QPEAlgorithmRequest):
     if json:
@@ -112,6 +142,7 @@ def encoding(json: QPEAlgorithmRequest):
         circuit_format="openqasm2",
     ),
 )
+@request_etag
 @blp.response(200, VQEResponseSchema)
 def encoding(json: VQEAlgorithmRequest):
     if json:
@@ -130,6 +161,7 @@ def encoding(json: VQEAlgorithmRequest):
         circuit_format="openqasm2",
     ),
 )
+@request_etag
 @blp.response(200, GroverResponseSchema)
 def encoding(json: GroverAlgorithmRequest):
     if json:
@@ -148,6 +180,7 @@ def encoding(json: GroverAlgorithmRequest):
     ),
     description="Currently, only 3x3 and 4x4 matrices supported.",
 )
+@request_etag
 @blp.response(200, CircuitResponseSchema)
 def encoding(json):
     if json:
@@ -157,7 +190,6 @@ def encoding(json):
 
 
 @blp.route("/qaoa/maxcut", methods=["POST"])
-@blp.etag
 @blp.arguments(
     MaxCutQAOAAlgorithmRequestSchema,
     example=dict(
@@ -169,6 +201,7 @@ def encoding(json):
         circuit_format="openqasm2",
     ),
 )
+@request_etag
 @blp.response(200, CircuitResponseSchema)
 def get_maxcut_circuit(json: dict):
     if json:
@@ -177,8 +210,28 @@ def get_maxcut_circuit(json: dict):
         )
 
 
+@blp.route("/qaoa/maxcut/sweep", methods=["POST"])
+@blp.arguments(
+    MaxCutQAOASweepRequestSchema,
+    example=dict(
+        adj_matrix=[[0, 1, 1, 0], [1, 0, 1, 1], [1, 1, 0, 1], [0, 1, 1, 0]],
+        gammas=[[0.5], [1.0], [1.5]],
+        betas=[[0.25], [0.25], [0.25]],
+        output="circuits",
+        circuit_format="openqasm2",
+    ),
+    description="Returns the circuits of many angle sets of one problem, one row of gammas and betas per angle set.",
+)
+@request_etag
+@blp.response(200, CircuitSweepResponseSchema)
+def get_maxcut_sweep(json: dict):
+    if json:
+        return algorithm_service.generate_max_cut_qaoa_sweep(
+            MaxCutQAOASweepRequest(**json)
+        )
+
+
 @blp.route("/qaoa/knapsack", methods=["POST"])
-@blp.etag
 @blp.arguments(
     KnapsackQAOAAlgorithmRequestSchema,
     example=dict(
@@ -194,6 +247,7 @@ def get_maxcut_circuit(json: dict):
         circuit_format="openqasm2",
     ),
 )
+@request_etag
 @blp.response(200, CircuitResponseSchema)
 def get_knapsack_circuit(json: KnapsackQAOAAlgorithmRequest):
     if json:
@@ -203,7 +257,6 @@ def get_knapsack_circuit(json: KnapsackQAOAAlgorithmRequest):
 
 
 @blp.route("/shor/discreteLog", methods=["POST"])
-@blp.etag
 @blp.arguments(
     ShorDiscreteLogAlgorithmRequestSchema,
     example=dict(b=2, g=5, p=7),
@@ -213,6 +266,7 @@ def get_knapsack_circuit(json: KnapsackQAOAAlgorithmRequest):
         p: Prime module
         n: The size of the top register, if not given it will be inferred from the module p""",
 )
+@request_etag
 @blp.response(200, CircuitResponseSchema)
 def get_shor_circuit(json: ShorDiscreteLogAlgorithmRequest):
     if json:
@@ -228,13 +282,20 @@ def get_shor_circuit(json: ShorDiscreteLogAlgorithmRequest):
         circuit='OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[4];\ncreg meas[4];\nh q[0];\nh q[1];\nrzz(1.0) q[0],q[1];\nh q[2];\nrzz(1.0) q[0],q[2];\nrx(2.0) q[0];\nrzz(1.0) q[1],q[2];\nh q[3];\nrzz(1.0) q[1],q[3];\nrx(2.0) q[1];\nrzz(1.0) q[2],q[3];\nrx(2.0) q[2];\nrx(2.0) q[3];\nbarrier q[0],q[1],q[2],q[3];\nmeasure q[0] -> meas[0];\nmeasure q[1] -> meas[1];\nmeasure q[2] -> meas[2];\nmeasure q[3] -> meas[3];\n',
         circuit_format="openqasm2",
     ),
-    description="QASM 2.0 String.",
+    description="QASM 2.0 String or base64 encoded QPY.",
 )
+@request_etag
 @blp.response(200, CircuitDrawResponseSchema)
 def encoding(json):
     if json:
+        request = CircuitDrawRequest(**json)
+        try:
+            circuit = load_circuit(request.circuit)
+        except Exception as err:
+            return bad_request("Invalid circuit: " + str(err))
         return CircuitDrawResponse(
-            visualizeQasm(
-                QuantumCircuit.from_qasm_str(CircuitDrawRequest(**json).circuit)
+            *visualization_service.render(
+                circuit,
+                request.visualization_format or "auto",
             )
         )
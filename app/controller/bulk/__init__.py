@@ -0,0 +1 @@
+from app.controller.bulk.bulk_controller import blp
@@ -0,0 +1,40 @@
+from flask import Response, current_app, request, stream_with_context
+from flask_smorest import Blueprint
+
+from app.services import bulk_service
+from app.services.circuit_streaming import STREAM_MIMETYPES
+
+blp = Blueprint(
+    "bulk",
+    __name__,
+    url_prefix="/bulk",
+    description="generate many circuits of any encoding or algorithm in one call",
+)
+
+
+@blp.route("", methods=["POST"])
+@blp.doc(
+    requestBody={
+        "content": {
+            "application/x-ndjson": {
+                "schema": {"type": "string"},
+                "example": '{"id": "a", "type": "algorithms/qft", "request": {"n_qubits": 3, "inverse": false, "barriers": false}}\n'
+                '{"id": "b", "type": "encoding/basis", "request": {"vector": [1.25], "integral_bits": 3, "fractional_bits": 3}}\n',
+            }
+        }
+    },
+    responses={"200": {"content": {"application/x-ndjson": {}}}},
+)
+def generate_bulk():
+    """Generate a batch of circuits
+
+    Takes one JSON object per line with the fields type (path of the endpoint, e.g. algorithms/qft),
+    request (body of that endpoint) and an optional id. Returns one JSON object per line in the order
+    the items complete, with the fields line, id, status and either response or error.
+    A failing item does not abort the batch.
+    """
+    app = current_app._get_current_object()
+    return Response(
+        stream_with_context(bulk_service.ndjson_results(app, request.stream)),
+        mimetype=STREAM_MIMETYPES["ndjson"],
+    )
@@ -1,4 +1,6 @@
 from flask_smorest import Blueprint
+
+from app.request_etag import request_etag
 from app.services import encoding_service
 from app.model.circuit_response import (
     SchmidtDecompositionResponseSchema,
@@ -26,7 +28,6 @@ blp = Blueprint(
 
 
 @blp.route("/basis", methods=["POST"])
-@blp.etag
 @blp.arguments(
     BasisEncodingRequestSchema,
     example=dict(
@@ -36,6 +37,7 @@ blp = Blueprint(
         circuit_format="openqasm2",
     ),
 )
+@request_etag
 @blp.response(200, BasisEncodingResponseSchema)
 def encoding(json: BasisEncodingRequest):
     if json:
@@ -43,11 +45,11 @@ def encoding(json: BasisEncodingRequest):
 
 
 @blp.route("/angle", methods=["POST"])
-@blp.etag
 @blp.arguments(
     AngleEncodingRequestSchema,
     example=dict(vector=[1.25, 3.14], rotation_axis="x", circuit_format="openqasm2"),
 )
+@request_etag
 @blp.response(200, AngleEncodingResponseSchema)
 def encoding(json: AngleEncodingRequest):
     if json:
@@ -55,11 +57,11 @@ def encoding(json: AngleEncodingRequest):
 
 
 @blp.route("/amplitude", methods=["POST"])
-@blp.etag
 @blp.arguments(
     AmplitudeEncodingRequestSchema,
     example=dict(vector=[1.25, 3.14], circuit_format="openqasm2"),
 )
+@request_etag
 @blp.response(200, AmplitudeEncodingResponseSchema)
 def encoding(json: AmplitudeEncodingRequest):
     if json:
@@ -73,6 +75,7 @@ def encoding(json: AmplitudeEncodingRequest):
     SchmidtDecompositionRequestSchema,
     example=dict(vector=[1.25, 3.14, 0, 1], circuit_format="openqasm2"),
 )
+@request_etag
 @blp.response(200, SchmidtDecompositionResponseSchema)
 def encoding(json: SchmidtDecompositionRequest):
     if json:
@@ -0,0 +1 @@
+from app.controller.jobs.job_controller import blp
@@ -0,0 +1,67 @@
+from flask import current_app, url_for
+from flask_smorest import Blueprint
+
+from app.model.job_request import JobRequestSchema, JobWaitRequestSchema
+from app.model.job_response import JobResponseSchema
+from app.services import bulk_service, job_service
+from app.services.bulk_service import ItemError
+from app.services.helper_service import (
+    bad_request,
+    not_found,
+    service_unavailable,
+    unprocessable_entity,
+)
+
+blp = Blueprint(
+    "jobs",
+    __name__,
+    url_prefix="/jobs",
+    description="generate circuits asynchronously, e.g., if the generation takes longer than a request may take",
+)
+
+
+@blp.route("", methods=["POST"])
+@blp.arguments(
+    JobRequestSchema,
+    example=dict(
+        type="algorithms/shor/discreteLog",
+        request=dict(b=2, g=3, p=5, circuit_format="openqasm2"),
+    ),
+)
+@blp.response(202, JobResponseSchema)
+def submit_job(json):
+    try:
+        generator, arguments = bulk_service.load_arguments(
+            json["type"], json["request"]
+        )
+    except ItemError as err:
+        if err.status == 422:
+            return unprocessable_entity(err.message)
+        return bad_request(err.message)
+    job = job_service.jobs.submit(
+        current_app._get_current_object(), json["type"], generator, arguments
+    )
+    if job is None:
+        return service_unavailable("Too many pending jobs, try again later.")
+    return job.to_json(), {"Location": url_for("jobs.get_job", job_id=job.job_id)}
+
+
+@blp.route("/<job_id>", methods=["GET"])
+@blp.arguments(JobWaitRequestSchema, location="query")
+@blp.response(200, JobResponseSchema)
+def get_job(args, job_id):
+    job = job_service.jobs.get(job_id)
+    if job is None:
+        return not_found("Unknown or expired job: " + job_id)
+    if args["wait"] > 0:
+        job.wait(min(args["wait"], current_app.config["JOB_MAX_WAIT"]))
+    return job.to_json()
+
+
+@blp.route("/<job_id>", methods=["DELETE"])
+@blp.response(200, JobResponseSchema)
+def cancel_job(job_id):
+    job = job_service.jobs.cancel(job_id)
+    if job is None:
+        return not_found("Unknown or expired job: " + job_id)
+    return job.to_json()
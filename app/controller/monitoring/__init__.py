@@ -0,0 +1 @@
+from app.controller.monitoring.monitoring_controller import blp
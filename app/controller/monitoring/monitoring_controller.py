@@ -0,0 +1,16 @@
+from flask_smorest import Blueprint
+
+from app.services import metrics_service
+
+blp = Blueprint(
+    "monitoring",
+    __name__,
+    url_prefix="/monitoring",
+    description="get service metrics such as cache hit rates",
+)
+
+
+@blp.route("/metrics", methods=["GET"])
+@blp.response(200)
+def get_metrics():
+    return metrics_service.collect()
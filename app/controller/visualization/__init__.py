@@ -0,0 +1 @@
+from app.controller.visualization.visualization_controller import blp
@@ -0,0 +1,28 @@
+from flask_smorest import Blueprint
+
+from app.services.helper_service import not_found
+from app.services.visualization_service import deferred_visualizations
+from app.model.circuit_response import (
+    VisualizationResponse,
+    VisualizationResponseSchema,
+)
+
+blp = Blueprint(
+    "visualization",
+    __name__,
+    url_prefix="/visualization",
+    description="get deferred circuit visualizations",
+)
+
+
+@blp.route("/<visualization_id>", methods=["GET"])
+@blp.response(200, VisualizationResponseSchema)
+@blp.alt_response(202, VisualizationResponseSchema, description="Still rendering.")
+def get_visualization(visualization_id):
+    result = deferred_visualizations.get(visualization_id)
+    if result is None:
+        return not_found("Unknown or expired visualization_id: " + visualization_id)
+    response = VisualizationResponse(visualization_id, *result)
+    if response.status == "pending":
+        return response, 202
+    return response
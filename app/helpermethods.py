@@ -3,31 +3,95 @@ import base64
 import codecs
 import pickle
 from qiskit import QuantumCircuit
+import matplotlib.pyplot as plt
 
+VISUALIZATION_FORMATS = ("auto", "latex", "mpl", "svg", "text")
 
-def visualizeQasm(circuit):
-    if circuit.depth() < 50:
+# rough render cost per backend: (fixed seconds, seconds per instruction)
+RENDER_COSTS = {
+    "latex": (1.5, 0.02),
+    "mpl": (0.2, 0.025),
+    # the matplotlib drawing saved as SVG instead of PNG
+    "svg": (0.2, 0.025),
+    "text": (0.0, 0.001),
+}
+# backends tried by the automatic policy, from most to least expensive
+AUTO_BACKENDS = ("latex", "svg", "text")
+
+
+def select_backend(circuit, time_budget):
+    """
+    Picks the most expensive backend whose estimated render time fits into the time budget
+    :param circuit: QuantumCircuit to render
+    :param time_budget: render time budget in seconds
+    :return: backend name or None if even the text drawer exceeds the budget
+    """
+    n_instructions = len(circuit.data)
+    for backend in AUTO_BACKENDS:
+        fixed, per_instruction = RENDER_COSTS[backend]
+        if fixed + per_instruction * n_instructions <= time_budget:
+            return backend
+    return None
+
+
+def visualizeQasm(circuit, output="auto", time_budget=3.0):
+    """
+    :param circuit: QuantumCircuit to render
+    :param output: auto, latex, mpl, svg or text
+    :param time_budget: render time budget in seconds used by the auto policy
+    :return: tuple (visualization, backend); PNG images are base64 encoded,
+             SVG and text drawings are returned as plain strings
+    """
+    if output == "auto":
+        output = select_backend(circuit, time_budget)
+        if output is None:
+            return (
+                f"Circuit too large to visualize ({len(circuit.data)} instructions)",
+                "text",
+            )
+    if output == "latex":
         try:
-            return renderLatex(circuit)
+            return renderLatex(circuit), "latex"
         except:
-            return renderMatplot(circuit)
-    else:
-        return "Circuit too large to visualize (maximum depth: 50)"
+            return renderMatplot(circuit), "mpl"
+    if output == "mpl":
+        return renderMatplot(circuit), "mpl"
+    if output == "svg":
+        return renderSvg(circuit), "svg"
+    if output == "text":
+        return renderText(circuit), "text"
+    raise ValueError("Unsupported visualization format: " + str(output))
 
 
 def renderLatex(circuit):
     latex_circuit = circuit.draw(output="latex")
     buffered = BytesIO()
     latex_circuit.save(buffered, format="png")
-    img_str = base64.b64encode(buffered.getvalue())
-    print(img_str)
+    img_str = base64.b64encode(buffered.getvalue()).decode()
     return img_str
 
 
 def renderMatplot(circuit):
     latex_circuit = circuit.draw(output="mpl")
     buffered = BytesIO()
-    latex_circuit.savefig(buffered, format="png")
-    img_str = base64.b64encode(buffered.getvalue())
-    print(img_str)
+    try:
+        latex_circuit.savefig(buffered, format="png")
+    finally:
+        # figures are kept alive by pyplot until they are closed explicitly
+        plt.close(latex_circuit)
+    img_str = base64.b64encode(buffered.getvalue()).decode()
     return img_str
+
+
+def renderSvg(circuit):
+    figure = circuit.draw(output="mpl")
+    buffered = BytesIO()
+    try:
+        figure.savefig(buffered, format="svg")
+    finally:
+        plt.close(figure)
+    return buffered.getvalue().decode()
+
+
+def renderText(circuit):
+    return circuit.draw(output="text").single_string()
@@ -2,21 +2,24 @@ import marshmallow as ma
 from marshmallow import pre_load, ValidationError
 import numpy as np
 
+from app.model.circuit_request import CircuitRequest, CircuitRequestSchema
+from app.model.numeric_array import NumericArray
+from app.helpermethods import VISUALIZATION_FORMATS
 
-class HHLAlgorithmRequest:
-    def __init__(self, matrix, vector, circuit_format="openqasm2"):
+
+class HHLAlgorithmRequest(CircuitRequest):
+    def __init__(self, matrix, vector, circuit_format="openqasm2", **kwargs):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         self.matrix = matrix
         self.vector = vector
-        self.circuit_format = circuit_format
 
 
-class HHLAlgorithmRequestSchema(ma.Schema):
-    matrix = ma.fields.List(ma.fields.List(ma.fields.Float()))
-    vector = ma.fields.List(ma.fields.Float())
-    circuit_format = ma.fields.String()
+class HHLAlgorithmRequestSchema(CircuitRequestSchema):
+    matrix = NumericArray(ndim=2)
+    vector = NumericArray()
 
 
-class QAOAAlgorithmRequest:
+class QAOAAlgorithmRequest(CircuitRequest):
     def __init__(
         self,
         pauli_op_string,
@@ -26,7 +29,9 @@ class QAOAAlgorithmRequest:
         mixer=None,
         reps=1,
         circuit_format="openqasm2",
+        **kwargs
     ):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         if gammas is None:
             gammas = [1] if reps == None else [1] * reps
         self.initial_state = initial_state
@@ -35,65 +40,67 @@ class QAOAAlgorithmRequest:
         self.reps = reps
         self.gammas = gammas
         self.betas = betas
-        self.circuit_format = circuit_format
 
 
-class QAOAAlgorithmRequestSchema(ma.Schema):
+class QAOAAlgorithmRequestSchema(CircuitRequestSchema):
     initial_state = ma.fields.String()
     pauli_op_string = ma.fields.String(required=True)
     mixer = ma.fields.String()
     reps = ma.fields.Int()
     gammas = ma.fields.List(ma.fields.Float(required=True))
     betas = ma.fields.List(ma.fields.Float(required=True))
-    circuit_format = ma.fields.String()
 
 
-class QFTAlgorithmRequest:
-    def __init__(self, n_qubits, inverse, barriers, circuit_format="openqasm2"):
+class QFTAlgorithmRequest(CircuitRequest):
+    def __init__(
+        self, n_qubits, inverse, barriers, circuit_format="openqasm2", **kwargs
+    ):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         self.n_qubits = n_qubits
         self.inverse = inverse
         self.barriers = barriers
-        self.circuit_format = circuit_format
 
 
-class QFTAlgorithmRequestSchema(ma.Schema):
+class QFTAlgorithmRequestSchema(CircuitRequestSchema):
     n_qubits = ma.fields.Int()
     inverse = ma.fields.Bool()
     barriers = ma.fields.Bool()
-    circuit_format = ma.fields.String()
 
 
-class QPEAlgorithmRequest:
-    def __init__(self, n_eval_qubits, unitary, circuit_format="openqasm2"):
+class QPEAlgorithmRequest(CircuitRequest):
+    def __init__(self, n_eval_qubits, unitary, circuit_format="openqasm2", **kwargs):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         self.n_eval_qubits = n_eval_qubits
         self.unitary = unitary
-        self.circuit_format = circuit_format
 
 
-class QPEAlgorithmRequestSchema(ma.Schema):
+class QPEAlgorithmRequestSchema(CircuitRequestSchema):
     n_eval_qubits = ma.fields.Int()
     unitary = ma.fields.String()
-    circuit_format = ma.fields.String()
 
 
-class VQEAlgorithmRequest:
+class VQEAlgorithmRequest(CircuitRequest):
     def __init__(
-        self, observable, ansatz=None, parameters=None, circuit_format="openqasm2"
+        self,
+        observable,
+        ansatz=None,
+        parameters=None,
+        circuit_format="openqasm2",
+        **kwargs
     ):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         self.ansatz = ansatz
         self.parameters = parameters
         self.observable = observable
-        self.circuit_format = circuit_format
 
 
-class VQEAlgorithmRequestSchema(ma.Schema):
+class VQEAlgorithmRequestSchema(CircuitRequestSchema):
     ansatz = ma.fields.String()
     parameters = ma.fields.List(ma.fields.Float())
     observable = ma.fields.String()
-    circuit_format = ma.fields.String()
 
 
-class GroverAlgorithmRequest:
+class GroverAlgorithmRequest(CircuitRequest):
     def __init__(
         self,
         oracle,
@@ -102,25 +109,25 @@ class GroverAlgorithmRequest:
         initial_state=None,
         barriers=None,
         circuit_format="openqasm2",
+        **kwargs
     ):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         self.oracle = oracle
         self.iterations = iterations
         self.reflection_qubits = reflection_qubits
         self.initial_state = initial_state
         self.barriers = barriers
-        self.circuit_format = circuit_format
 
 
-class GroverAlgorithmRequestSchema(ma.Schema):
+class GroverAlgorithmRequestSchema(CircuitRequestSchema):
     oracle = ma.fields.String(required=True)
     iterations = ma.fields.Int()
     reflection_qubits = ma.fields.List(ma.fields.Int())
     initial_state = ma.fields.String()
     barriers = ma.fields.Bool()
-    circuit_format = ma.fields.String()
 
 
-class MaxCutQAOAAlgorithmRequest:
+class MaxCutQAOAAlgorithmRequest(CircuitRequest):
     def __init__(
         self,
         adj_matrix,
@@ -131,7 +138,9 @@ class MaxCutQAOAAlgorithmRequest:
         initial_state=None,
         epsilon=0.25,
         circuit_format="openqasm2",
+        **kwargs
     ):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         self.adj_matrix = adj_matrix
         self.betas = betas
         self.gammas = gammas
@@ -139,50 +148,49 @@ class MaxCutQAOAAlgorithmRequest:
         self.parameterized = parameterized
         self.initial_state = initial_state
         self.epsilon = epsilon
-        self.circuit_format = circuit_format
 
 
-class MaxCutQAOAAlgorithmRequestSchema(ma.Schema):
-    adj_matrix = ma.fields.List(ma.fields.List(ma.fields.Float()), required=True)
+class MaxCutQAOAAlgorithmRequestSchema(CircuitRequestSchema):
+    adj_matrix = NumericArray(ndim=2, required=True)
     betas = ma.fields.List(ma.fields.Float(), required=False)
     gammas = ma.fields.List(ma.fields.Float(), required=False)
     p = ma.fields.Integer(required=False)
     parameterized = ma.fields.Boolean(required=False)
     initial_state = ma.fields.String(required=False)
     epsilon = ma.fields.Float(required=False)
-    circuit_format = ma.fields.String()
 
 
-class TSPQAOAAlgorithmRequest:
-    def __init__(self, adj_matrix, p, betas, gammas, circuit_format="openqasm2"):
+class TSPQAOAAlgorithmRequest(CircuitRequest):
+    def __init__(
+        self, adj_matrix, p, betas, gammas, circuit_format="openqasm2", **kwargs
+    ):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         self.adj_matrix = adj_matrix
         self.p = p
         self.betas = betas
         self.gammas = gammas
-        self.circuit_format = circuit_format
 
 
-class TSPQAOAAlgorithmRequestSchema(ma.Schema):
-    adj_matrix = ma.fields.List(ma.fields.List(ma.fields.Float()))
+class TSPQAOAAlgorithmRequestSchema(CircuitRequestSchema):
+    adj_matrix = NumericArray(ndim=2)
     p = ma.fields.Integer()
     betas = ma.fields.List(ma.fields.Float())
     gammas = ma.fields.List(ma.fields.Float())
-    circuit_format = ma.fields.String()
 
 
-class KnapsackQAOAAlgorithmRequest:
+class KnapsackQAOAAlgorithmRequest(CircuitRequest):
     def __init__(
-        self, items, max_weights, p, betas, gammas, circuit_format="openqasm2"
+        self, items, max_weights, p, betas, gammas, circuit_format="openqasm2", **kwargs
     ):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         self.items = items
         self.max_weights = max_weights
         self.p = p
         self.betas = betas
         self.gammas = gammas
-        self.circuit_format = circuit_format
 
 
-class KnapsackQAOAAlgorithmRequestSchema(ma.Schema):
+class KnapsackQAOAAlgorithmRequestSchema(CircuitRequestSchema):
     items = ma.fields.List(
         ma.fields.Dict(keys=ma.fields.Str(), values=ma.fields.Float())
     )
@@ -190,32 +198,97 @@ class KnapsackQAOAAlgorithmRequestSchema(ma.Schema):
     p = ma.fields.Integer()
     betas = ma.fields.List(ma.fields.Float())
     gammas = ma.fields.List(ma.fields.Float())
-    circuit_format = ma.fields.String()
 
 
-class ShorDiscreteLogAlgorithmRequest:
-    def __init__(self, b, g, p, n=-1, circuit_format="openqasm2"):
+class ShorDiscreteLogAlgorithmRequest(CircuitRequest):
+    def __init__(self, b, g, p, n=-1, circuit_format="openqasm2", **kwargs):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         self.b = b
         self.g = g
         self.p = p
         self.n = n
-        self.circuit_format = circuit_format
 
 
-class ShorDiscreteLogAlgorithmRequestSchema(ma.Schema):
+class ShorDiscreteLogAlgorithmRequestSchema(CircuitRequestSchema):
     b = ma.fields.Integer(required=True)
     g = ma.fields.Integer(required=True)
     p = ma.fields.Integer(required=True)
     n = ma.fields.Integer(required=False)
-    circuit_format = ma.fields.String()
 
 
 class CircuitDrawRequest:
-    def __init__(self, circuit, circuit_format):
+    def __init__(self, circuit, circuit_format, visualization_format=None):
         self.circuit = circuit
         self.circuit_format = circuit_format
+        self.visualization_format = visualization_format
 
 
 class CircuitDrawRequestSchema(ma.Schema):
     circuit = ma.fields.String()
     circuit_format = ma.fields.String()
+    visualization_format = ma.fields.String(
+        validate=ma.validate.OneOf(VISUALIZATION_FORMATS)
+    )
+
+
+SWEEP_OUTPUTS = ("circuits", "compact")
+
+
+class QAOASweepRequest:
+    """Angle sets of a QAOA parameter sweep, with one row of gammas and betas per point"""
+
+    def __init__(
+        self, gammas, betas=None, output="circuits", circuit_format="openqasm2"
+    ):
+        self.gammas = gammas
+        self.betas = betas
+        self.output = output
+        self.circuit_format = circuit_format
+        # the template of a compact sweep can only be exported with its parameters
+        self.parameterized = output == "compact"
+
+
+class QAOASweepRequestSchema(ma.Schema):
+    gammas = ma.fields.List(ma.fields.List(ma.fields.Float()), required=True)
+    betas = ma.fields.List(ma.fields.List(ma.fields.Float()))
+    output = ma.fields.String(
+        validate=ma.validate.OneOf(SWEEP_OUTPUTS),
+        metadata={
+            "description": "circuits (default): one bound circuit per angle set, "
+            "compact: the parameterized circuit and a matrix with one row of parameter values per angle set"
+        },
+    )
+    circuit_format = ma.fields.String()
+
+
+class MaxCutQAOASweepRequest(QAOASweepRequest):
+    def __init__(
+        self, adj_matrix, gammas, betas, initial_state=None, epsilon=0.25, **kwargs
+    ):
+        super().__init__(gammas, betas, **kwargs)
+        self.adj_matrix = adj_matrix
+        self.initial_state = initial_state
+        self.epsilon = epsilon
+
+
+class MaxCutQAOASweepRequestSchema(QAOASweepRequestSchema):
+    adj_matrix = NumericArray(ndim=2, required=True)
+    betas = ma.fields.List(ma.fields.List(ma.fields.Float()), required=True)
+    initial_state = ma.fields.String(required=False)
+    epsilon = ma.fields.Float(required=False)
+
+
+class QAOASweepAlgorithmRequest(QAOASweepRequest):
+    def __init__(
+        self, pauli_op_string, gammas, initial_state=None, mixer=None, **kwargs
+    ):
+        super().__init__(gammas, **kwargs)
+        self.pauli_op_string = pauli_op_string
+        self.initial_state = initial_state
+        self.mixer = mixer
+
+
+class QAOASweepAlgorithmRequestSchema(QAOASweepRequestSchema):
+    pauli_op_string = ma.fields.String(required=True)
+    initial_state = ma.fields.String()
+    mixer = ma.fields.String()
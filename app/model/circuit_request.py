@@ -0,0 +1,47 @@
+import marshmallow as ma
+
+from app.helpermethods import VISUALIZATION_FORMATS
+
+VISUALIZATION_MODES = ("none", "inline", "deferred")
+STREAM_MODES = ("qasm", "ndjson")
+
+
+class CircuitRequest:
+    """Output options shared by all circuit generation requests"""
+
+    def __init__(
+        self,
+        circuit_format="openqasm2",
+        visualization=None,
+        visualization_format=None,
+        stream=None,
+    ):
+        self.circuit_format = circuit_format
+        self.visualization = visualization
+        self.visualization_format = visualization_format
+        self.stream = stream
+
+
+class CircuitRequestSchema(ma.Schema):
+    circuit_format = ma.fields.String()
+    visualization = ma.fields.String(
+        validate=ma.validate.OneOf(VISUALIZATION_MODES),
+        metadata={
+            "description": "none: skip the image, inline: render it into the response, "
+            "deferred: render it in the background and return a visualization_id"
+        },
+    )
+    visualization_format = ma.fields.String(
+        validate=ma.validate.OneOf(VISUALIZATION_FORMATS),
+        metadata={
+            "description": "latex or mpl: base64 encoded PNG, svg: SVG document, text: text drawing, "
+            "auto (default): pick a backend from the circuit size"
+        },
+    )
+    stream = ma.fields.String(
+        validate=ma.validate.OneOf(STREAM_MODES),
+        metadata={
+            "description": "return the circuit as chunked response instead of a JSON document, "
+            "qasm: OpenQASM 2 text, ndjson: a header line followed by one JSON object per instruction"
+        },
+    )
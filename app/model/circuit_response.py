@@ -1,5 +1,6 @@
 import codecs
 import pickle
+import re
 
 
 from datetime import datetime
@@ -18,31 +19,55 @@ from app.model.algorithm_request import (
     VQEAlgorithmRequestSchema,
     GroverAlgorithmRequestSchema,
 )
-from app.helpermethods import visualizeQasm
+from app.services import builder_pool, visualization_service
+from app.services.circuit_serialization import (
+    QPY_FORMATS,
+    compression_available,
+    dump_qpy,
+)
+from app.services.circuit_streaming import (
+    ndjson_chunks,
+    qasm2_chunks,
+    stream_response,
+)
+from app.services.helper_service import bad_request
+from flask import current_app
 
 import qiskit.qasm3
 
 
+# matches parameter expressions with a coefficient, e.g. (2.0*beta0), and the quoted stdgates include
+QASM3_FIXUP_PATTERN = re.compile(r"\((\d+\.\d+)\*(.+)\)|\"stdgates.inc\"")
+
+
+def _qasm3_fixup(match):
+    if match.group(2) is None:
+        return "'stdgates.inc'"
+    return "(" + match.group(2) + ")"
+
+
+def _strip_parameter_coefficients(circuit_string):
+    """
+    Removes coefficient prefixes from parameter expressions and quotes 'stdgates.inc'
+    in a single pass over the OpenQASM 3 string
+    """
+    ### TODO remove once qasm3 import is fixed https://github.com/Qiskit/qiskit-qasm3-import/issues/25 ###
+    return QASM3_FIXUP_PATTERN.sub(_qasm3_fixup, circuit_string)
+
+
 def export_circuit(circuit, request):
     # THIS OPTION MAY LEAD TO INCOMPATIBLE EXPORT WITH DIFFERENT QISKIT VERSIONS AND IS NOT RECOMMENDED
     if request.circuit_format == "qiskit":
-        codecs.encode(pickle.dumps(circuit), "base64").decode(),
+        return codecs.encode(pickle.dumps(circuit), "base64").decode()
+    elif request.circuit_format in QPY_FORMATS:
+        compression = QPY_FORMATS[request.circuit_format]
+        if not compression_available(compression):
+            return "format unsupported (" + compression + " is not installed)"
+        return dump_qpy(circuit, compression)
     elif (
         hasattr(request, "parameterized") and request.parameterized
     ) or request.circuit_format == "openqasm3":
-        circuit_string = qiskit.qasm3.dumps(circuit)
-        ### TODO remove once qasm3 import is fixed https://github.com/Qiskit/qiskit-qasm3-import/issues/25 ###
-        # remove all prefixes to params
-        import re
-
-        patternFind = r"\((\d+\.\d+)\*(.+)\)"
-        replacementList = re.findall(patternFind, circuit_string)
-        for repl in replacementList:
-            patternMatch = r"" + re.escape(repl[0] + "*" + repl[1])
-            circuit_string = re.sub(patternMatch, repl[1], circuit_string, 1)
-        patternStdGates = r"\"stdgates.inc\""
-        circuit_string = re.sub(patternStdGates, "'stdgates.inc'", circuit_string)
-        return circuit_string
+        return _strip_parameter_coefficients(qiskit.qasm3.dumps(circuit))
     elif request.circuit_format == "openqasm2":
         return circuit.qasm()
     else:
@@ -50,18 +75,37 @@ def export_circuit(circuit, request):
 
 
 class CircuitResponse:
-    def __init__(
-        self, circuit, circuit_type, n_qubits, depth, request, circuit_language
-    ):
+    def __init__(self, circuit, circuit_type, request, circuit_language):
         super().__init__()
-        self.circuit = export_circuit(circuit, request)
+        self.metrics = builder_pool.metrics(circuit)
+        self.circuit = builder_pool.export(circuit, request)
         self.circuit_type = circuit_type
-        self.n_qubits = n_qubits
-        self.depth = depth
+        self.n_qubits = self.metrics.n_qubits
+        self.depth = self.metrics.depth
+        self.width = self.metrics.width
+        self.size = self.metrics.size
+        self.gate_counts = self.metrics.gate_counts
+        self.two_qubit_gates = self.metrics.two_qubit_gates
+        self.n_parameters = self.metrics.n_parameters
         self.request = request
         self.timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        self.visualization = visualizeQasm(circuit)
-        self.circuit_language = circuit_language
+        visualization = (
+            getattr(request, "visualization", None)
+            or current_app.config["DEFAULT_VISUALIZATION"]
+        )
+        (
+            self.visualization,
+            self.visualization_format,
+            self.visualization_id,
+        ) = visualization_service.visualize(
+            # circuits built in a worker are only loaded if they are rendered
+            builder_pool.as_circuit(circuit) if visualization != "none" else None,
+            visualization,
+            getattr(request, "visualization_format", None) or "auto",
+        )
+        self.circuit_language = (
+            "qpy" if request.circuit_format in QPY_FORMATS else circuit_language
+        )
 
     def to_json(self):
         json_circuit_response = {
@@ -69,21 +113,169 @@ class CircuitResponse:
             "circuit_type": self.circuit_type,
             "n_qubits": self.n_qubits,
             "depth": self.depth,
+            "width": self.width,
+            "size": self.size,
+            "gate_counts": self.gate_counts,
+            "two_qubit_gates": self.two_qubit_gates,
+            "n_parameters": self.n_parameters,
             "timestamp": self.timestamp,
             "request": self.request,
             "visualization": self.visualization,
+            "visualization_format": self.visualization_format,
+            "visualization_id": self.visualization_id,
             "circuit_language": self.circuit_language,
         }
         return json_circuit_response
 
 
+def circuit_response(circuit, circuit_type, request, circuit_language):
+    """
+    :return: CircuitResponse, or a chunked Response if the request asks for a stream.
+             Streams contain the circuit only, without request echo and visualization.
+    """
+    stream = getattr(request, "stream", None)
+    if stream is None:
+        return CircuitResponse(circuit, circuit_type, request, circuit_language)
+    metrics = builder_pool.metrics(circuit)
+    circuit = builder_pool.as_circuit(circuit)
+    chunk_size = current_app.config["STREAM_CHUNK_SIZE"]
+    if stream == "qasm":
+        if (
+            request.circuit_format != "openqasm2"
+            or getattr(request, "parameterized", False)
+            or circuit.num_parameters > 0
+        ):
+            return bad_request(
+                "stream qasm requires circuit_format openqasm2 and a circuit without free parameters"
+            )
+        return stream_response(qasm2_chunks(circuit, chunk_size), stream)
+    header = {
+        "circuit_type": circuit_type,
+        "n_qubits": metrics.n_qubits,
+        "depth": metrics.depth,
+        "width": metrics.width,
+        "size": metrics.size,
+        "gate_counts": metrics.gate_counts,
+        "two_qubit_gates": metrics.two_qubit_gates,
+        "n_parameters": metrics.n_parameters,
+        "timestamp": datetime.now().strftime("%Y-%m-%d_%H-%M-%S"),
+    }
+    return stream_response(ndjson_chunks(circuit, header, chunk_size), stream)
+
+
+class CircuitSweepResponse:
+    def __init__(
+        self,
+        circuit,
+        circuit_type,
+        circuit_language,
+        circuits=None,
+        template=None,
+        parameters=None,
+        values=None,
+    ):
+        super().__init__()
+        self.metrics = builder_pool.metrics(circuit)
+        self.circuit_type = circuit_type
+        self.n_qubits = self.metrics.n_qubits
+        self.depth = self.metrics.depth
+        self.width = self.metrics.width
+        self.size = self.metrics.size
+        self.gate_counts = self.metrics.gate_counts
+        self.two_qubit_gates = self.metrics.two_qubit_gates
+        self.n_parameters = self.metrics.n_parameters
+        self.circuits = circuits
+        self.template = template
+        self.parameters = parameters
+        self.values = values
+        self.circuit_language = circuit_language
+        self.timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+    def to_json(self):
+        json_sweep_response = {
+            "circuit_type": self.circuit_type,
+            "n_qubits": self.n_qubits,
+            "depth": self.depth,
+            "width": self.width,
+            "size": self.size,
+            "gate_counts": self.gate_counts,
+            "two_qubit_gates": self.two_qubit_gates,
+            "n_parameters": self.n_parameters,
+            "circuits": self.circuits,
+            "template": self.template,
+            "parameters": self.parameters,
+            "values": self.values,
+            "circuit_language": self.circuit_language,
+            "timestamp": self.timestamp,
+        }
+        return json_sweep_response
+
+
+def sweep_response(template, circuit_type, request, circuit_language):
+    """
+    Binds every angle set of a QAOA sweep to a template that is built only once.
+    :param template: circuit with the parameters gamma0, ..., and beta0, ... if the request has betas
+    :param request: QAOASweepRequest
+    :return: CircuitSweepResponse with one bound circuit per angle set, or with the template
+             and one row of parameter values per angle set if the request asks for compact output
+    """
+    reps = len(request.gammas[0])
+    names = ["gamma" + str(i) for i in range(reps)]
+    rows = request.gammas
+    if request.betas is not None:
+        names += ["beta" + str(i) for i in range(reps)]
+        rows = [gammas + betas for gammas, betas in zip(request.gammas, request.betas)]
+    parameters = {parameter.name: parameter for parameter in template.parameters}
+    if set(parameters) != set(names):
+        return bad_request(
+            "The angles do not match the parameters of the circuit: "
+            + ", ".join(sorted(parameters))
+        )
+    circuit_language = (
+        "qpy" if request.circuit_format in QPY_FORMATS else circuit_language
+    )
+
+    if request.output == "compact":
+        order = [names.index(parameter.name) for parameter in template.parameters]
+        return CircuitSweepResponse(
+            template,
+            circuit_type,
+            circuit_language,
+            template=builder_pool.export(template, request),
+            parameters=[parameter.name for parameter in template.parameters],
+            values=[[row[index] for index in order] for row in rows],
+        )
+
+    bound_parameters = [parameters[name] for name in names]
+    template = builder_pool.as_circuit(template)
+    circuits = [
+        export_circuit(
+            template.assign_parameters(dict(zip(bound_parameters, row))), request
+        )
+        for row in rows
+    ]
+    # the bound circuits have the metrics of the template, without its parameters
+    response = CircuitSweepResponse(
+        template, circuit_type, circuit_language, circuits=circuits
+    )
+    response.n_parameters = 0
+    return response
+
+
 class CircuitResponseSchema(ma.Schema):
     circuit = ma.fields.String()
     circuit_type = ma.fields.String()
     n_qubits = ma.fields.Int()
     depth = ma.fields.Int()
+    width = ma.fields.Int()
+    size = ma.fields.Int()
+    gate_counts = ma.fields.Dict(keys=ma.fields.String(), values=ma.fields.Int())
+    two_qubit_gates = ma.fields.Int()
+    n_parameters = ma.fields.Int()
     timestamp = ma.fields.String()
     visualization = ma.fields.String()
+    visualization_format = ma.fields.String()
+    visualization_id = ma.fields.String()
     circuit_language = ma.fields.String()
 
     @property
@@ -99,8 +291,17 @@ class AngleEncodingResponseSchema(CircuitResponseSchema):
     request = ma.fields.Nested(AngleEncodingRequestSchema)
 
 
+class AmplitudeApproximationResponseSchema(ma.Schema):
+    threshold = ma.fields.Float()
+    fidelity = ma.fields.Float()
+    gates = ma.fields.Int()
+    exact_gates = ma.fields.Int()
+    removed_gates = ma.fields.Int()
+
+
 class AmplitudeEncodingResponseSchema(CircuitResponseSchema):
     request = ma.fields.Nested(AmplitudeEncodingRequestSchema)
+    approximation = ma.fields.Nested(AmplitudeApproximationResponseSchema)
 
 
 class SchmidtDecompositionResponseSchema(CircuitResponseSchema):
@@ -131,17 +332,64 @@ class GroverResponseSchema(CircuitResponseSchema):
     request = ma.fields.Nested(GroverAlgorithmRequestSchema)
 
 
+class CircuitSweepResponseSchema(ma.Schema):
+    circuit_type = ma.fields.String()
+    n_qubits = ma.fields.Int()
+    depth = ma.fields.Int()
+    width = ma.fields.Int()
+    size = ma.fields.Int()
+    gate_counts = ma.fields.Dict(keys=ma.fields.String(), values=ma.fields.Int())
+    two_qubit_gates = ma.fields.Int()
+    n_parameters = ma.fields.Int()
+    circuits = ma.fields.List(ma.fields.String())
+    template = ma.fields.String()
+    parameters = ma.fields.List(ma.fields.String())
+    values = ma.fields.List(ma.fields.List(ma.fields.Float()))
+    circuit_language = ma.fields.String()
+    timestamp = ma.fields.String()
+
+
 class CircuitDrawResponse:
-    def __init__(self, visualization):
+    def __init__(self, visualization, visualization_format=None):
         super().__init__()
         self.visualization = visualization
+        self.visualization_format = visualization_format
 
     def to_json(self):
         json_circuit_response = {
             "visualization": self.visualization,
+            "visualization_format": self.visualization_format,
         }
         return json_circuit_response
 
 
 class CircuitDrawResponseSchema(ma.Schema):
     visualization = ma.fields.String()
+    visualization_format = ma.fields.String()
+
+
+class VisualizationResponse:
+    def __init__(
+        self, visualization_id, status, visualization=None, visualization_format=None
+    ):
+        super().__init__()
+        self.visualization_id = visualization_id
+        self.status = status
+        self.visualization = visualization
+        self.visualization_format = visualization_format
+
+    def to_json(self):
+        json_visualization_response = {
+            "visualization_id": self.visualization_id,
+            "status": self.status,
+            "visualization": self.visualization,
+            "visualization_format": self.visualization_format,
+        }
+        return json_visualization_response
+
+
+class VisualizationResponseSchema(ma.Schema):
+    visualization_id = ma.fields.String()
+    status = ma.fields.String()
+    visualization = ma.fields.String()
+    visualization_format = ma.fields.String()
@@ -2,54 +2,112 @@ import marshmallow as ma
 from marshmallow import pre_load, ValidationError
 import numpy as np
 
+from app.model.circuit_request import CircuitRequest, CircuitRequestSchema
+from app.model.numeric_array import NumericArray
 
-class BasisEncodingRequest:
+
+class BasisEncodingRequest(CircuitRequest):
     def __init__(
-        self, vector, integral_bits, fractional_bits, circuit_format="openqasm2"
+        self,
+        vector,
+        integral_bits,
+        fractional_bits,
+        circuit_format="openqasm2",
+        **kwargs
     ):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         self.vector = vector
         self.integral_bits = integral_bits
         self.fractional_bits = fractional_bits
-        self.circuit_format = circuit_format
 
 
-class BasisEncodingRequestSchema(ma.Schema):
+class BasisEncodingRequestSchema(CircuitRequestSchema):
     vector = ma.fields.List(ma.fields.Float(), required=True)
     integral_bits = ma.fields.Int(required=True)
     fractional_bits = ma.fields.Int(required=True)
-    circuit_format = ma.fields.String()
 
 
-class AngleEncodingRequest:
-    def __init__(self, vector, rotation_axis, circuit_format="openqasm2"):
+class AngleEncodingRequest(CircuitRequest):
+    def __init__(self, vector, rotation_axis, circuit_format="openqasm2", **kwargs):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         self.vector = vector
         self.rotation_axis = rotation_axis
-        self.circuit_format = circuit_format
 
 
-class AngleEncodingRequestSchema(ma.Schema):
+class AngleEncodingRequestSchema(CircuitRequestSchema):
     vector = ma.fields.List(ma.fields.Float())
-    rotation_axis = ma.fields.String()
-    circuit_format = ma.fields.String()
+    rotation_axis = ma.fields.String(
+        metadata={
+            "description": "x, y or z: one qubit per feature, yz: dense encoding of two features "
+            "per qubit, an RY rotation followed by an RZ rotation"
+        },
+    )
 
 
-class AmplitudeEncodingRequest:
-    def __init__(self, vector, circuit_format="openqasm2"):
+class AmplitudeEncodingRequest(CircuitRequest):
+    def __init__(
+        self,
+        vector,
+        indices=None,
+        size=None,
+        approximation=None,
+        circuit_format="openqasm2",
+        **kwargs
+    ):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         self.vector = vector
-        self.circuit_format = circuit_format
-
-
-class AmplitudeEncodingRequestSchema(ma.Schema):
-    vector = ma.fields.List(ma.fields.Float())
-    circuit_format = ma.fields.String()
-
-
-class SchmidtDecompositionRequest:
-    def __init__(self, vector, circuit_format="openqasm2"):
+        self.indices = indices
+        self.size = size
+        self.approximation = approximation
+
+
+class AmplitudeApproximationSchema(ma.Schema):
+    threshold = ma.fields.Float(
+        validate=ma.validate.Range(min=0),
+        metadata={"description": "Leave out all rotations with smaller angles"},
+    )
+    fidelity = ma.fields.Float(
+        validate=ma.validate.Range(min=0, max=1),
+        metadata={
+            "description": "Leave out as many of the smallest rotations as possible while the "
+            "prepared state keeps this fidelity"
+        },
+    )
+
+
+class AmplitudeEncodingRequestSchema(CircuitRequestSchema):
+    vector = NumericArray(
+        metadata={
+            "description": "The vector to encode, or its nonzero values if indices are given"
+        },
+    )
+    indices = ma.fields.List(
+        ma.fields.Int(),
+        metadata={
+            "description": "Sparse mode: the indices of the values in vector, all other entries "
+            "are 0. The circuit then grows with the number of values instead of the length of "
+            "the vector."
+        },
+    )
+    size = ma.fields.Int(
+        metadata={
+            "description": "Sparse mode: the length of the vector, by default the largest index + 1"
+        },
+    )
+    approximation = ma.fields.Nested(
+        AmplitudeApproximationSchema,
+        metadata={
+            "description": "Approximate the vector with fewer gates, given either a threshold or "
+            "a fidelity"
+        },
+    )
+
+
+class SchmidtDecompositionRequest(CircuitRequest):
+    def __init__(self, vector, circuit_format="openqasm2", **kwargs):
+        super().__init__(circuit_format=circuit_format, **kwargs)
         self.vector = vector
-        self.circuit_format = circuit_format
 
 
-class SchmidtDecompositionRequestSchema(ma.Schema):
-    vector = ma.fields.List(ma.fields.Float())
-    circuit_format = ma.fields.String()
+class SchmidtDecompositionRequestSchema(CircuitRequestSchema):
+    vector = NumericArray()
@@ -0,0 +1,23 @@
+import marshmallow as ma
+
+
+class JobRequestSchema(ma.Schema):
+    type = ma.fields.String(
+        required=True,
+        metadata={
+            "description": "path of the endpoint, e.g. algorithms/shor/discreteLog"
+        },
+    )
+    request = ma.fields.Dict(
+        required=True, metadata={"description": "request body of that endpoint"}
+    )
+
+
+class JobWaitRequestSchema(ma.Schema):
+    wait = ma.fields.Float(
+        load_default=0,
+        validate=ma.validate.Range(min=0),
+        metadata={
+            "description": "seconds to wait for the job to finish before answering (long polling)"
+        },
+    )
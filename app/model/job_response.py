@@ -0,0 +1,25 @@
+import marshmallow as ma
+
+
+class JobProgressSchema(ma.Schema):
+    stage = ma.fields.String(allow_none=True)
+    completed = ma.fields.Int(allow_none=True)
+    total = ma.fields.Int(allow_none=True)
+
+
+class JobResponseSchema(ma.Schema):
+    job_id = ma.fields.String()
+    type = ma.fields.String()
+    status = ma.fields.String(
+        metadata={"description": "queued, running, done, failed or cancelled"}
+    )
+    progress = ma.fields.Nested(JobProgressSchema)
+    created = ma.fields.String()
+    started = ma.fields.String(allow_none=True)
+    finished = ma.fields.String(allow_none=True)
+    result = ma.fields.Dict(
+        allow_none=True,
+        metadata={"description": "response of the endpoint once the job is done"},
+    )
+    error = ma.fields.Raw(allow_none=True)
+    error_status = ma.fields.Int(allow_none=True)
@@ -0,0 +1,109 @@
+import base64
+import binascii
+import io
+
+import marshmallow as ma
+import numpy as np
+
+BINARY_FORMATS = ("float64", "npy")
+
+BINARY_DESCRIPTION = (
+    "JSON list, or an object with the base64 encoded data, its format (float64 (default): "
+    "little-endian float64 buffer, npy: .npy file) and its shape"
+)
+
+
+def decode_array(value):
+    """
+    Decodes a binary array without parsing its values
+    :param value: dict with the base64 encoded "data", its "format", float64 for a little-endian
+                  float64 buffer (default) or npy for the bytes of an .npy file, and the "shape",
+                  by default the one of the .npy header or one dimension
+    :return: read-only numpy array backed by the decoded bytes
+    :raises ValueError, TypeError: if the value is not a valid binary array
+    """
+    data_format = value.get("format", "float64")
+    if data_format not in BINARY_FORMATS:
+        raise ValueError("format must be one of " + ", ".join(BINARY_FORMATS))
+    try:
+        data = base64.b64decode(value.get("data", ""), validate=True)
+    except (binascii.Error, TypeError) as error:
+        raise ValueError("data must be base64 encoded") from error
+
+    shape, fortran_order, dtype, offset = (-1,), False, np.dtype("<f8"), 0
+    if data_format == "npy":
+        stream = io.BytesIO(data)
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+        else:
+            raise ValueError("npy format version " + str(version) + " is not supported")
+        # object arrays would be pickled
+        if dtype.kind not in "fiu":
+            raise ValueError("npy data must have a numeric dtype")
+        offset = stream.tell()
+    if value.get("shape") is not None:
+        if data_format == "npy" and tuple(value["shape"]) != shape:
+            raise ValueError("shape does not match the npy header")
+        shape = tuple(value["shape"])
+
+    if (len(data) - offset) % dtype.itemsize:
+        raise ValueError("data is not a whole number of values")
+    array = np.frombuffer(data, dtype=dtype, offset=offset)
+    array = array.reshape(shape, order="F" if fortran_order else "C")
+    if dtype != np.float64:
+        array = array.astype(np.float64)
+    if not np.isfinite(array).all():
+        raise ValueError("data must not contain infinite or NaN values")
+    return array
+
+
+def encode_array(array):
+    """
+    :return: dict with the base64 encoded little-endian float64 buffer and the shape of the array,
+             see decode_array
+    """
+    data = np.ascontiguousarray(array, dtype="<f8").tobytes()
+    return {
+        "data": base64.b64encode(data).decode(),
+        "format": "float64",
+        "shape": list(np.shape(array)),
+    }
+
+
+class NumericArray(ma.fields.Field):
+    """
+    Array of floats given either as (nested) JSON lists or as binary object, see decode_array.
+    Binary arrays are loaded as read-only numpy arrays without parsing and validating every value.
+    """
+
+    def __init__(self, ndim=1, **kwargs):
+        metadata = dict(kwargs.pop("metadata", {}))
+        metadata["description"] = " ".join(
+            filter(None, (metadata.get("description"), BINARY_DESCRIPTION))
+        )
+        super().__init__(metadata=metadata, **kwargs)
+        self.ndim = ndim
+        self.list_field = ma.fields.Float()
+        for _ in range(ndim):
+            self.list_field = ma.fields.List(self.list_field)
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if not isinstance(value, dict):
+            return self.list_field.deserialize(value, attr, data, **kwargs)
+        try:
+            array = decode_array(value)
+        except (ValueError, TypeError) as error:
+            raise ma.ValidationError("Invalid binary array: " + str(error)) from error
+        if array.ndim != self.ndim:
+            raise ma.ValidationError(
+                "Invalid binary array: expected " + str(self.ndim) + " dimensions"
+            )
+        return array
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        if isinstance(value, np.ndarray):
+            return encode_array(value)
+        return self.list_field._serialize(value, attr, obj, **kwargs)
@@ -0,0 +1,81 @@
+import hashlib
+import json
+from copy import deepcopy
+from functools import wraps
+
+import numpy as np
+import qiskit
+from flask import Response, current_app, request
+
+from app.compression import available_encodings
+
+
+def _json_default(value):
+    # str() of a large array elides its middle, so arrays are identified by a hash of their data
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        return [str(data.dtype), data.shape, hashlib.sha256(data.tobytes()).hexdigest()]
+    return str(value)
+
+
+def compute_etag(json_request):
+    """
+    :param json_request: validated request arguments
+    :return: entity tag identifying the response to the request, i.e., a canonical hash of the
+             endpoint, the arguments and everything else the generated circuit depends on
+    """
+    content = json.dumps(
+        [
+            request.path,
+            json_request,
+            current_app.config["API_VERSION"],
+            qiskit.__version__,
+            current_app.config["DEFAULT_VISUALIZATION"],
+        ],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=_json_default,
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _matching_etag(etag):
+    """
+    :return: the tag in If-None-Match matching etag, also considering the tags of compressed representations
+    """
+    for tag in [etag] + [etag + "-" + encoding for encoding in available_encodings()]:
+        if request.if_none_match.contains_weak(tag):
+            return tag
+    return None
+
+
+def request_etag(func):
+    """
+    Sets a weak ETag computed from the validated request on successful responses and answers
+    requests whose If-None-Match contains that tag with 304 before generating anything.
+    The tag is weak as only fields like the timestamp may differ between two responses.
+    Has to be placed below @blp.arguments to receive the validated arguments.
+    """
+
+    @wraps(func)
+    def wrapper(json_request, *args, **kwargs):
+        if current_app.config.get("ETAG_DISABLED", False):
+            return func(json_request, *args, **kwargs)
+
+        etag = compute_etag(json_request)
+        matching_etag = _matching_etag(etag)
+        if matching_etag is not None:
+            response = Response(status=304)
+            response.set_etag(matching_etag, weak=True)
+            response.vary.add("Accept-Encoding")
+            return response
+
+        response = func(json_request, *args, **kwargs)
+        if isinstance(response, Response) and 200 <= response.status_code < 300:
+            response.set_etag(etag, weak=True)
+        return response
+
+    # The deepcopy avoids modifying the doc of the wrapped function
+    wrapper._apidoc = deepcopy(getattr(wrapper, "_apidoc", {}))
+    wrapper._apidoc["etag"] = True
+    return wrapper
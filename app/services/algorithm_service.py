@@ -17,8 +17,15 @@ from app.services.algorithms.grover_algorithm import GroverAlgorithm
 from app.services.algorithms.pauliParser import PauliParser
 from app.services.algorithms.shor_discrete_log import ShorDiscreteLog
 
-from app.services.helper_service import bad_request
-from app.model.circuit_response import CircuitResponse
+from app.services.helper_service import bad_request, unprocessable_entity
+from app.services.generation_cache import cached
+from app.services.budget_service import within_budget
+from app.services.builder_pool import build
+from app.services.circuit_serialization import load_circuit, is_qpy
+from app.model.circuit_response import circuit_response, sweep_response
+from flask import Response, current_app
+from qiskit.circuit import Parameter
+from qiskit.circuit.exceptions import CircuitError
 
 
 from app.model.algorithm_request import (
@@ -33,9 +40,13 @@ from app.model.algorithm_request import (
     KnapsackQAOAAlgorithmRequest,
     CircuitDrawRequest,
     ShorDiscreteLogAlgorithmRequest,
+    MaxCutQAOASweepRequest,
+    QAOASweepAlgorithmRequest,
 )
 
 
+@cached("hhl")
+@within_budget("hhl")
 def generate_hhl_circuit(request: HHLAlgorithmRequest):
     # Check types and dimensions
     matrix_array = np.array(request.matrix)
@@ -52,80 +63,98 @@ def generate_hhl_circuit(request: HHLAlgorithmRequest):
     if np.log2(matrix_array.shape[0]) % 1 != 0:
         return bad_request("Invalid matrix input! Input matrix dimension must be 2^n.")
 
-    circuit = HHLAlgorithm.create_circuit(request.matrix, request.vector)
-    return CircuitResponse(
+    circuit = build(HHLAlgorithm.create_circuit, request.matrix, request.vector)
+    return circuit_response(
         circuit,
         "algorithm/hhl",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
 
 
-def generate_qaoa_circuit(request: QAOAAlgorithmRequest):
+def parse_qaoa_problem(request):
+    """
+    :param request: request with pauli_op_string and optional initial_state and mixer
+    :return: tuple of initial state, cost operator and mixer, or a bad request response
+    """
     initial_state = request.initial_state
-    pauli_op_string = request.pauli_op_string
     mixer = request.mixer
-    reps = request.reps
-    gammas = request.gammas
-    betas = request.betas
 
     # check initial state (qasm string)
     try:
         if initial_state is not None:
-            initial_state = QuantumCircuit.from_qasm_str(initial_state)
+            initial_state = load_circuit(initial_state)
     except Exception as err:
         return bad_request("Invalid initial_state: " + str(err))
     # check Pauli string
     try:
-        pauli_op = PauliParser.parse(pauli_op_string)
+        pauli_op = PauliParser.parse(request.pauli_op_string)
     except ValueError as err:
         return bad_request("Invalid pauli_op_string: " + str(err))
     # check mixer (qasm string or pauli operator string)
     try:
         if mixer is not None:
-            if mixer.startswith("OPENQASM"):
-                # OPENQASM String
-                mixer = QuantumCircuit.from_qasm_str(mixer)
+            if mixer.startswith("OPENQASM") or is_qpy(mixer):
+                # OPENQASM or QPY String
+                mixer = load_circuit(mixer)
             else:
                 # pauli operator string
                 mixer = PauliParser.parse(mixer)
     except Exception as err:
         return bad_request("Invalid mixer: " + str(err))
+    return initial_state, pauli_op, mixer
+
+
+@cached("qaoa")
+@within_budget("qaoa")
+def generate_qaoa_circuit(request: QAOAAlgorithmRequest):
+    reps = request.reps
+    gammas = request.gammas
+    betas = request.betas
+
+    problem = parse_qaoa_problem(request)
+    if isinstance(problem, Response):
+        return problem
+    initial_state, pauli_op, mixer = problem
     # check angle input
     if len(gammas) != reps or (betas is not None and len(betas) != reps):
         return bad_request(
             f"Number of angles and repetitions don't match. You specified {len(gammas)} gamma(s) and {len(betas)} beta(s) for {reps} repetition(s)."
         )
 
-    circuit = QAOAAlgorithm.create_circuit(
-        initial_state, pauli_op, mixer, reps, gammas, betas
+    circuit = build(
+        QAOAAlgorithm.create_circuit,
+        initial_state,
+        pauli_op,
+        mixer,
+        reps,
+        gammas,
+        betas,
     )
-    return CircuitResponse(
+    return circuit_response(
         circuit,
         "algorithm/qaoa",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
 
 
+@cached("qft")
+@within_budget("qft")
 def generate_qft_circuit(request: QFTAlgorithmRequest):
-    circuit = QFTAlgorithm.create_circuit(
-        request.n_qubits, request.inverse, request.barriers
+    circuit = build(
+        QFTAlgorithm.create_circuit, request.n_qubits, request.inverse, request.barriers
     )
-    return CircuitResponse(
+    return circuit_response(
         circuit,
         "algorithm/qft",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
 
 
+@cached("qpe")
+@within_budget("qpe")
 def generate_qpe_circuit(request: QPEAlgorithmRequest):
     n_eval_qubits = request.n_eval_qubits
     unitary = request.unitary
@@ -133,21 +162,21 @@ def generate_qpe_circuit(request: QPEAlgorithmRequest):
     # check Unitary operator (qasm string)
     try:
         if unitary is not None:
-            unitary = QuantumCircuit.from_qasm_str(unitary)
+            unitary = load_circuit(unitary)
     except Exception as err:
         return bad_request("Invalid unitary (qasm string): " + str(err))
 
-    circuit = QPEAlgorithm.create_circuit(n_eval_qubits, unitary)
-    return CircuitResponse(
+    circuit = build(QPEAlgorithm.create_circuit, n_eval_qubits, unitary)
+    return circuit_response(
         circuit,
         "algorithm/qpe",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
 
 
+@cached("vqe")
+@within_budget("vqe")
 def generate_vqe_circuit(request: VQEAlgorithmRequest):
     ansatz = request.ansatz
     parameters = request.parameters
@@ -160,7 +189,7 @@ def generate_vqe_circuit(request: VQEAlgorithmRequest):
                 'Custom ansatz and parameters not supported. Remove "parameters" field!'
             )
         try:
-            ansatz = QuantumCircuit.from_qasm_str(ansatz)
+            ansatz = load_circuit(ansatz)
         except Exception as err:
             return bad_request("Invalid ansatz (qasm string): " + str(err))
     # if custom ansatz is chosen
@@ -173,20 +202,20 @@ def generate_vqe_circuit(request: VQEAlgorithmRequest):
 
     # check if number of parameters match ansatz
     try:
-        circuit = VQEAlgorithm.create_circuit(ansatz, parameters, observable)
+        circuit = build(VQEAlgorithm.create_circuit, ansatz, parameters, observable)
     except ValueError as err:
         return bad_request("Verify correctness of parameters: " + str(err))
 
-    return CircuitResponse(
+    return circuit_response(
         circuit,
         "algorithm/vqe",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
 
 
+@cached("grover")
+@within_budget("grover")
 def generate_grover_circuit(request: GroverAlgorithmRequest):
     oracle = request.oracle
     iterations = request.iterations
@@ -197,13 +226,13 @@ def generate_grover_circuit(request: GroverAlgorithmRequest):
     # check oracle (qasm string)
     try:
         if oracle is not None:
-            oracle = QuantumCircuit.from_qasm_str(oracle)
+            oracle = load_circuit(oracle)
     except Exception as err:
         return bad_request("Invalid oracle (qasm string): " + str(err))
     # check initial_state (qasm string)
     try:
         if initial_state is not None:
-            initial_state = QuantumCircuit.from_qasm_str(initial_state)
+            initial_state = load_circuit(initial_state)
     except Exception as err:
         return bad_request("Invalid initial_state (qasm string): " + str(err))
 
@@ -211,25 +240,34 @@ def generate_grover_circuit(request: GroverAlgorithmRequest):
     if iterations is None:
         iterations = 1
 
-    circuit = GroverAlgorithm.create_circuit(
-        oracle, iterations, reflection_qubits, initial_state, barriers
+    circuit = build(
+        GroverAlgorithm.create_circuit,
+        oracle,
+        iterations,
+        reflection_qubits,
+        initial_state,
+        barriers,
     )
-    return CircuitResponse(
+    return circuit_response(
         circuit,
         "algorithm/grover",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
 
 
+@cached("qaoa_maxcut")
+@within_budget("qaoa_maxcut")
 def generate_max_cut_qaoa_circuit(request: MaxCutQAOAAlgorithmRequest):
     if request.initial_state is not None:
         if request.parameterized:
-            circuit = MaxCutQAOAWarmStartAlgorithm.genQaoaMaxcutCircuitTemplate(
-                request.adj_matrix, request.initial_state, request.p, request.epsilon
-            )
+            circuit = build(
+                MaxCutQAOAWarmStartAlgorithm.getQaoaMaxcutCircuitTemplate,
+                request.adj_matrix,
+                request.initial_state,
+                request.p,
+                request.epsilon,
+            ).copy()
         else:
             import itertools
 
@@ -240,7 +278,8 @@ def generate_max_cut_qaoa_circuit(request: MaxCutQAOAAlgorithmRequest):
                 )
                 if x is not None
             ]
-            circuit = MaxCutQAOAWarmStartAlgorithm.genQaoaMaxcutCircuit(
+            circuit = build(
+                MaxCutQAOAWarmStartAlgorithm.genQaoaMaxcutCircuit,
                 request.adj_matrix,
                 params,
                 request.initial_state,
@@ -248,7 +287,8 @@ def generate_max_cut_qaoa_circuit(request: MaxCutQAOAAlgorithmRequest):
                 request.epsilon,
             )
     else:
-        circuit = MaxCutQAOAAlgorithm.create_circuit(
+        circuit = build(
+            MaxCutQAOAAlgorithm.create_circuit,
             request.adj_matrix,
             request.betas,
             request.gammas,
@@ -256,32 +296,34 @@ def generate_max_cut_qaoa_circuit(request: MaxCutQAOAAlgorithmRequest):
             request.parameterized,
         )
 
-    return CircuitResponse(
+    return circuit_response(
         circuit,
         "algorithm/qaoa",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
 
 
+@cached("qaoa_tsp")
+@within_budget("qaoa_tsp")
 def generate_tsp_qaoa_circuit(request: TSPQAOAAlgorithmRequest):
     adj_matrix = request.adj_matrix
     p = request.p
     betas = request.betas
     gammas = request.gammas
-    circuit = TSPQAOAAlgorithm.create_circuit(np.array(adj_matrix), p, betas, gammas)
-    return CircuitResponse(
+    circuit = build(
+        TSPQAOAAlgorithm.create_circuit, np.array(adj_matrix), p, betas, gammas
+    )
+    return circuit_response(
         circuit,
         "algorithm/tspqaoa",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
 
 
+@cached("qaoa_knapsack")
+@within_budget("qaoa_knapsack")
 def generate_knapsack_qaoa_circuit(request: KnapsackQAOAAlgorithmRequest):
     items = request.items
     values = [d["value"] for d in items]
@@ -290,26 +332,117 @@ def generate_knapsack_qaoa_circuit(request: KnapsackQAOAAlgorithmRequest):
     p = request.p
     betas = request.betas
     gammas = request.gammas
-    circuit = KnapsackQAOAAlgorithm.create_circuit(
-        values, weights, max_weights, p, betas, gammas
+    circuit = build(
+        KnapsackQAOAAlgorithm.create_circuit,
+        values,
+        weights,
+        max_weights,
+        p,
+        betas,
+        gammas,
     )
-    return CircuitResponse(
+    return circuit_response(
         circuit,
         "algorithm/knapsackqaoa",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
 
 
+def check_sweep_angles(request, reps):
+    """
+    :param request: QAOASweepRequest
+    :param reps: number of repetitions, None to take it from the first angle set
+    :return: number of repetitions, or a bad request response if there are too many angle sets
+             and an unprocessable entity response if the angle sets are empty or ragged
+    """
+    gammas = request.gammas
+    betas = request.betas
+    max_points = current_app.config["QAOA_SWEEP_MAX_POINTS"]
+    if not gammas:
+        return unprocessable_entity("At least one angle set is required.")
+    if len(gammas) > max_points:
+        return bad_request(
+            f"Too many angle sets. A sweep is limited to {max_points} angle sets, you specified {len(gammas)}."
+        )
+    if betas is not None and len(betas) != len(gammas):
+        return unprocessable_entity(
+            f"Number of gamma and beta rows don't match. You specified {len(gammas)} gamma row(s) and {len(betas)} beta row(s)."
+        )
+    if reps is None:
+        reps = len(gammas[0])
+    if reps < 1:
+        return unprocessable_entity("Every angle set needs at least one gamma.")
+    for rows in (gammas, betas or []):
+        for row in rows:
+            if len(row) != reps:
+                return unprocessable_entity(
+                    f"Number of angles and repetitions don't match. Every angle set needs {reps} gamma(s) and beta(s), found a row with {len(row)}."
+                )
+    return reps
+
+
+@within_budget("qaoa_maxcut_sweep")
+def generate_max_cut_qaoa_sweep(request: MaxCutQAOASweepRequest):
+    reps = check_sweep_angles(request, None)
+    if isinstance(reps, Response):
+        return reps
+    if request.initial_state is not None:
+        template = build(
+            MaxCutQAOAWarmStartAlgorithm.getQaoaMaxcutCircuitTemplate,
+            request.adj_matrix,
+            request.initial_state,
+            reps,
+            request.epsilon,
+        )
+    else:
+        template = build(
+            MaxCutQAOAAlgorithm.create_circuit,
+            request.adj_matrix,
+            p=reps,
+            parameterized=True,
+        )
+    return sweep_response(template, "algorithm/qaoa", request, "openqasm")
+
+
+@within_budget("qaoa_sweep")
+def generate_qaoa_sweep(request: QAOASweepAlgorithmRequest):
+    reps = check_sweep_angles(request, None)
+    if isinstance(reps, Response):
+        return reps
+    problem = parse_qaoa_problem(request)
+    if isinstance(problem, Response):
+        return problem
+    initial_state, pauli_op, mixer = problem
+
+    gammas = [Parameter("gamma" + str(i)) for i in range(reps)]
+    betas = None
+    if request.betas is not None:
+        betas = [Parameter("beta" + str(i)) for i in range(reps)]
+    try:
+        template = build(
+            QAOAAlgorithm.create_circuit,
+            initial_state,
+            pauli_op,
+            mixer,
+            reps,
+            gammas,
+            betas,
+        )
+    except (ValueError, CircuitError) as err:
+        return bad_request("Verify correctness of angles and mixer: " + str(err))
+    return sweep_response(template, "algorithm/qaoa", request, "openqasm")
+
+
+@cached("shor_discrete_log")
+@within_budget("shor_discrete_log")
 def generate_shor_discrete_log_circuit(request: ShorDiscreteLogAlgorithmRequest):
-    circuit = ShorDiscreteLog.create_circuit(request.b, request.g, request.p, request.n)
-    return CircuitResponse(
+    circuit = build(
+        ShorDiscreteLog.create_circuit, request.b, request.g, request.p, request.n
+    )
+    return circuit_response(
         circuit,
         "algorithm/shor",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
@@ -22,7 +22,7 @@ class HHLAlgorithm:
         if vector is not None:
             if isinstance(vector, QuantumCircuit):
                 vector_circuit = vector
-            elif isinstance(vector, list):
+            elif isinstance(vector, (list, np.ndarray)):
                 vector_circuit = AmplitudeEncoding.amplitude_encode_vector(vector)
                 vector_circuit.name = "amplitude_enc"
         else:
@@ -1,6 +1,13 @@
+import logging
+
 from qiskit_optimization.applications import Knapsack
 from qiskit_optimization.converters import QuadraticProgramToQubo
-from qiskit.algorithms import QAOA
+from qiskit.circuit.library import QAOAAnsatz
+
+from app.services.algorithms.qaoa_templates import get_template
+from app.services.job_progress import report_progress
+
+logger = logging.getLogger(__name__)
 
 
 class KnapsackQAOAAlgorithm:
@@ -18,26 +25,42 @@ class KnapsackQAOAAlgorithm:
         Creates circuit used in QAOA for the knapsack problem
         """
 
+        template = get_template(
+            ("knapsack", tuple(values), tuple(weights), max_weights, p),
+            lambda: cls.create_template(values, weights, max_weights, p),
+        )
+
+        if betas is None:  # case for custom mixer
+            angles = gammas
+        else:
+            angles = betas + gammas
+
+        return template.assign_parameters(angles)
+
+    @classmethod
+    def create_template(cls, values, weights, max_weights, p):
+        """
+        :return: measured QAOA circuit with the parameters β[0], ..., β[p - 1], γ[0], ..., γ[p - 1]
+        """
         # generate knapsack problem instance
+        report_progress("quadratic program")
         problem = Knapsack(values=values, weights=weights, max_weight=max_weights)
         quadratic_program = problem.to_quadratic_program()
-        print(quadratic_program.prettyprint())
+        logger.debug("Knapsack quadratic program:\n%s", quadratic_program)
 
         # convert to ising model
+        report_progress("ising model")
         converter = QuadraticProgramToQubo()
         operator, offset = converter.convert(quadratic_program).to_ising()
-        print("Number of required Qubits:", operator.num_qubits)
-        print("Offset:", offset)
-
-        if betas is None:  # case for custom mixer
-            angles = gammas
-        else:
-            angles = betas + gammas
-        print("Angles:", angles)
+        logger.debug(
+            "Knapsack ising model with %d qubits and offset %s",
+            operator.num_qubits,
+            offset,
+        )
 
         # generate circuit
-        qaoa = QAOA(reps=p)
-        qaoa_qc = qaoa.construct_circuit(angles, operator)[0]
+        report_progress("circuit")
+        qaoa_qc = QAOAAnsatz(operator, p).decompose()
         qaoa_qc = qaoa_qc.decompose(reps=100)
         qaoa_qc.measure_all()
         return qaoa_qc
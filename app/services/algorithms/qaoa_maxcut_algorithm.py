@@ -1,9 +1,9 @@
 import numpy as np
-from qiskit.algorithms import QAOA
 from qiskit.circuit import Parameter
 from qiskit.quantum_info import Pauli
 from qiskit.opflow import PauliSumOp
 from app.services.algorithms.qaoa_pauliOperator_algorithm import QAOAAlgorithm
+from app.services.algorithms.qaoa_templates import get_template
 
 
 class MaxCutQAOAAlgorithm:
@@ -47,7 +47,15 @@ class MaxCutQAOAAlgorithm:
         """
 
         reps = p or len(betas)
-        operator = cls.create_operator(adj_matrix)
+        # the operator only depends on the edges of the graph, not on their weights
+        weight_matrix = np.array(adj_matrix)
+        edges = tuple(
+            zip(*(index.tolist() for index in np.nonzero(np.tril(weight_matrix, -1))))
+        )
+        template = get_template(
+            ("maxcut", weight_matrix.shape[0], edges, reps),
+            lambda: cls.create_template(adj_matrix, reps),
+        )
 
         if parameterized:
             gammas = []
@@ -59,11 +67,17 @@ class MaxCutQAOAAlgorithm:
         else:
             angles = betas + gammas
 
-        qaoa = QAOA(reps=reps)
-        qaoa_qc = qaoa.construct_circuit(angles, operator)[0]
+        return template.assign_parameters(angles)
 
-        # decompose exp gates
-        qaoa_qc = QAOAAlgorithm.decompose_operator_gates(qaoa_qc)
+    @classmethod
+    def create_template(cls, adj_matrix, reps):
+        """
+        :param adj_matrix: adjacency matrix describing the undirected graph
+        :param reps: number of repetitions
+        :return: measured QAOA circuit with the parameters β[0], ..., β[reps - 1], γ[0], ..., γ[reps - 1]
+        """
+        operator = cls.create_operator(adj_matrix)
+        qaoa_qc = QAOAAlgorithm.create_template(None, operator, None, reps)
         qaoa_qc.measure_all()
 
         return qaoa_qc
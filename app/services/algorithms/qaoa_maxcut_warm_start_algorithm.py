@@ -5,6 +5,8 @@ from qiskit.circuit.parameter import Parameter
 import numpy as np
 from builtins import isinstance
 
+from app.services.algorithms.qaoa_templates import get_template
+
 
 class MaxCutQAOAWarmStartAlgorithm:
     """
@@ -88,10 +90,26 @@ class MaxCutQAOAWarmStartAlgorithm:
         return QAOA
 
     @classmethod
-    def genQaoaMaxcutCircuit(cls, graph, params, initial=None, p=1, epsilon=0.25):
-        template = cls.genQaoaMaxcutCircuitTemplate(
-            graph, initial if initial else None, p=p, epsilon=epsilon
+    def getQaoaMaxcutCircuitTemplate(cls, graph, initial=None, p=1, epsilon=0.25):
+        """
+        :return: cached template of genQaoaMaxcutCircuitTemplate, must not be modified
+        """
+        return get_template(
+            (
+                "maxcut_warm_start",
+                tuple(map(tuple, np.asarray(graph).tolist())),
+                initial,
+                p,
+                epsilon,
+            ),
+            lambda: cls.genQaoaMaxcutCircuitTemplate(
+                graph, initial if initial else None, p=p, epsilon=epsilon
+            ),
         )
+
+    @classmethod
+    def genQaoaMaxcutCircuit(cls, graph, params, initial=None, p=1, epsilon=0.25):
+        template = cls.getQaoaMaxcutCircuitTemplate(graph, initial, p, epsilon)
         return cls.assignParameters(template, params)
 
     @classmethod
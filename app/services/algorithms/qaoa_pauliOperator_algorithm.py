@@ -1,4 +1,10 @@
-from qiskit.algorithms import QAOA
+from qiskit.circuit.library import QAOAAnsatz
+
+from app.services.algorithms.qaoa_templates import (
+    circuit_or_operator_key,
+    get_template,
+    operator_key,
+)
 
 
 class QAOAAlgorithm:
@@ -17,21 +23,38 @@ class QAOAAlgorithm:
         Custom AmplitudeEncoding is used for vector preparation.
         """
 
-        operator = pauli_op
-        qaoa = QAOA(initial_state=initial_state, mixer=mixer, reps=reps)
+        pauli_op_key = operator_key(pauli_op)
+        mixer_key = circuit_or_operator_key(mixer)
+        initial_state_key = circuit_or_operator_key(initial_state)
+        key = (
+            None
+            if pauli_op_key is None or mixer_key is False or initial_state_key is False
+            else ("pauliOperator", pauli_op_key, reps, mixer_key, initial_state_key)
+        )
+        template = get_template(
+            key, lambda: cls.create_template(initial_state, pauli_op, mixer, reps)
+        )
 
         if betas is None:  # case for custom mixer
             angles = gammas
         else:
             angles = betas + gammas
 
-        # print(angles)
-        qaoa_qc = qaoa.construct_circuit(angles, operator)[0]
+        return template.assign_parameters(angles)
 
-        # decompose exp gates
-        qaoa_qc = QAOAAlgorithm.decompose_operator_gates(qaoa_qc)
+    @classmethod
+    def create_template(cls, initial_state, pauli_op, mixer, reps):
+        """
+        Creates the QAOA ansatz with decomposed operator gates, matching QAOA.construct_circuit
+        without computing the expectation value operator
+        :return: circuit with the parameters β[0], ..., β[reps - 1], γ[0], ..., γ[reps - 1]
+        """
+        qaoa_qc = QAOAAnsatz(
+            pauli_op, reps, initial_state=initial_state, mixer_operator=mixer
+        ).decompose()
 
-        return qaoa_qc
+        # decompose exp gates
+        return QAOAAlgorithm.decompose_operator_gates(qaoa_qc)
 
     @classmethod
     def decompose_operator_gates(cls, qaoa_qc):
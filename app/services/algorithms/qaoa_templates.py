@@ -0,0 +1,72 @@
+from qiskit import QuantumCircuit
+from qiskit.opflow import SummedOp
+
+from app.services import builder_pool, metrics_service
+from app.services.cache_service import LRUCache, circuit_hash
+
+templates = LRUCache(max_entries=64)
+
+
+def stats():
+    """
+    :return: counters of the template registry of this process added up with the ones of the
+             builder worker processes, which build the circuits and keep their own registries
+    """
+    totals = templates.stats()
+    for worker_stats in builder_pool.pool.worker_metrics("qaoa_templates"):
+        for name in ("entries", "hits", "misses", "evictions"):
+            totals[name] += worker_stats[name]
+    return totals
+
+
+metrics_service.register("qaoa_templates", stats)
+
+
+def init_app(app):
+    templates.resize(app.config["QAOA_TEMPLATE_CACHE_MAX_ENTRIES"])
+
+
+def get_template(key, build):
+    """
+    Returns the parameterized circuit of a QAOA problem structure, building it only once per structure.
+    Requests that only differ in their angles are served by binding the parameters of the template.
+    :param key: hashable description of the problem structure, None disables caching
+    :param build: callable creating the parameterized circuit
+    :return: parameterized circuit, must not be modified
+    """
+    if key is None:
+        return build()
+    template = templates.get(key)
+    if template is None:
+        template = build()
+        templates.put(key, template)
+    return template
+
+
+def operator_key(operator):
+    """
+    :param operator: opflow operator
+    :return: tuple of (Pauli label, coefficient) pairs or None if the operator has no such representation
+    """
+    try:
+        pauli_op = operator.to_pauli_op()
+        terms = pauli_op.oplist if isinstance(pauli_op, SummedOp) else [pauli_op]
+        coeff = pauli_op.coeff if isinstance(pauli_op, SummedOp) else 1
+        return tuple(
+            (str(term.primitive), complex(coeff * term.coeff)) for term in terms
+        )
+    except Exception:
+        return None
+
+
+def circuit_or_operator_key(value):
+    """
+    :param value: None, QuantumCircuit or opflow operator, e.g., an initial state or a mixer
+    :return: hashable key, None if value is None, False if value cannot be keyed
+    """
+    if value is None:
+        return None
+    if isinstance(value, QuantumCircuit):
+        return "circuit", circuit_hash(value)
+    key = operator_key(value)
+    return False if key is None else ("operator", key)
@@ -1,6 +1,8 @@
 import qiskit
 from itertools import product
 
+from app.services.job_progress import report_progress
+
 
 class TSPQAOAAlgorithm:
     @classmethod
@@ -35,10 +37,12 @@ class TSPQAOAAlgorithm:
             qc.x(i)
 
         for i in range(p):
+            report_progress("qaoa layers", i, p)
             cls.build_phase_separator(qc, adj_matrix, gamma[i], mapping)
             cls.build_mixer(qc, beta[i], mapping, len(adj_matrix))
 
         qc.measure_all()
+        report_progress("transpile")
 
         return qiskit.transpile(qc, optimization_level=3)  # , beta, gamma
 
@@ -1,6 +1,7 @@
 from qiskit import QuantumCircuit, QuantumRegister
 import math
 from .brg_mod_mult import mult_mod_N_c
+from app.services.job_progress import report_progress
 
 
 def mod_exp_brg(n, a, N):
@@ -26,7 +27,9 @@ def mod_exp_brg(n, a, N):
     circ = QuantumCircuit(x_reg, input_reg, name="%d^x MOD(%d)" % (a, N))
 
     for i in range(0, n):
+        report_progress(circ.name, i, n)
         mulgate = mult_mod_N_c(a ** (2**i) % N, N)
         circ.append(mulgate, [x_reg[i]] + list(input_reg))
+    report_progress(circ.name, n, n)
 
     return circ
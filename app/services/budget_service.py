@@ -0,0 +1,328 @@
+import copy
+import math
+import re
+from collections import defaultdict
+from functools import wraps
+from threading import Lock
+
+import numpy as np
+from flask import current_app
+
+from app.services import builder_pool, metrics_service
+from app.services.builder_pool import BudgetExceeded
+from app.services.circuit_serialization import load_circuit
+from app.services.encodings.angle_encoding import DENSE_ROTATION
+from app.services.helper_service import payload_too_large, unprocessable_entity
+from app.services.job_progress import in_job
+
+# Pauli terms like I^Z^Z, one letter per qubit
+PAULI_TERM = re.compile(r"[IXYZ](?:\s*\^\s*[IXYZ])*")
+
+QASM_QREG = re.compile(r"\bqreg\s+\w+\s*\[\s*(\d+)\s*\]")
+QASM_DECLARATION = re.compile(r"(?:^|;)\s*(?:OPENQASM|include|qreg|creg)\b")
+
+
+def _qaoa_gates(n_qubits, n_terms, reps):
+    # per layer: every two-qubit cost term decomposes into cx, rz, cx, the mixer applies one rx per
+    # qubit; plus the initial hadamards and the measurements
+    return reps * (3 * n_terms + n_qubits) + 2 * n_qubits
+
+
+def _dense_qaoa(n_qubits, reps):
+    return {
+        "qubits": n_qubits,
+        "gates": _qaoa_gates(n_qubits, n_qubits * (n_qubits - 1) // 2, reps),
+    }
+
+
+def _vector_qubits(vector):
+    return max(1, math.ceil(math.log2(max(np.size(vector), 1))))
+
+
+def _circuit_size(circuit_string):
+    """
+    :param circuit_string: OpenQASM 2 or QPY string, see load_circuit
+    :return: tuple (qubits, gates) of the circuit; OpenQASM is not parsed, every statement
+             other than a declaration counts as gate
+    """
+    if circuit_string.lstrip().startswith("OPENQASM"):
+        qubits = sum(int(size) for size in QASM_QREG.findall(circuit_string))
+        gates = circuit_string.count(";") - len(
+            QASM_DECLARATION.findall(circuit_string)
+        )
+        return qubits, gates
+    try:
+        circuit = load_circuit(circuit_string)
+    except Exception as err:
+        # reported by the generator
+        raise ValueError(str(err)) from err
+    return circuit.num_qubits, circuit.size()
+
+
+def _pauli_qubits(pauli_op_string):
+    return max(
+        (term.count("^") + 1 for term in PAULI_TERM.findall(pauli_op_string)), default=0
+    )
+
+
+def _estimate_qft(request):
+    n = request.n_qubits
+    # controlled phases, swaps and measurements
+    return {"qubits": n, "gates": n * (n + 1) // 2 + n // 2 + n}
+
+
+def _estimate_basis_encoding(request):
+    bits = request.integral_bits + request.fractional_bits + 1
+    qubits = np.size(request.vector) * bits
+    return {"qubits": qubits, "gates": qubits}
+
+
+def _estimate_angle_encoding(request):
+    size = np.size(request.vector)
+    if request.rotation_axis.lower() == DENSE_ROTATION:
+        return {"qubits": (size + 1) // 2, "gates": size}
+    return {"qubits": size, "gates": size}
+
+
+def _estimate_state_preparation(request):
+    # uniformly controlled rotations need in the order of 2^(n+1) gates
+    qubits = _vector_qubits(request.vector)
+    return {"qubits": qubits, "gates": 2 ** (qubits + 1)}
+
+
+def _estimate_amplitude_encoding(request):
+    if request.indices is None:
+        # approximations are charged like the exact circuit, the angles of all its rotations
+        # are computed before the small ones are pruned
+        return _estimate_state_preparation(request)
+    size = request.size if request.size is not None else max(request.indices) + 1
+    qubits = max(1, (size - 1).bit_length())
+    # per qubit and nonzero value a rotation controlled by the qubits telling the values apart,
+    # in the order of log2 of their number, each decomposed into a few Toffoli gates
+    values = len(request.indices)
+    return {
+        "qubits": qubits,
+        "gates": 4 * values * qubits * max(1, math.ceil(math.log2(values))),
+    }
+
+
+def _estimate_hhl(request):
+    nb = max(1, math.ceil(math.log2(max(len(request.matrix), 1))))
+    # eigenvalue register as chosen by qiskit's HHL, one ancilla
+    nl = max(nb + 1, 3)
+    # phase estimation and its inverse apply the 2^k-th powers of a dense unitary on nb qubits
+    return {
+        "qubits": nb + nl + 1,
+        "gates": 2 * 2**nl * 4**nb + 2 ** (nb + 1),
+    }
+
+
+def _estimate_qpe(request):
+    n = request.n_eval_qubits
+    qubits, gates = (
+        (0, 0) if request.unitary is None else _circuit_size(request.unitary)
+    )
+    # the k-th evaluation qubit controls the unitary repeated 2^k times, then an inverse QFT
+    return {
+        "qubits": n + qubits,
+        "gates": (2**n - 1) * max(gates, 1) + n * (n + 1) // 2 + n,
+    }
+
+
+def _estimate_vqe(request):
+    if request.ansatz is not None:
+        qubits, gates = _circuit_size(request.ansatz)
+    else:
+        # RealAmplitudes with 3 repetitions of linear entanglement
+        qubits = _pauli_qubits(request.observable)
+        gates = 4 * qubits + 3 * (qubits - 1)
+    # basis changes and measurements
+    return {"qubits": qubits, "gates": gates + 2 * qubits}
+
+
+def _estimate_grover(request):
+    qubits, oracle_gates = _circuit_size(request.oracle)
+    state_gates = (
+        qubits
+        if request.initial_state is None
+        else _circuit_size(request.initial_state)[1]
+    )
+    iterations = request.iterations if request.iterations is not None else 1
+    # every iteration applies the oracle, the inverse state preparation, a reflection about
+    # zero with a multi-controlled gate of about 4n gates, and the state preparation
+    return {
+        "qubits": qubits,
+        "gates": state_gates
+        + iterations * (oracle_gates + 2 * state_gates + 4 * qubits),
+    }
+
+
+def _estimate_maxcut(request):
+    adj_matrix = np.asarray(request.adj_matrix)
+    edges = int(np.count_nonzero(np.triu(adj_matrix, 1)))
+    n_qubits = adj_matrix.shape[0]
+    return {
+        "qubits": n_qubits,
+        "gates": _qaoa_gates(n_qubits, edges, request.p),
+    }
+
+
+def _estimate_pauli_qaoa(request):
+    terms = PAULI_TERM.findall(request.pauli_op_string)
+    n_qubits = _pauli_qubits(request.pauli_op_string)
+    # a term with k qubits needs about 2k cx gates and one rz
+    return {
+        "qubits": n_qubits,
+        "gates": request.reps * (2 * n_qubits * len(terms) + n_qubits) + 2 * n_qubits,
+    }
+
+
+def _estimate_tsp(request):
+    # one qubit per city and position
+    return _dense_qaoa(len(request.adj_matrix) ** 2, request.p)
+
+
+def _estimate_knapsack(request):
+    # one qubit per item plus the slack bits of the weight constraint
+    n_qubits = len(request.items) + max(1, int(request.max_weights).bit_length())
+    return _dense_qaoa(n_qubits, request.p)
+
+
+def _estimate_shor(request):
+    m = math.ceil(math.log2(request.p))
+    n = request.n if request.n not in (None, -1) else m
+    # two exponent registers of n qubits sharing a modular exponentiation register of 2m + 2;
+    # each exponentiation applies n controlled modular multiplications, which decompose into
+    # about 50m^3 + 250m gates (fitted for m = 3 to 6), and an inverse QFT
+    return {
+        "qubits": 2 * n + 2 * m + 2,
+        "gates": 2 * n * (50 * m**3 + 250 * m) + n * (n + 1) + 4 * n,
+    }
+
+
+def _sweep(estimate):
+    def estimate_sweep(request):
+        request.p = len(request.gammas[0])
+        request.reps = request.p
+        cost = estimate(request)
+        if not request.parameterized and "gates" in cost:
+            cost["gates"] *= len(request.gammas)
+        return cost
+
+    return estimate_sweep
+
+
+ESTIMATORS = {
+    "hhl": _estimate_hhl,
+    "qft": _estimate_qft,
+    "qpe": _estimate_qpe,
+    "vqe": _estimate_vqe,
+    "grover": _estimate_grover,
+    "basis_encoding": _estimate_basis_encoding,
+    "angle_encoding": _estimate_angle_encoding,
+    "amplitude_encoding": _estimate_amplitude_encoding,
+    "schmidt_decomposition": _estimate_state_preparation,
+    "qaoa": _estimate_pauli_qaoa,
+    "qaoa_maxcut": _estimate_maxcut,
+    "qaoa_tsp": _estimate_tsp,
+    "qaoa_knapsack": _estimate_knapsack,
+    "shor_discrete_log": _estimate_shor,
+}
+
+
+def estimate(endpoint, request):
+    """
+    Cheap estimate of the size of the circuit a request generates, computed from the request only.
+    :param endpoint: name of the generator, see ESTIMATORS
+    :return: dict with the estimated "qubits" and "gates", each may be missing if unknown
+    """
+    estimator = ESTIMATORS.get(endpoint)
+    if endpoint.endswith("_sweep"):
+        estimator = ESTIMATORS.get(endpoint[: -len("_sweep")])
+        estimator = estimator and _sweep(estimator)
+    if estimator is None:
+        return {}
+    try:
+        # estimators work on a shallow copy, the sweep estimator sets the number of repetitions
+        return estimator(copy.copy(request))
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        # invalid requests are reported by the generator itself
+        return {}
+
+
+def budget(endpoint):
+    """
+    :return: the default budget of GENERATION_BUDGETS updated with the one of the endpoint
+    """
+    budgets = current_app.config["GENERATION_BUDGETS"]
+    return dict(budgets["default"], **budgets.get(endpoint, {}))
+
+
+class BudgetStats:
+    """Requests rejected up front and builds aborted at run time per endpoint and resource"""
+
+    def __init__(self):
+        self._counts = defaultdict(lambda: defaultdict(int))
+        self._lock = Lock()
+
+    def record(self, endpoint, outcome):
+        with self._lock:
+            self._counts[endpoint][outcome] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                endpoint: dict(outcomes) for endpoint, outcomes in self._counts.items()
+            }
+
+
+budget_stats = BudgetStats()
+metrics_service.register("budgets", budget_stats.stats)
+
+
+def within_budget(endpoint):
+    """
+    Enforces the budget of an endpoint on a generate_* function: requests whose estimated number
+    of qubits or gates exceeds it are rejected with 413 before building, builds that overrun the
+    wall time or memory budget are aborted with 422. Jobs get max_job_seconds instead of
+    max_seconds. Run time budgets are only enforced if builds run in the builder pool.
+    Builds of the wrapped function also export their circuit for the request, see
+    BuilderPool.exporting.
+    :param endpoint: name of the generator, see GENERATION_BUDGETS and ESTIMATORS
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request):
+            limits = budget(endpoint)
+            cost = estimate(endpoint, request)
+            for resource_name in ("qubits", "gates"):
+                limit = limits.get("max_" + resource_name)
+                value = cost.get(resource_name)
+                if limit is not None and value is not None and value > limit:
+                    budget_stats.record(endpoint, "rejected_" + resource_name)
+                    return payload_too_large(
+                        f"The requested circuit needs about {value} {resource_name}, "
+                        f"more than the budget of {limit} {resource_name}.",
+                        {
+                            "resource": resource_name,
+                            "estimate": value,
+                            "limit": limit,
+                        },
+                    )
+            max_seconds = limits["max_job_seconds" if in_job() else "max_seconds"]
+            try:
+                with builder_pool.pool.limits(
+                    max_seconds, limits.get("max_memory_mb")
+                ), builder_pool.pool.exporting(request):
+                    return func(request)
+            except BudgetExceeded as err:
+                budget_stats.record(endpoint, "aborted_" + err.resource_name)
+                return unprocessable_entity(
+                    f"Generation aborted, the {err}.",
+                    {"resource": err.resource_name, "limit": err.limit},
+                )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,532 @@
+import importlib
+import io
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from contextlib import contextmanager
+from threading import Lock, local
+from types import SimpleNamespace
+
+from qiskit import qpy
+
+from app.services import metrics_service
+from app.services.circuit_metrics import CircuitMetrics
+from app.services.job_progress import in_job, report_progress, running
+
+logger = logging.getLogger(__name__)
+
+# modules imported by every worker process at start, so the first build does not pay for them
+PRELOADED_MODULES = (
+    "qiskit",
+    "app.services.algorithm_service",
+    "app.services.encoding_service",
+)
+
+# seconds between checks whether the job waiting for a task has been cancelled
+# or the task has overrun its budget
+CANCEL_POLL_INTERVAL = 0.2
+
+# minimum seconds between two progress messages of a worker within the same stage
+PROGRESS_INTERVAL = 0.1
+
+# metrics of the caches living in the worker processes, reported together with the ones of the
+# calling process, see worker_metrics
+WORKER_METRICS = ("qaoa_templates",)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class BudgetExceeded(Exception):
+    """Raised if a task overran the wall time or memory budget of the request"""
+
+    def __init__(self, resource_name, limit):
+        super().__init__(f"{resource_name} budget of {limit} exceeded")
+        self.resource_name = resource_name
+        self.limit = limit
+
+
+class WorkerDied(Exception):
+    """Raised if a worker process died while running a task"""
+
+
+def _dump(circuit):
+    buffer = io.BytesIO()
+    qpy.dump(circuit, buffer)
+    return buffer.getvalue()
+
+
+def _load(data):
+    return qpy.load(io.BytesIO(data))[0]
+
+
+def _export_options(request):
+    """
+    :return: the fields of a request export_circuit depends on, so exports can be computed
+             without shipping the whole request to a worker
+    """
+    return SimpleNamespace(
+        circuit_format=request.circuit_format,
+        parameterized=getattr(request, "parameterized", False),
+    )
+
+
+class BuiltCircuit:
+    """
+    Circuit built in a worker process, shipped back as QPY together with its metrics and, if the
+    thread requested it, its export. The QuantumCircuit is only loaded once it is needed, e.g.,
+    to render it or to bind parameters; public attributes other than metrics, metadata and circuit
+    are forwarded to it.
+    """
+
+    def __init__(self, data, metrics, metadata, export_options=None, export=None):
+        self._data = data
+        self._circuit = None
+        self._export_options = export_options
+        self._export = export
+        self.metrics = metrics
+        self.metadata = metadata
+
+    @property
+    def circuit(self):
+        if self._circuit is None:
+            self._circuit = _load(self._data)
+        return self._circuit
+
+    def export(self, request):
+        """
+        :return: the export computed in the worker if it matches the request, otherwise None
+        """
+        if self._export is None or vars(self._export_options) != vars(
+            _export_options(request)
+        ):
+            return None
+        return self._export
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.circuit, name)
+
+
+def as_circuit(circuit):
+    """
+    :param circuit: QuantumCircuit or BuiltCircuit
+    :return: QuantumCircuit
+    """
+    return circuit.circuit if isinstance(circuit, BuiltCircuit) else circuit
+
+
+def metrics(circuit):
+    """
+    :param circuit: QuantumCircuit or BuiltCircuit
+    :return: CircuitMetrics of the circuit, those of a BuiltCircuit were computed in its worker
+    """
+    if isinstance(circuit, BuiltCircuit):
+        return circuit.metrics
+    return CircuitMetrics.from_circuit(circuit)
+
+
+def _export_circuit(circuit, request):
+    # imported here, the circuit_response module uses the pool itself
+    from app.model.circuit_response import export_circuit
+
+    return export_circuit(circuit, request)
+
+
+def _build(builder, args, kwargs, export_options):
+    """
+    Runs a builder in a worker process and measures and, if export_options are given, exports
+    the circuit in the same task.
+    :return: arguments of BuiltCircuit
+    """
+    circuit = builder(*args, **kwargs)
+    export = None
+    if export_options is not None:
+        try:
+            export = _export_circuit(circuit, export_options)
+        except Exception as err:
+            # the calling process exports the circuit itself and reports the error
+            logger.debug("Export in worker failed: %r", err)
+    return (
+        _dump(circuit),
+        CircuitMetrics.from_circuit(circuit),
+        circuit.metadata,
+        export_options if export is not None else None,
+        export,
+    )
+
+
+def _export(data, request):
+    """
+    Exports a circuit in a worker process.
+    :param data: QPY bytes of the circuit
+    :return: circuit string in the format of the request
+    """
+    return _export_circuit(_load(data), request)
+
+
+class _ProgressSender:
+    """Job stand-in of a worker process forwarding the progress reports of builders to the pool"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.stage = None
+        self.sent = 0.0
+
+    def update_progress(self, stage, completed=None, total=None):
+        now = time.monotonic()
+        if (
+            stage == self.stage
+            and completed != total
+            and now - self.sent < PROGRESS_INTERVAL
+        ):
+            return
+        self.stage = stage
+        self.sent = now
+        self.connection.send(("progress", (stage, completed, total)))
+
+
+def _rss_mb(pid):
+    """
+    :return: resident set size of a process in megabytes, None if unknown on this platform
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * PAGE_SIZE / (1024 * 1024)
+
+
+def _serve(connection):
+    """
+    Main loop of a builder worker process.
+    Runs the tasks received over the connection until it is closed.
+    """
+    for module in PRELOADED_MODULES:
+        importlib.import_module(module)
+    connection.send(("ready", None, 0.0))
+
+    while True:
+        try:
+            func, args, forward_progress = connection.recv()
+        except EOFError:
+            return
+        start = time.perf_counter()
+        try:
+            if forward_progress:
+                with running(_ProgressSender(connection)):
+                    result = ("done", func(*args))
+            else:
+                result = ("done", func(*args))
+        except Exception as err:
+            result = ("failed", err)
+        result += (
+            time.perf_counter() - start,
+            metrics_service.collect(WORKER_METRICS),
+        )
+        try:
+            connection.send(result)
+        except Exception:
+            # the exception of the task cannot be pickled
+            connection.send(
+                ("failed", RuntimeError(repr(result[1]))) + result[2:],
+            )
+
+
+class _BuilderWorker:
+    def __init__(self, context):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_serve, args=(child_connection,), daemon=True
+        )
+        self.process.start()
+        child_connection.close()
+        # latest WORKER_METRICS of the process
+        self.metrics = {}
+
+    def stop(self):
+        self.connection.close()
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(1)
+
+
+class BuilderPool:
+    """
+    Pool of worker processes running the CPU-bound circuit builders and exports, so concurrent
+    requests of one service instance are not serialized by the GIL. A build measures the circuit
+    and, within exporting(), exports it in the same task, so the circuit is serialized only once,
+    as QPY, and only loaded by the calling process if it needs the QuantumCircuit itself.
+    Progress reported by builders is forwarded to the job of the calling thread. Idle workers are
+    reused most recently used first, which keeps the caches of warm workers, e.g., of QAOA
+    templates, in use. A worker whose task overruns the wall time budget or grows its resident
+    memory by more than the memory budget (checked on Linux only) is killed and replaced.
+    With processes=0, everything runs in the calling thread and budgets are not enforced.
+    """
+
+    def __init__(self, processes=0, start_method="spawn"):
+        self._lock = Lock()
+        self._idle = queue.LifoQueue()
+        self._workers = set()
+        self._context = multiprocessing.get_context(start_method)
+        self._limits = local()
+        self._export_options = local()
+        self.processes = 0
+        self.waiting = 0
+        self.in_flight = 0
+        self.tasks = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.memory_exceeded = 0
+        self.restarts = 0
+        self.busy_seconds = 0.0
+        self.configure(processes)
+
+    def configure(self, processes):
+        with self._lock:
+            if processes == self.processes:
+                return
+            self._stop_idle()
+            self._idle = queue.LifoQueue()
+            # empty slots, workers are started on first use
+            for _ in range(processes):
+                self._idle.put(None)
+            self.processes = processes
+
+    @contextmanager
+    def limits(self, max_seconds=None, max_memory_mb=None):
+        """
+        Budget of the tasks the current thread runs within the context.
+        :param max_seconds: wall time of all tasks together, None for no limit
+        :param max_memory_mb: megabytes a single task may grow the resident memory of its worker,
+                              None for no limit
+        """
+        previous = getattr(self._limits, "value", None)
+        deadline = None if max_seconds is None else time.monotonic() + max_seconds
+        self._limits.value = (deadline, max_seconds, max_memory_mb)
+        try:
+            yield
+        finally:
+            self._limits.value = previous
+
+    @contextmanager
+    def exporting(self, request):
+        """
+        Circuits the current thread builds within the context are exported for request in
+        their build task. Streamed requests are not exported, they are written chunk by chunk.
+        :param request: request with circuit_format, see export_circuit
+        """
+        previous = getattr(self._export_options, "value", None)
+        self._export_options.value = (
+            _export_options(request)
+            if getattr(request, "stream", None) is None
+            else None
+        )
+        try:
+            yield
+        finally:
+            self._export_options.value = previous
+
+    def _acquire(self, idle):
+        with self._lock:
+            self.waiting += 1
+        try:
+            while True:
+                try:
+                    return idle.get(timeout=CANCEL_POLL_INTERVAL)
+                except queue.Empty:
+                    # raises JobCancelled if the job waiting for a worker was cancelled
+                    report_progress("waiting for a worker process")
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    def _wait(self, worker, stage, limits, baseline=None):
+        """
+        Waits for the result of a worker, reporting stage, or the progress the worker forwards,
+        as progress of the current job.
+        :param limits: deadline, max_seconds and max_memory_mb of the current thread
+        :param baseline: resident memory of the worker in megabytes before the task, None to not
+                         check the memory budget
+        :return: the message of the worker
+        :raise BudgetExceeded: if the task overran the budget
+        """
+        deadline, max_seconds, max_memory_mb = limits
+        progress = (stage,)
+        while True:
+            if worker.connection.poll(CANCEL_POLL_INTERVAL):
+                message = worker.connection.recv()
+                if message[0] != "progress":
+                    return message
+                progress = message[1]
+            elif deadline is not None and time.monotonic() > deadline:
+                with self._lock:
+                    self.timeouts += 1
+                raise BudgetExceeded("time", f"{max_seconds}s")
+            elif max_memory_mb is not None and baseline is not None:
+                rss = _rss_mb(worker.process.pid)
+                if rss is not None and rss - baseline > max_memory_mb:
+                    with self._lock:
+                        self.memory_exceeded += 1
+                    raise BudgetExceeded("memory", f"{max_memory_mb}MB")
+            # raises JobCancelled if the job has been cancelled
+            report_progress(*progress)
+
+    def _discard(self, worker):
+        with self._lock:
+            self._workers.discard(worker)
+        worker.stop()
+
+    def _run(self, func, *args):
+        """
+        Runs func(*args) in a worker process; func, arguments and result must be picklable.
+        While waiting, the job of the calling thread, if any, is checked for cancellation.
+        :raise BudgetExceeded: if the task overran the budget of the current thread
+        :raise WorkerDied: if the worker process died
+        """
+        limits = getattr(self._limits, "value", None) or (None, None, None)
+        idle = self._idle
+        worker = self._acquire(idle)
+        with self._lock:
+            self.in_flight += 1
+        try:
+            if worker is None:
+                worker = _BuilderWorker(self._context)
+                with self._lock:
+                    self._workers.add(worker)
+                # the preloaded modules do not count towards the memory of the first task
+                self._wait(worker, "starting worker process", limits)
+            baseline = _rss_mb(worker.process.pid)
+            worker.connection.send((func, args, in_job()))
+            status, result, seconds, worker.metrics = self._wait(
+                worker, "running in worker process", limits, baseline
+            )
+        except (EOFError, OSError) as err:
+            with self._lock:
+                self.failures += 1
+            raise WorkerDied(f"Builder process died: {err!r}")
+        except BaseException:
+            # the task is still running, stop it
+            if worker is not None:
+                self._discard(worker)
+                worker = None
+                with self._lock:
+                    self.restarts += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            if worker is not None and not worker.process.is_alive():
+                self._discard(worker)
+                worker = None
+                with self._lock:
+                    self.restarts += 1
+            if idle is self._idle:
+                idle.put(worker)
+            elif worker is not None:
+                # the pool was resized in the meantime
+                self._discard(worker)
+
+        with self._lock:
+            self.busy_seconds += seconds
+            if status == "done":
+                self.tasks += 1
+            else:
+                self.failures += 1
+        if status == "failed":
+            raise result
+        return result
+
+    def build(self, builder, *args, **kwargs):
+        """
+        :param builder: module level function or classmethod returning a QuantumCircuit
+        :return: QuantumCircuit returned by builder(*args, **kwargs), as BuiltCircuit if it was
+                 built in a worker process
+        """
+        if self.processes == 0:
+            return builder(*args, **kwargs)
+        export_options = getattr(self._export_options, "value", None)
+        return BuiltCircuit(*self._run(_build, builder, args, kwargs, export_options))
+
+    def export(self, circuit, request):
+        """
+        :param circuit: QuantumCircuit or BuiltCircuit
+        :param request: request with circuit_format, see export_circuit
+        :return: circuit string in the format of the request
+        """
+        if isinstance(circuit, BuiltCircuit):
+            export = circuit.export(request)
+            if export is not None:
+                return export
+            circuit = circuit.circuit
+        if self.processes == 0:
+            return _export_circuit(circuit, request)
+        return self._run(_export, _dump(circuit), _export_options(request))
+
+    def worker_metrics(self, name):
+        """
+        :param name: one of WORKER_METRICS
+        :return: list with the latest metrics of that name of every running worker process
+        """
+        with self._lock:
+            return [
+                worker.metrics[name]
+                for worker in self._workers
+                if name in worker.metrics
+            ]
+
+    def _stop_idle(self):
+        # called with the lock held
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if worker is not None:
+                self._workers.discard(worker)
+                worker.stop()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "in_flight": self.in_flight,
+                # tasks waiting for a free worker process
+                "queue_depth": self.waiting,
+                "tasks": self.tasks,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "memory_exceeded": self.memory_exceeded,
+                "restarts": self.restarts,
+                "busy_seconds": round(self.busy_seconds, 3),
+            }
+
+
+pool = BuilderPool()
+metrics_service.register("builder_pool", pool.stats)
+
+
+def init_app(app):
+    pool.configure(app.config["BUILDER_PROCESSES"])
+    if pool.processes == 0:
+        logger.warning(
+            "BUILDER_PROCESSES is 0: circuits are built in the request threads "
+            "and the time and memory budgets are not enforced"
+        )
+
+
+def build(builder, *args, **kwargs):
+    """
+    Runs a circuit builder in the builder pool, see BuilderPool.build
+    """
+    return pool.build(builder, *args, **kwargs)
+
+
+def export(circuit, request):
+    """
+    Exports a circuit in the builder pool, see BuilderPool.export
+    """
+    return pool.export(circuit, request)
@@ -0,0 +1,325 @@
+import json
+import logging
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Lock
+
+import marshmallow as ma
+from flask import Response
+
+from app.model.algorithm_request import (
+    HHLAlgorithmRequest,
+    HHLAlgorithmRequestSchema,
+    QAOAAlgorithmRequest,
+    QAOAAlgorithmRequestSchema,
+    QFTAlgorithmRequest,
+    QFTAlgorithmRequestSchema,
+    QPEAlgorithmRequest,
+    QPEAlgorithmRequestSchema,
+    VQEAlgorithmRequest,
+    VQEAlgorithmRequestSchema,
+    GroverAlgorithmRequest,
+    GroverAlgorithmRequestSchema,
+    TSPQAOAAlgorithmRequest,
+    TSPQAOAAlgorithmRequestSchema,
+    MaxCutQAOAAlgorithmRequest,
+    MaxCutQAOAAlgorithmRequestSchema,
+    KnapsackQAOAAlgorithmRequest,
+    KnapsackQAOAAlgorithmRequestSchema,
+    ShorDiscreteLogAlgorithmRequest,
+    ShorDiscreteLogAlgorithmRequestSchema,
+    MaxCutQAOASweepRequest,
+    MaxCutQAOASweepRequestSchema,
+    QAOASweepAlgorithmRequest,
+    QAOASweepAlgorithmRequestSchema,
+)
+from app.model.circuit_response import (
+    CircuitResponseSchema,
+    CircuitSweepResponseSchema,
+    HHLResponseSchema,
+    QAOAResponseSchema,
+    QFTResponseSchema,
+    QPEResponseSchema,
+    VQEResponseSchema,
+    GroverResponseSchema,
+    BasisEncodingResponseSchema,
+    AngleEncodingResponseSchema,
+    AmplitudeEncodingResponseSchema,
+    SchmidtDecompositionResponseSchema,
+)
+from app.model.encoding_request import (
+    BasisEncodingRequest,
+    BasisEncodingRequestSchema,
+    AngleEncodingRequest,
+    AngleEncodingRequestSchema,
+    AmplitudeEncodingRequest,
+    AmplitudeEncodingRequestSchema,
+    SchmidtDecompositionRequest,
+    SchmidtDecompositionRequestSchema,
+)
+from app.services import algorithm_service, encoding_service, metrics_service
+from app.services.job_progress import JobCancelled
+
+logger = logging.getLogger(__name__)
+
+Generator = namedtuple(
+    "Generator", ["request_schema", "request_class", "generate", "response_schema"]
+)
+
+# request types of bulk items, named after the path of the corresponding endpoint
+GENERATORS = {
+    "encoding/basis": Generator(
+        BasisEncodingRequestSchema,
+        BasisEncodingRequest,
+        encoding_service.generate_basis_encoding,
+        BasisEncodingResponseSchema,
+    ),
+    "encoding/angle": Generator(
+        AngleEncodingRequestSchema,
+        AngleEncodingRequest,
+        encoding_service.generate_angle_encoding,
+        AngleEncodingResponseSchema,
+    ),
+    "encoding/amplitude": Generator(
+        AmplitudeEncodingRequestSchema,
+        AmplitudeEncodingRequest,
+        encoding_service.generate_amplitude_encoding,
+        AmplitudeEncodingResponseSchema,
+    ),
+    "encoding/schmidt": Generator(
+        SchmidtDecompositionRequestSchema,
+        SchmidtDecompositionRequest,
+        encoding_service.generate_schmidt_decomposition,
+        SchmidtDecompositionResponseSchema,
+    ),
+    "algorithms/hhl": Generator(
+        HHLAlgorithmRequestSchema,
+        HHLAlgorithmRequest,
+        algorithm_service.generate_hhl_circuit,
+        HHLResponseSchema,
+    ),
+    "algorithms/qaoa/pauliOperator": Generator(
+        QAOAAlgorithmRequestSchema,
+        QAOAAlgorithmRequest,
+        algorithm_service.generate_qaoa_circuit,
+        QAOAResponseSchema,
+    ),
+    "algorithms/qaoa/pauliOperator/sweep": Generator(
+        QAOASweepAlgorithmRequestSchema,
+        QAOASweepAlgorithmRequest,
+        algorithm_service.generate_qaoa_sweep,
+        CircuitSweepResponseSchema,
+    ),
+    "algorithms/qft": Generator(
+        QFTAlgorithmRequestSchema,
+        QFTAlgorithmRequest,
+        algorithm_service.generate_qft_circuit,
+        QFTResponseSchema,
+    ),
+    "algorithms/qpe": Generator(
+        QPEAlgorithmRequestSchema,
+        QPEAlgorithmRequest,
+        algorithm_service.generate_qpe_circuit,
+        QPEResponseSchema,
+    ),
+    "algorithms/vqe": Generator(
+        VQEAlgorithmRequestSchema,
+        VQEAlgorithmRequest,
+        algorithm_service.generate_vqe_circuit,
+        VQEResponseSchema,
+    ),
+    "algorithms/grover": Generator(
+        GroverAlgorithmRequestSchema,
+        GroverAlgorithmRequest,
+        algorithm_service.generate_grover_circuit,
+        GroverResponseSchema,
+    ),
+    "algorithms/qaoa/tsp": Generator(
+        TSPQAOAAlgorithmRequestSchema,
+        TSPQAOAAlgorithmRequest,
+        algorithm_service.generate_tsp_qaoa_circuit,
+        CircuitResponseSchema,
+    ),
+    "algorithms/qaoa/maxcut": Generator(
+        MaxCutQAOAAlgorithmRequestSchema,
+        MaxCutQAOAAlgorithmRequest,
+        algorithm_service.generate_max_cut_qaoa_circuit,
+        CircuitResponseSchema,
+    ),
+    "algorithms/qaoa/maxcut/sweep": Generator(
+        MaxCutQAOASweepRequestSchema,
+        MaxCutQAOASweepRequest,
+        algorithm_service.generate_max_cut_qaoa_sweep,
+        CircuitSweepResponseSchema,
+    ),
+    "algorithms/qaoa/knapsack": Generator(
+        KnapsackQAOAAlgorithmRequestSchema,
+        KnapsackQAOAAlgorithmRequest,
+        algorithm_service.generate_knapsack_qaoa_circuit,
+        CircuitResponseSchema,
+    ),
+    "algorithms/shor/discreteLog": Generator(
+        ShorDiscreteLogAlgorithmRequestSchema,
+        ShorDiscreteLogAlgorithmRequest,
+        algorithm_service.generate_shor_discrete_log_circuit,
+        CircuitResponseSchema,
+    ),
+}
+
+
+class ItemError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def load_arguments(request_type, request):
+    """
+    :param request_type: path of the endpoint, see GENERATORS
+    :param request: request body of that endpoint
+    :return: tuple of Generator and validated request arguments
+    :raise ItemError: if the type is unknown or the request is invalid
+    """
+    generator = GENERATORS.get(request_type)
+    if generator is None:
+        raise ItemError(
+            400,
+            "Unknown type " + repr(request_type) + ", one of: " + ", ".join(GENERATORS),
+        )
+    try:
+        arguments = generator.request_schema().load(request or {})
+    except ma.ValidationError as err:
+        raise ItemError(422, err.messages)
+    if arguments.get("stream") is not None:
+        raise ItemError(400, "stream is not supported for bulk items and jobs")
+    return generator, arguments
+
+
+def generate(generator, arguments):
+    """
+    :param generator: Generator returned by load_arguments
+    :param arguments: request arguments returned by load_arguments
+    :return: serialized response
+    :raise ItemError: if the generation fails
+    """
+    try:
+        result = generator.generate(generator.request_class(**arguments))
+    except JobCancelled:
+        raise
+    except Exception as err:
+        logger.exception("Generating %s failed", generator.request_class.__name__)
+        raise ItemError(500, repr(err))
+    if isinstance(result, Response):
+        raise ItemError(result.status_code, result.get_json()["message"])
+    return generator.response_schema().dump(result)
+
+
+def run_item(line, text):
+    """
+    Generates the circuit of a single bulk item.
+    :param line: line number of the item in the input
+    :param text: JSON object with the fields type, request and an optional id that is echoed in the result
+    :return: dict with line, id, status and either response or error
+    """
+    item_id = None
+    try:
+        try:
+            item = json.loads(text)
+        except ValueError as err:
+            raise ItemError(400, "Invalid JSON: " + str(err))
+        if not isinstance(item, dict):
+            raise ItemError(400, "Items must be JSON objects")
+        item_id = item.get("id")
+        response = generate(*load_arguments(item.get("type"), item.get("request")))
+    except ItemError as err:
+        return {"line": line, "id": item_id, "status": err.status, "error": err.message}
+    return {"line": line, "id": item_id, "status": 200, "response": response}
+
+
+class BulkRunner:
+    """
+    Fans the items of a batch out over a pool of worker threads and yields their results
+    as they complete. At most max_pending items are read ahead of the finished ones,
+    so batches of any size run in constant memory.
+    """
+
+    def __init__(self, workers=4, max_pending=64):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = Lock()
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+
+    def configure(self, workers, max_pending):
+        with self._lock:
+            if workers != self.workers and self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self.workers = workers
+            self.max_pending = max_pending
+
+    def _submit(self, app, line, text):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bulk"
+                )
+            return self._executor.submit(self._run, app, line, text)
+
+    def _run(self, app, line, text):
+        with app.app_context():
+            result = run_item(line, text)
+        with self._lock:
+            self.items += 1
+            if result["status"] != 200:
+                self.errors += 1
+        return result
+
+    def run(self, app, lines):
+        """
+        :param app: Flask application whose configuration the workers use
+        :param lines: iterable of NDJSON lines (str or bytes), blank lines are skipped
+        :return: generator of result dicts in completion order, see run_item
+        """
+        with self._lock:
+            self.batches += 1
+        pending = set()
+        for line, text in enumerate(lines, start=1):
+            if not text.strip():
+                continue
+            pending.add(self._submit(app, line, text))
+            if len(pending) >= self.max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "batches": self.batches,
+            "items": self.items,
+            "errors": self.errors,
+        }
+
+
+runner = BulkRunner()
+metrics_service.register("bulk", runner.stats)
+
+
+def init_app(app):
+    runner.configure(app.config["BULK_WORKERS"], app.config["BULK_MAX_PENDING"])
+
+
+def ndjson_results(app, lines):
+    """
+    :return: generator of NDJSON result lines for the given input lines
+    """
+    for result in runner.run(app, lines):
+        yield json.dumps(result, default=str) + "\n"
@@ -0,0 +1,141 @@
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+from qiskit.circuit.library import get_standard_gate_name_mapping
+
+STANDARD_GATES = get_standard_gate_name_mapping()
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by the number of entries and,
+    optionally, by the total size of the values as reported to put().
+    Keeps hit, miss and eviction counters for monitoring.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        :param key: cache key
+        :return: cached value or None on a miss
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, size=0):
+        """
+        :param key: cache key
+        :param value: value to cache
+        :param size: size of the value in bytes, counted against max_bytes
+        """
+        with self._lock:
+            self._bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def pop(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._bytes -= self._sizes.pop(key)
+
+    def resize(self, max_entries, max_bytes=None):
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            key, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def _param_repr(param):
+    if isinstance(param, np.ndarray):
+        return hashlib.sha256(np.ascontiguousarray(param).tobytes()).hexdigest()
+    return repr(param)
+
+
+def _is_standard(operation):
+    standard = STANDARD_GATES.get(operation.name)
+    return standard is not None and type(standard) is type(operation)
+
+
+def _update_digest(digest, circuit):
+    qubit_indices = {bit: index for index, bit in enumerate(circuit.qubits)}
+    clbit_indices = {bit: index for index, bit in enumerate(circuit.clbits)}
+    for register in circuit.qregs + circuit.cregs:
+        digest.update(f"reg {register.name} {register.size};".encode())
+    digest.update(f"phase {circuit.global_phase!r};".encode())
+    for instruction in circuit.data:
+        operation = instruction.operation
+        digest.update(
+            "{} {} ({}) {} {} {};".format(
+                operation.name,
+                operation.label,
+                ",".join(_param_repr(param) for param in operation.params),
+                [qubit_indices[qubit] for qubit in instruction.qubits],
+                [clbit_indices[clbit] for clbit in instruction.clbits],
+                getattr(operation, "condition", None),
+            ).encode()
+        )
+        # custom gates with the same name may have different bodies
+        definition = None if _is_standard(operation) else operation.definition
+        if definition is not None:
+            digest.update(b"{")
+            _update_digest(digest, definition)
+            digest.update(b"}")
+
+
+def circuit_hash(circuit):
+    """
+    Computes a canonical hash of the registers and instructions of a circuit.
+    Circuits that contain the same instructions on the same bits get the same hash.
+    Instructions other than the standard gates are hashed with their definitions.
+    :param circuit: QuantumCircuit
+    :return: hex digest
+    """
+    digest = hashlib.sha256()
+    _update_digest(digest, circuit)
+    return digest.hexdigest()
@@ -0,0 +1,73 @@
+from collections import Counter
+
+from qiskit.circuit import Clbit
+
+
+class CircuitMetrics:
+    """
+    Size metrics of a circuit, computed in a single pass over its instructions.
+    depth matches QuantumCircuit.depth(), i.e., directives such as barriers are ignored
+    and conditional operations act on all bits of their condition.
+    """
+
+    def __init__(
+        self, n_qubits, width, depth, size, gate_counts, two_qubit_gates, n_parameters
+    ):
+        self.n_qubits = n_qubits
+        self.width = width
+        self.depth = depth
+        self.size = size
+        self.gate_counts = gate_counts
+        self.two_qubit_gates = two_qubit_gates
+        self.n_parameters = n_parameters
+
+    @classmethod
+    def from_circuit(cls, circuit):
+        """
+        :param circuit: QuantumCircuit to measure
+        :return: CircuitMetrics of the circuit
+        """
+        bit_indices = {
+            bit: index for index, bit in enumerate(circuit.qubits + circuit.clbits)
+        }
+        levels = [0] * len(bit_indices)
+        gate_counts = Counter()
+        size = 0
+        two_qubit_gates = 0
+
+        for instruction in circuit.data:
+            operation = instruction.operation
+            gate_counts[operation.name] += 1
+            directive = getattr(operation, "_directive", False)
+            if not directive:
+                size += 1
+                if len(instruction.qubits) == 2:
+                    two_qubit_gates += 1
+
+            indices = [bit_indices[bit] for bit in instruction.qubits]
+            indices += [bit_indices[bit] for bit in instruction.clbits]
+            level = max((levels[index] for index in indices), default=0)
+            if indices and not directive:
+                level += 1
+            condition = getattr(operation, "condition", None)
+            if condition:
+                condition_bits = (
+                    [condition[0]] if isinstance(condition[0], Clbit) else condition[0]
+                )
+                for bit in condition_bits:
+                    index = bit_indices[bit]
+                    if index not in indices:
+                        indices.append(index)
+                        level = max(level, levels[index] + 1)
+            for index in indices:
+                levels[index] = level
+
+        return cls(
+            n_qubits=circuit.num_qubits,
+            width=len(bit_indices),
+            depth=max(levels, default=0),
+            size=size,
+            gate_counts=dict(gate_counts),
+            two_qubit_gates=two_qubit_gates,
+            n_parameters=circuit.num_parameters,
+        )
@@ -0,0 +1,114 @@
+import base64
+import binascii
+import io
+import zlib
+
+from qiskit import QuantumCircuit, qpy
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+# circuit_format values producing base64 encoded QPY, mapped to their compression
+QPY_FORMATS = {"qpy": None, "qpy+zlib": "zlib", "qpy+zstd": "zstd"}
+
+QPY_MAGIC = b"QISKIT"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# compressed QPY inputs are rejected if they decompress to more bytes
+MAX_DECOMPRESSED_BYTES = 256 * 1024 * 1024
+DECOMPRESSION_CHUNK_BYTES = 1024 * 1024
+
+
+def compression_available(compression):
+    return compression != "zstd" or zstandard is not None
+
+
+def dump_qpy(circuit, compression=None):
+    """
+    :param circuit: QuantumCircuit to serialize
+    :param compression: None, zlib or zstd
+    :return: base64 encoded (and optionally compressed) QPY bytes
+    """
+    buffer = io.BytesIO()
+    qpy.dump(circuit, buffer)
+    data = buffer.getvalue()
+    if compression == "zlib":
+        data = zlib.compress(data)
+    elif compression == "zstd":
+        data = zstandard.ZstdCompressor().compress(data)
+    return base64.b64encode(data).decode()
+
+
+def _too_large():
+    return ValueError(
+        f"compressed QPY must not decompress to more than {MAX_DECOMPRESSED_BYTES} bytes"
+    )
+
+
+def _zlib_decompress(data):
+    decompressor = zlib.decompressobj()
+    data = decompressor.decompress(data, MAX_DECOMPRESSED_BYTES)
+    if decompressor.unconsumed_tail:
+        raise _too_large()
+    return data
+
+
+def _zstd_decompress(data):
+    reader = zstandard.ZstdDecompressor().stream_reader(data)
+    chunks, size = [], 0
+    while True:
+        chunk = reader.read(DECOMPRESSION_CHUNK_BYTES)
+        if not chunk:
+            return b"".join(chunks)
+        size += len(chunk)
+        if size > MAX_DECOMPRESSED_BYTES:
+            raise _too_large()
+        chunks.append(chunk)
+
+
+def _decode_qpy(circuit_string):
+    """
+    :return: raw QPY bytes or None if the string is not base64 encoded (compressed) QPY
+    :raise ValueError: if the compressed QPY is larger than MAX_DECOMPRESSED_BYTES
+    """
+    try:
+        data = base64.b64decode(circuit_string, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    if data.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("zstd compressed QPY requires the zstandard package")
+        try:
+            data = _zstd_decompress(data)
+        except zstandard.ZstdError:
+            return None
+    elif not data.startswith(QPY_MAGIC):
+        try:
+            data = _zlib_decompress(data)
+        except zlib.error:
+            return None
+    return data if data.startswith(QPY_MAGIC) else None
+
+
+def is_qpy(circuit_string):
+    return _decode_qpy(circuit_string.strip()) is not None
+
+
+def load_circuit(circuit_string):
+    """
+    Parses a circuit given as OpenQASM 2 string or as base64 encoded, optionally compressed, QPY
+    :param circuit_string: OpenQASM 2 or QPY string
+    :return: QuantumCircuit
+    """
+    if circuit_string.lstrip().startswith("OPENQASM"):
+        return QuantumCircuit.from_qasm_str(circuit_string)
+    data = _decode_qpy(circuit_string.strip())
+    if data is None:
+        # let the OpenQASM parser report what is wrong with the string
+        return QuantumCircuit.from_qasm_str(circuit_string)
+    circuits = qpy.load(io.BytesIO(data))
+    if len(circuits) != 1:
+        raise ValueError("QPY payload must contain exactly one circuit")
+    return circuits[0]
@@ -0,0 +1,167 @@
+import json
+import re
+
+import numpy as np
+from flask import Response
+from qiskit.circuit import ClassicalRegister, Clbit, ParameterExpression
+
+STREAM_MIMETYPES = {"qasm": "text/plain", "ndjson": "application/x-ndjson"}
+
+QASM2_HEADER = 'OPENQASM 2.0;\ninclude "qelib1.inc";\n'
+# gate or opaque statement, split into keyword, gate name and the remainder
+QASM2_DEFINITION_PATTERN = re.compile(r"^(gate|opaque) (\w+)(.*)$")
+# gate name of an instruction statement, optionally preceded by a condition
+QASM2_CALL_PATTERN = re.compile(r"^((?:if\([^)]*\) )?)(\w+)")
+IDENTIFIER_PATTERN = re.compile(r"\b[A-Za-z_]\w*\b")
+
+
+def _split(circuit, chunk_size):
+    """
+    :return: generator of circuits with the registers of circuit and at most chunk_size of its instructions
+    """
+    for start in range(0, max(len(circuit.data), 1), chunk_size):
+        chunk = circuit.copy_empty_like()
+        for instruction in circuit.data[start : start + chunk_size]:
+            chunk._append(instruction)
+        yield chunk
+
+
+class _Qasm2GateDefinitions:
+    """
+    Gate definitions emitted so far. Every chunk is exported on its own, so the same gate name
+    may refer to different definitions in different chunks; such gates are renamed.
+    """
+
+    def __init__(self):
+        self._by_name = {}
+        self._by_definition = {}
+
+    def merge(self, definitions):
+        """
+        :param definitions: gate and opaque statements of a chunk
+        :return: tuple (statements not emitted before, renames to apply to the chunk)
+        """
+        new_definitions = []
+        renames = {}
+        for definition in definitions:
+            keyword, name, rest = QASM2_DEFINITION_PATTERN.match(definition).groups()
+            if renames:
+                rest = IDENTIFIER_PATTERN.sub(
+                    lambda match: renames.get(match.group(0), match.group(0)), rest
+                )
+            previous = self._by_name.get(name)
+            if previous == (keyword, rest):
+                continue
+            known_name = self._by_definition.get((keyword, rest))
+            if known_name is not None:
+                renames[name] = known_name
+                continue
+            if previous is not None:
+                suffix = 1
+                while f"{name}_{suffix}" in self._by_name:
+                    suffix += 1
+                renames[name] = name = f"{name}_{suffix}"
+            self._by_name[name] = (keyword, rest)
+            self._by_definition[(keyword, rest)] = name
+            new_definitions.append(f"{keyword} {name}{rest}")
+        return new_definitions, renames
+
+
+def qasm2_chunks(circuit, chunk_size=1000):
+    """
+    Exports a circuit as OpenQASM 2 in pieces of at most chunk_size instructions,
+    so that the complete document is never held in memory.
+    :param circuit: QuantumCircuit without free parameters
+    :param chunk_size: number of instructions exported at once
+    :return: generator of OpenQASM 2 strings
+    """
+    gate_definitions = _Qasm2GateDefinitions()
+    yield QASM2_HEADER
+    for index, chunk in enumerate(_split(circuit, chunk_size)):
+        definitions, registers, statements = [], [], []
+        for line in chunk.qasm().splitlines()[2:]:
+            if line.startswith(("gate ", "opaque ")):
+                definitions.append(line)
+            elif line.startswith(("qreg ", "creg ")):
+                registers.append(line)
+            else:
+                statements.append(line)
+        definitions, renames = gate_definitions.merge(definitions)
+        if renames:
+            statements = [
+                QASM2_CALL_PATTERN.sub(
+                    lambda match: match.group(1)
+                    + renames.get(match.group(2), match.group(2)),
+                    statement,
+                )
+                for statement in statements
+            ]
+        lines = definitions + (registers if index == 0 else []) + statements
+        yield "".join(line + "\n" for line in lines)
+
+
+def _json_value(value):
+    if isinstance(value, ParameterExpression):
+        try:
+            return float(value)
+        except TypeError:
+            return str(value)
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, complex):
+        return [value.real, value.imag]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def ndjson_chunks(circuit, header, chunk_size=1000):
+    """
+    Exports a circuit as newline delimited JSON: a header object followed by one object per instruction
+    :param circuit: QuantumCircuit to export
+    :param header: dict written as first line
+    :param chunk_size: number of instructions serialized at once
+    :return: generator of NDJSON strings
+    """
+    qubit_indices = {bit: index for index, bit in enumerate(circuit.qubits)}
+    clbit_indices = {bit: index for index, bit in enumerate(circuit.clbits)}
+    header = dict(
+        header,
+        qregs=[{"name": reg.name, "size": reg.size} for reg in circuit.qregs],
+        cregs=[{"name": reg.name, "size": reg.size} for reg in circuit.cregs],
+        global_phase=_json_value(circuit.global_phase),
+    )
+    yield json.dumps(header) + "\n"
+    for start in range(0, len(circuit.data), chunk_size):
+        lines = []
+        for instruction in circuit.data[start : start + chunk_size]:
+            operation = instruction.operation
+            line = {
+                "name": operation.name,
+                "params": _json_value(operation.params),
+                "qubits": [qubit_indices[bit] for bit in instruction.qubits],
+                "clbits": [clbit_indices[bit] for bit in instruction.clbits],
+            }
+            condition = getattr(operation, "condition", None)
+            if condition:
+                target, value = condition
+                if isinstance(target, Clbit):
+                    target = clbit_indices[target]
+                elif isinstance(target, ClassicalRegister):
+                    target = target.name
+                line["condition"] = [target, value]
+            lines.append(json.dumps(line) + "\n")
+        yield "".join(lines)
+
+
+def stream_response(chunks, stream):
+    """
+    :param chunks: generator of strings
+    :param stream: qasm or ndjson
+    :return: chunked Response emitting the strings as they are produced
+    """
+    return Response(chunks, mimetype=STREAM_MIMETYPES[stream])
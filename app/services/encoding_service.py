@@ -8,7 +8,10 @@ from app.services.encodings.schmidt_decomposition import (
     Measurement,
 )
 from app.services.helper_service import bad_request
-from app.model.circuit_response import CircuitResponse
+from app.services.generation_cache import cached
+from app.services.budget_service import within_budget
+from app.services.builder_pool import build
+from app.model.circuit_response import CircuitResponse, circuit_response
 
 from app.model.encoding_request import (
     SchmidtDecompositionRequest,
@@ -18,67 +21,103 @@ from app.model.encoding_request import (
 )
 
 
+@cached("basis_encoding")
+@within_budget("basis_encoding")
 def generate_basis_encoding(request: BasisEncodingRequest):
     vector = request.vector
     n_integral_bits = request.integral_bits
     n_fractional_bits = request.fractional_bits
     vector = vector if isinstance(vector, list) else [vector]
-    circuit = BasisEncoding.basis_encode_list_subcircuit(
-        vector, n_integral_bits, n_fractional_bits
+    circuit = build(
+        BasisEncoding.basis_encode_list_subcircuit,
+        vector,
+        n_integral_bits,
+        n_fractional_bits,
     )
 
-    return CircuitResponse(
+    return circuit_response(
         circuit,
         "encoding/basis",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
 
 
+@cached("angle_encoding")
+@within_budget("angle_encoding")
 def generate_angle_encoding(request: AngleEncodingRequest):
     vector = request.vector
     rotation_axis = request.rotation_axis
-    circuit = AngleEncoding.angle_encode_vector(vector, rotation_axis)
+    circuit = build(AngleEncoding.angle_encode_vector, vector, rotation_axis)
 
-    return CircuitResponse(
+    return circuit_response(
         circuit,
         "encoding/angle",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
 
 
+@cached("amplitude_encoding")
+@within_budget("amplitude_encoding")
 def generate_amplitude_encoding(request: AmplitudeEncodingRequest):
     vector = request.vector
-    circuit = AmplitudeEncoding.amplitude_encode_vector(vector)
-    return CircuitResponse(
+    if not np.any(vector):
+        return bad_request("Invalid vector input! Vector must not be zero")
+
+    approximation = request.approximation
+    if approximation is not None and len(approximation) != 1:
+        return bad_request(
+            "Invalid approximation input! Set either threshold or fidelity"
+        )
+
+    if request.indices is None:
+        circuit = build(
+            AmplitudeEncoding.amplitude_encode_vector, vector, approximation
+        )
+    elif approximation is not None:
+        return bad_request("Invalid input! Sparse vectors cannot be approximated")
+    else:
+        indices = request.indices
+        size = request.size if request.size is not None else max(indices) + 1
+        if len(indices) != len(vector):
+            return bad_request(
+                "Invalid indices input! Indices and vector must have the same length"
+            )
+        if len(set(indices)) != len(indices):
+            return bad_request("Invalid indices input! Indices must be unique")
+        if min(indices) < 0 or max(indices) >= size:
+            return bad_request(
+                "Invalid indices input! Indices must be in the range 0 to size - 1"
+            )
+        circuit = build(
+            AmplitudeEncoding.amplitude_encode_sparse, indices, vector, size
+        )
+    response = circuit_response(
         circuit,
         "encoding/amplitude",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
+    if isinstance(response, CircuitResponse):
+        response.approximation = (circuit.metadata or {}).get("approximation")
+    return response
 
 
+@cached("schmidt_decomposition")
+@within_budget("schmidt_decomposition")
 def generate_schmidt_decomposition(request: SchmidtDecompositionRequest):
     vector = request.vector
 
     if np.log2(len(vector)) % 1 != 0:
         return bad_request("Invalid vector input! Vector must be of length 2^n")
 
-    circuit = generate_schmidt_decomposition_from_array(
-        vector, Measurement.noMeasurement
+    circuit = build(
+        generate_schmidt_decomposition_from_array, vector, Measurement.noMeasurement
     )
-    return CircuitResponse(
+    return circuit_response(
         circuit,
         "encoding/schmidt",
-        circuit.num_qubits,
-        circuit.depth(),
         request,
         circuit_language="openqasm",
     )
@@ -1,5 +1,8 @@
-from qiskit import QuantumRegister
-from qiskit.circuit.quantumcircuit import QuantumCircuit
+from app.services.encodings.mottonen_state_preparation import (
+    approximate_state_preparation,
+    mottonen_state_preparation,
+    sparse_state_preparation,
+)
 import numpy as np
 
 
@@ -10,9 +13,10 @@ class AmplitudeEncoding:
         Fill up with "fill_up_with" to match dimension of n_qubits ** 2
         Normalize data to length |a| ** 2 = 1
         """
+        vector = np.asarray(vector)
         if fill_up_with is not None and len(vector) < 2**n_qubits:
-            filler = [fill_up_with] * (2**n_qubits - len(vector))
-            vector = vector + filler
+            filler = np.full(2**n_qubits - len(vector), fill_up_with)
+            vector = np.concatenate((vector, filler))
 
         # normalize
         norm = np.sum(np.abs(vector) ** 2)
@@ -20,21 +24,42 @@ class AmplitudeEncoding:
         return vector
 
     @classmethod
-    def amplitude_encode_vector(cls, vector):
+    def n_qubits(cls, size):
+        # ceil(log2(size)), exact for sizes beyond the float precision
+        return (int(size) - 1).bit_length()
+
+    @classmethod
+    def amplitude_encode_vector(cls, vector, approximation=None):
         """
         :param vector: input vector containing floats to encode
-        :return: OpenQASM Circuit
+        :param approximation: dict with the threshold below which rotation angles are left out, or
+                              the fidelity the prepared state has to keep, see
+                              approximate_state_preparation
+        :return: OpenQASM Circuit preparing the normalized vector from |0...0> with
+                 RY, RZ and CNOT gates, see mottonen_state_preparation
         """
 
-        n_qubits = (
-            int(np.log2(len(vector)))
-            if np.log2(len(vector)) % 1 == 0
-            else int(np.log2(len(vector))) + 1
-        )
+        n_qubits = cls.n_qubits(len(vector))
         vector = cls.preprocess(vector=vector, n_qubits=n_qubits, fill_up_with=0)
 
-        q = QuantumRegister(n_qubits)
-        encoding_subcircuit = QuantumCircuit(q)
-        encoding_subcircuit.initialize(vector, [q[i] for i in range(n_qubits)])
+        if approximation:
+            return approximate_state_preparation(
+                vector, approximation.get("threshold"), approximation.get("fidelity")
+            )
+        return mottonen_state_preparation(vector)
+
+    @classmethod
+    def amplitude_encode_sparse(cls, indices, values, size):
+        """
+        :param indices: unique indices of the nonzero entries of the vector
+        :param values: floats at these indices
+        :param size: length of the vector
+        :return: OpenQASM Circuit preparing the normalized vector from |0...0> with
+                 RY, X and multi-controlled X gates, see sparse_state_preparation
+        """
+        order = np.argsort(indices)
+        indices = np.asarray(indices)[order]
+        values = np.asarray(values, dtype=float)[order]
+        values = values / np.linalg.norm(values)
 
-        return encoding_subcircuit
+        return sparse_state_preparation(indices, values, cls.n_qubits(size))
@@ -1,28 +1,61 @@
+import numpy as np
 from qiskit import QuantumRegister
+from qiskit.circuit.library import RXGate, RYGate, RZGate
 from qiskit.circuit.quantumcircuit import QuantumCircuit
 from builtins import Exception
 
+ROTATIONS = {"x": RXGate, "y": RYGate, "z": RZGate}
+
+# rotation_axis of the dense encoding with two features per qubit
+DENSE_ROTATION = "yz"
+
 
 class AngleEncoding:
     @classmethod
     def angle_encode_vector(cls, vector, rotation="y"):
         """
         :param vector: input vector containing floats to encode
-        :rotation string: x, y, or z to indicate which rotation shall be applied
+        :rotation string: x, y, or z to indicate which rotation shall be applied,
+                          or yz for the dense encoding, see dense_angle_encode_vector
         :return: OpenQASM Circuit
         """
+        rotation = rotation.lower()
+        if rotation == DENSE_ROTATION:
+            return cls.dense_angle_encode_vector(vector)
+        if rotation not in ROTATIONS:
+            raise Exception("Invalid rotation.")
 
-        q = QuantumRegister(len(vector))
+        angles = 2 * np.asarray(vector, dtype=float).ravel()
+        q = QuantumRegister(len(angles))
         encoding_subcircuit = QuantumCircuit(q)
+        cls.append_rotations(encoding_subcircuit, ROTATIONS[rotation], angles, q)
 
-        for i, value in enumerate(vector):
-            if rotation.lower() == "x":
-                encoding_subcircuit.rx(2 * value, i)
-            elif rotation.lower() == "y":
-                encoding_subcircuit.ry(2 * value, i)
-            elif rotation.lower() == "z":
-                encoding_subcircuit.rz(2 * value, i)
-            else:
-                raise Exception("Invalid rotation.")
+        return encoding_subcircuit
+
+    @classmethod
+    def dense_angle_encode_vector(cls, vector):
+        """
+        Encodes two features per qubit, the first by an RY and the second by a following RZ
+        rotation, halving the number of qubits. An odd last feature gets only the RY rotation.
+        :param vector: input vector containing floats to encode
+        :return: OpenQASM Circuit
+        """
+        angles = 2 * np.asarray(vector, dtype=float).ravel()
+        q = QuantumRegister((len(angles) + 1) // 2)
+        encoding_subcircuit = QuantumCircuit(q)
+        cls.append_rotations(encoding_subcircuit, RYGate, angles[0::2], q)
+        cls.append_rotations(encoding_subcircuit, RZGate, angles[1::2], q)
 
         return encoding_subcircuit
+
+    @staticmethod
+    def append_rotations(circuit, gate, angles, qubits):
+        """
+        Appends one rotation per angle to the corresponding qubit in a single pass,
+        skipping the argument broadcasting of the QuantumCircuit gate methods.
+        :param gate: rotation gate class
+        :param angles: array of rotation angles, at most one per qubit
+        :param qubits: qubits of the circuit
+        """
+        for qubit, angle in zip(qubits, angles.tolist()):
+            circuit._append(gate(angle), (qubit,), ())
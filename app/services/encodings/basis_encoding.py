@@ -1,5 +1,10 @@
+import numpy as np
+from qiskit.circuit.library import XGate
 from qiskit.circuit.quantumcircuit import QuantumCircuit
 
+# bits extracted at once from a float64, which represents integers up to 2^53 exactly
+CHUNK_BITS = 52
+
 
 class BasisEncoding:
     # returns binary string for basis encoding
@@ -71,6 +76,82 @@ class BasisEncoding:
             integralString = "1" * precision
         return integralString
 
+    @classmethod
+    def basis_encode_array(cls, array, n_integralbits, n_fractional_part):
+        """
+        Computes the basis encodings of a whole array at once, bit-for-bit identical to basis_encode_list
+        for floats and for ints up to 2^53: the integral part saturates to all ones if it needs more bits
+        than its precision, negative numbers get only their sign and integral bits.
+        :param array: array-like of decimal numbers
+        :param n_integralbits: Precision of the integral part of the number
+        :param n_fractional_part: Precision of the fractional part of the number
+        :return: uint8 array of shape (len(array), 1 + n_integralbits + n_fractional_part) holding the sign,
+                 integral and fractional bits of every number
+        """
+        values = np.asarray(array, dtype=float).ravel()
+        if not np.isfinite(values).all():
+            raise ValueError("Cannot basis encode infinite or NaN values")
+        negative = values < 0
+        integral = np.trunc(np.abs(values))
+        # numbers encoded by their sign and integral bits only keep a fractional part of 0
+        fractional = np.where(negative, 0.0, values - np.trunc(values))
+
+        integral_bits = cls._integer_bits(integral, n_integralbits)
+        with np.errstate(over="ignore"):
+            # integral parts needing more bits than the precision saturate to all ones
+            integral_bits[integral >= np.ldexp(1.0, n_integralbits)] = 1
+        return np.hstack(
+            (
+                negative[:, None].astype(np.uint8),
+                integral_bits,
+                cls._fraction_bits(fractional, n_fractional_part),
+            )
+        )
+
+    @staticmethod
+    def _chunk_bits(chunk, width):
+        """
+        :param chunk: integer valued floats below 2^width
+        :return: uint8 array with the width bits of every value, most significant bit first
+        """
+        shifts = np.arange(width - 1, -1, -1, dtype=np.uint64)
+        return ((chunk.astype(np.uint64)[:, None] >> shifts) & 1).astype(np.uint8)
+
+    @classmethod
+    def _integer_bits(cls, values, precision):
+        """
+        :param values: non-negative integer valued floats
+        :return: uint8 array with the lowest precision bits of every value, most significant bit first
+        """
+        bits = np.zeros((len(values), precision), dtype=np.uint8)
+        position = precision
+        while position > 0 and values.any():
+            width = min(CHUNK_BITS, position)
+            # fmod and the division by a power of two are exact
+            chunk = np.fmod(values, np.ldexp(1.0, width))
+            values = np.ldexp(values - chunk, -width)
+            bits[:, position - width : position] = cls._chunk_bits(chunk, width)
+            position -= width
+        return bits
+
+    @classmethod
+    def _fraction_bits(cls, fractions, precision):
+        """
+        :param fractions: floats in [0, 1)
+        :return: uint8 array with the first precision bits after the binary point, as get_fractional_part
+        """
+        bits = np.zeros((len(fractions), precision), dtype=np.uint8)
+        position = 0
+        while position < precision and fractions.any():
+            width = min(CHUNK_BITS, precision - position)
+            # scaling by a power of two and splitting off the integral part are exact
+            scaled = np.ldexp(fractions, width)
+            chunk = np.floor(scaled)
+            fractions = scaled - chunk
+            bits[:, position : position + width] = cls._chunk_bits(chunk, width)
+            position += width
+        return bits
+
     @classmethod
     def basis_encode_list_subcircuit(cls, list, n_integralbits, n_fractional_part):
         """
@@ -80,6 +161,30 @@ class BasisEncoding:
         :param n_fractional_part: Precision of the fractional part of the number
         :return: QisQit QuantumCircuit that basisencodes the inputlist at give precision
         """
+        if n_integralbits < 0 or n_fractional_part < 0:
+            return cls.basis_encode_list_subcircuit_from_strings(
+                list, n_integralbits, n_fractional_part
+            )
+        bits = cls.basis_encode_array(list, n_integralbits, n_fractional_part)
+
+        encoding_subcircuit = QuantumCircuit(bits.size, name="basisencode numberlist")
+        qubits = encoding_subcircuit.qubits
+        # one X gate instance shared by all targets, as broadcasting QuantumCircuit.x does;
+        # qubit i + j * (1 + n_integralbits + n_fractional_part) holds bit i of number j
+        x_gate = XGate()
+        for index in np.flatnonzero(bits).tolist():
+            encoding_subcircuit._append(x_gate, (qubits[index],), ())
+
+        return encoding_subcircuit
+
+    @classmethod
+    def basis_encode_list_subcircuit_from_strings(
+        cls, list, n_integralbits, n_fractional_part
+    ):
+        """
+        Generates the circuit for the basis encoding of a list of number via the encoding strings,
+        see basis_encode_list_subcircuit
+        """
         listAsString = cls.basis_encode_list(list, n_integralbits, n_fractional_part)
         numberArray = [
             cls.convert_bitstring_to_intarray(listAsString[i])
@@ -0,0 +1,505 @@
+import numpy as np
+from qiskit import QuantumRegister
+from qiskit.circuit.library import CCXGate, CXGate, RYGate, RZGate, XGate
+from qiskit.circuit.quantumcircuit import QuantumCircuit
+
+
+def walsh_hadamard_transform(values):
+    """
+    Unnormalized fast Walsh-Hadamard transform in natural (Hadamard) order
+    :param values: array whose length is a power of two
+    :return: array with entry i = sum over j of (-1)^popcount(i & j) * values[j]
+    """
+    values = np.array(values, dtype=float)
+    size = len(values)
+    half = 1
+    while half < size:
+        pairs = values.reshape(-1, 2, half)
+        values = np.stack(
+            (pairs[:, 0] + pairs[:, 1], pairs[:, 0] - pairs[:, 1]), axis=1
+        ).reshape(size)
+        half *= 2
+    return values
+
+
+def gray_code(size):
+    indices = np.arange(size)
+    return indices ^ (indices >> 1)
+
+
+def uniformly_controlled_rotation_angles(alphas):
+    """
+    Angles of the single-qubit rotations decomposing a uniformly controlled rotation with Gray code
+    ordered CNOTs, see Möttönen et al., Quantum Inf. Comput. 5, 467 (2005)
+    :param alphas: rotation angle per value of the control register
+    :return: rotation angle before each CNOT
+    """
+    size = len(alphas)
+    return walsh_hadamard_transform(alphas)[gray_code(size)] / size
+
+
+def rotation_angles(vector):
+    """
+    Computes the rotation angles of the state preparation of a normalized vector of length 2^n level
+    by level from the cumulative norms of the amplitudes sharing their higher bits.
+    Real vectors get signed RY angles on the lowest qubit and no RZ rotations.
+    :param vector: normalized vector of length 2^n
+    :return: list of the RY angles per control value for the targets 0 to n-1,
+             list of the RZ angles in the same layout or None for real vectors, and the global phase
+    """
+    vector = np.asarray(vector)
+    complex_phases = np.iscomplexobj(vector) and np.any(vector.imag != 0)
+    if not complex_phases:
+        vector = vector.real
+    squares = np.abs(vector) ** 2
+    phases = np.angle(vector) if complex_phases else None
+
+    ry_angles, rz_angles = [], []
+    level = 0
+    while len(squares) > 1:
+        # signed amplitudes on the lowest qubit, norms of the subtrees above
+        magnitudes = vector if level == 0 and not complex_phases else np.sqrt(squares)
+        pairs = magnitudes.reshape(-1, 2)
+        ry_angles.append(2 * np.arctan2(pairs[:, 1], pairs[:, 0]))
+        squares = squares.reshape(-1, 2).sum(axis=1)
+
+        if complex_phases:
+            pairs = phases.reshape(-1, 2)
+            rz_angles.append(pairs[:, 1] - pairs[:, 0])
+            phases = pairs.mean(axis=1)
+        level += 1
+
+    global_phase = float(phases[0]) if complex_phases else 0.0
+    return ry_angles, (rz_angles if complex_phases else None), global_phase
+
+
+def rotation_coefficients(vector):
+    """
+    :param vector: normalized vector of length 2^n
+    :return: list of the angles of the RY rotations decomposing the uniformly controlled RY rotation
+             of each target 0 to n-1 in Gray code order, see uniformly_controlled_rotation_angles,
+             the same for RZ or None for real vectors, and the global phase
+    """
+    ry_angles, rz_angles, global_phase = rotation_angles(vector)
+    ry = [uniformly_controlled_rotation_angles(alphas) for alphas in ry_angles]
+    rz = None
+    if rz_angles is not None:
+        rz = [uniformly_controlled_rotation_angles(alphas) for alphas in rz_angles]
+    return ry, rz, global_phase
+
+
+def prune(coefficients, threshold):
+    """
+    :return: the coefficients with all angles of magnitude below threshold set to 0, see
+             approximate_state_preparation
+    """
+    if coefficients is None:
+        return None
+    return [
+        np.where(np.abs(angles) < threshold, 0.0, angles) for angles in coefficients
+    ]
+
+
+def prepared_state(ry, rz):
+    """
+    Computes the state prepared by the rotations given by their coefficients, see
+    rotation_coefficients, up to the global phase
+    :return: vector of length 2^n
+    """
+    state = np.ones(1, dtype=complex if rz is not None else float)
+    for target in reversed(range(len(ry))):
+        # the rotation angle per value of the controls, inverting uniformly_controlled_rotation_angles
+        thetas = _alphas(ry[target])
+        amplitudes = np.empty(2 * len(state), dtype=state.dtype)
+        amplitudes[0::2] = state * np.cos(thetas / 2)
+        amplitudes[1::2] = state * np.sin(thetas / 2)
+        if rz is not None:
+            phis = _alphas(rz[target])
+            amplitudes[0::2] *= np.exp(-0.5j * phis)
+            amplitudes[1::2] *= np.exp(0.5j * phis)
+        state = amplitudes
+    return state
+
+
+def _alphas(coefficients):
+    words = np.zeros(len(coefficients))
+    words[gray_code(len(coefficients))] = coefficients
+    return walsh_hadamard_transform(words)
+
+
+def _rotation_sequence(angles, mirrored):
+    """
+    :param angles: angles of the rotations in Gray code order, see uniformly_controlled_rotation_angles
+    :return: the Gray code words and angles of the nonzero rotations in the order they are emitted;
+             before the rotation with word w, the controls with a 1 bit in w have been added onto
+             the target by CNOTs
+    """
+    kept = np.flatnonzero(angles)
+    if mirrored:
+        kept = kept[::-1]
+    return gray_code(len(angles))[kept], angles[kept]
+
+
+def gate_count(ry, rz):
+    """
+    :return: number of gates of the circuit mottonen_state_preparation emits for the coefficients
+    """
+    gates = 0
+    for target in range(len(ry)):
+        words = [np.zeros(1, dtype=np.int64)]
+        for coefficients, mirrored in ((ry, False), (rz, True)):
+            if coefficients is not None:
+                words.append(_rotation_sequence(coefficients[target], mirrored)[0])
+                gates += len(words[-1])
+        words.append(np.zeros(1, dtype=np.int64))
+        # one CNOT per control bit changing between consecutive rotations
+        changes = np.bitwise_xor.reduce(
+            np.lib.stride_tricks.sliding_window_view(np.concatenate(words), 2), axis=1
+        )
+        gates += int(np.unpackbits(changes.astype("<u8").view(np.uint8)).sum())
+    return gates
+
+
+def sparse_rotation_angles(indices, values, n_qubits):
+    """
+    Computes the rotation angles of the state preparation of a normalized real vector given by its
+    nonzero entries, level by level over the prefixes of the indices that occur, like rotation_angles
+    without visiting the zero amplitudes.
+    :param indices: sorted unique indices of the nonzero entries
+    :param values: real values of the entries
+    :return: list of (prefixes, angles) pairs for the targets 0 to n-1, the RY angle of the target
+             per value of the higher qubits with a nonzero amplitude
+    """
+    prefixes = np.asarray(indices, dtype=np.int64)
+    # signed amplitudes on the lowest qubit, norms of the subtrees above
+    magnitudes = np.asarray(values, dtype=float)
+    levels = []
+    for _ in range(n_qubits):
+        parents, inverse = np.unique(prefixes >> 1, return_inverse=True)
+        ones = (prefixes & 1).astype(bool)
+        pairs = np.zeros((len(parents), 2))
+        pairs[inverse[~ones], 0] = magnitudes[~ones]
+        pairs[inverse[ones], 1] = magnitudes[ones]
+        levels.append((parents, 2 * np.arctan2(pairs[:, 1], pairs[:, 0])))
+        prefixes, magnitudes = parents, np.hypot(pairs[:, 0], pairs[:, 1])
+    return levels
+
+
+def distinguishing_bits(prefixes, n_bits):
+    """
+    :param prefixes: sorted unique integers of n_bits bits
+    :return: boolean array of shape (len(prefixes), n_bits), True for the bits needed to tell a
+             prefix apart from all others, i.e., where its branch of the binary trie of the prefixes
+             splits
+    """
+    needed = np.zeros((len(prefixes), n_bits), dtype=bool)
+    for bit in range(n_bits):
+        groups, inverse = np.unique(prefixes >> (bit + 1), return_inverse=True)
+        ones = np.bincount(inverse, weights=(prefixes >> bit) & 1)
+        sizes = np.bincount(inverse)
+        needed[:, bit] = ((ones > 0) & (ones < sizes))[inverse]
+    return needed
+
+
+class _GateSequence:
+    """
+    Gates of a circuit in order. A self-inverse gate directly following the same gate on the same
+    qubits cancels it.
+    """
+
+    def __init__(self):
+        self.gates = []
+        # index of the last gate on each qubit, None if it has been cancelled
+        self._last = {}
+        self._x = XGate()
+        self._cx = CXGate()
+        self._ccx = CCXGate()
+
+    def append(self, gate, qubits):
+        self._last.update(dict.fromkeys(qubits, len(self.gates)))
+        self.gates.append((gate, qubits))
+
+    def append_self_inverse(self, gate, qubits):
+        """
+        :param gate: shared gate instance, so repeated gates can be recognized by identity
+        """
+        index = self._last.get(qubits[0])
+        if (
+            index is not None
+            and self.gates[index][0] is gate
+            and self.gates[index][1] == qubits
+            and all(self._last.get(qubit) == index for qubit in qubits)
+        ):
+            self.gates[index] = None
+            self._last.update(dict.fromkeys(qubits))
+        else:
+            self.append(gate, qubits)
+
+    def rotation(self, gate, angle, target):
+        self.append(gate(angle), (target,))
+
+    def x(self, qubit):
+        self.append_self_inverse(self._x, (qubit,))
+
+    def cx(self, control, target):
+        self.append_self_inverse(self._cx, (control, target))
+
+    def ccx(self, control1, control2, target):
+        self.append_self_inverse(self._ccx, (control1, control2, target))
+
+    def mcx(self, controls, target, idle):
+        """
+        X on the target if all controls are 1, decomposed into Toffoli gates with idle qubits as dirty
+        ancillas, see Barenco et al., Phys. Rev. A 52, 3457 (1995), lemmas 7.2 and 7.3
+        :param idle: qubits besides the controls and the target, at least one for three or more
+                     controls; their state is restored
+        """
+        if len(controls) == 1:
+            self.cx(controls[0], target)
+        elif len(controls) == 2:
+            self.ccx(controls[0], controls[1], target)
+        elif len(idle) >= len(controls) - 2:
+            self._v_chain(controls, idle[: len(controls) - 2], target)
+        else:
+            # toggle one idle qubit with the first half of the controls, and the target with it and
+            # the second half, each half using the other one as ancillas
+            ancilla = idle[0]
+            half = (len(controls) + 1) // 2
+            first, second = controls[:half], controls[half:] + [ancilla]
+            for _ in range(2):
+                self._v_chain(first, second[: half - 2], ancilla)
+                self._v_chain(second, first[: len(second) - 2], target)
+
+    def _v_chain(self, controls, ancillas, target):
+        """
+        :param ancillas: len(controls) - 2 qubits in any state
+        """
+        if len(controls) <= 2:
+            self.mcx(controls, target, ())
+            return
+        top = (controls[-1], ancillas[-1], target)
+        base = (controls[0], controls[1], ancillas[0])
+        # ancilla i + 1 toggled by control i + 2 and ancilla i
+        chain = [
+            (controls[i + 2], ancillas[i], ancillas[i + 1])
+            for i in range(len(ancillas) - 1)
+        ]
+        for _ in range(2):
+            self.ccx(*top)
+            for qubits in reversed(chain):
+                self.ccx(*qubits)
+            self.ccx(*base)
+            for qubits in chain:
+                self.ccx(*qubits)
+
+    def controlled_ry(self, angle, controls, open_controls, target, idle, clean=()):
+        """
+        RY rotation applied if the controls are in the given state
+        :param open_controls: controls conditioned on 0, surrounded by X gates
+        :param idle: qubits besides the controls and the target, see mcx
+        :param clean: idle qubits in state |0>; with len(controls) - 1 of them the conjunction of the
+                      controls is computed into one of them and uncomputed again
+        """
+        for qubit in open_controls:
+            self.x(qubit)
+        if len(controls) > 2 and len(clean) >= len(controls) - 1:
+            ancillas = clean[: len(controls) - 1]
+            chain = [(controls[0], controls[1], ancillas[0])] + [
+                (controls[i + 1], ancillas[i - 1], ancillas[i])
+                for i in range(1, len(ancillas))
+            ]
+            for qubits in chain:
+                self.ccx(*qubits)
+            self._controlled_ry(angle, [ancillas[-1]], target, ())
+            for qubits in reversed(chain):
+                self.ccx(*qubits)
+        else:
+            self._controlled_ry(angle, controls, target, idle)
+        for qubit in open_controls:
+            self.x(qubit)
+
+    def _controlled_ry(self, angle, controls, target, idle):
+        if not controls:
+            self.rotation(RYGate, angle, target)
+        elif len(controls) <= 2 or idle:
+            self.rotation(RYGate, angle / 2, target)
+            self.mcx(controls, target, idle)
+            self.rotation(RYGate, -angle / 2, target)
+            self.mcx(controls, target, idle)
+        else:
+            # without idle qubits, rotate by angle / 2 controlled by the last control, by -angle / 2
+            # if it was 0 and the others are 1 by toggling it in between, and by angle / 2 controlled
+            # by the others, which leaves the last control idle
+            *others, last = controls
+            self._controlled_ry(angle / 2, [last], target, ())
+            self.mcx(others, last, [target])
+            self._controlled_ry(-angle / 2, [last], target, ())
+            self.mcx(others, last, [target])
+            self._controlled_ry(angle / 2, others, target, [last])
+
+    def sparse_controlled_rotations(self, prefixes, angles, controls, target, clean):
+        """
+        Applies RY(angles[i]) to the target for the controls in state prefixes[i], controlled only
+        by the distinguishing bits of the prefix, as the controls are in one of the given states.
+        :param controls: control qubits, lowest bit of the prefixes first
+        :param clean: the other qubits of the circuit, all in state |0>
+        """
+        if np.all(angles == angles[0]):
+            if angles[0] != 0:
+                self.rotation(RYGate, float(angles[0]), target)
+            return
+        needed = distinguishing_bits(prefixes, len(controls))
+        for prefix, angle, bits in zip(prefixes.tolist(), angles.tolist(), needed):
+            if angle == 0:
+                continue
+            self.controlled_ry(
+                angle,
+                [controls[bit] for bit in np.flatnonzero(bits).tolist()],
+                [
+                    controls[bit]
+                    for bit in np.flatnonzero(bits).tolist()
+                    if not (prefix >> bit) & 1
+                ],
+                target,
+                clean + [controls[bit] for bit in np.flatnonzero(~bits).tolist()],
+                clean,
+            )
+
+    def emit(self, circuit):
+        for gate in self.gates:
+            if gate is not None:
+                circuit._append(gate[0], gate[1], ())
+
+    def uniformly_controlled_rotation(
+        self, gate, angles, controls, target, parity, mirrored
+    ):
+        """
+        Rotations of the target with CNOTs from the controls in between, which decompose a uniformly
+        controlled rotation, see Möttönen et al., Quantum Inf. Comput. 5, 467 (2005). Rotations
+        with angle 0 are skipped together with the CNOTs whose effect they would have seen.
+        :param angles: rotation angles in Gray code order, see uniformly_controlled_rotation_angles
+        :param controls: control qubits, lowest bit of the control value first
+        :param parity: bit mask of the controls that have been added onto the target
+        :param mirrored: emit the rotations in reverse order, so that they start with the parity a
+                         preceding uniformly controlled rotation ends with
+        :return: the bit mask of the controls added onto the target after the last rotation
+        """
+        words, angles = _rotation_sequence(angles, mirrored)
+        for word, angle in zip(words.tolist(), angles.tolist()):
+            self.change_parity(controls, target, parity ^ word)
+            parity = word
+            self.rotation(gate, angle, target)
+        return parity
+
+    def change_parity(self, controls, target, change):
+        """
+        :param change: bit mask of the controls to add onto the target
+        """
+        while change:
+            bit = (change & -change).bit_length() - 1
+            self.cx(controls[bit], target)
+            change &= change - 1
+
+
+def mottonen_state_preparation(vector):
+    """
+    Prepares a normalized vector of length 2^n from |0...0> with uniformly controlled RY and RZ
+    rotations decomposed into single-qubit rotations and CNOTs, one qubit at a time starting with
+    the most significant one. The RZ rotations of a qubit mirror its RY rotations, so they start
+    with the CNOTs the RY rotations end with.
+    :param vector: normalized vector of length 2^n
+    :return: QuantumCircuit of n qubits
+    """
+    return _mottonen_circuit(*rotation_coefficients(vector))
+
+
+def approximate_state_preparation(vector, threshold=None, fidelity=None):
+    """
+    Prepares a normalized vector like mottonen_state_preparation, leaving out either all rotations
+    with angles below threshold, or as many of the smallest as possible while the prepared state
+    keeps the target fidelity. The fidelity is not strictly monotonic in the number of rotations
+    left out, the threshold is searched by bisection over the angles.
+    :param vector: normalized vector of length 2^n
+    :return: QuantumCircuit of n qubits, its metadata "approximation" holds the threshold, the
+             fidelity |<vector|prepared state>|^2, the number of gates of the circuit and of the
+             exact one, and their difference
+    """
+    vector = np.asarray(vector)
+    ry, rz, global_phase = rotation_coefficients(vector)
+
+    def state_fidelity(threshold):
+        state = prepared_state(prune(ry, threshold), prune(rz, threshold))
+        return float(np.abs(np.vdot(vector, state)) ** 2)
+
+    if threshold is None:
+        angles = np.abs(np.concatenate(ry + (rz or [])))
+        angles = np.unique(angles[angles > 0])
+        # leaving out the angles below candidates[i], none for 0 and all for the last one
+        candidates = np.concatenate(
+            ([0.0], angles, [np.nextafter(angles[-1] if len(angles) else 0, np.inf)])
+        )
+        low, high = 0, len(candidates) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if state_fidelity(candidates[middle]) >= fidelity:
+                low = middle
+            else:
+                high = middle - 1
+        threshold = float(candidates[low])
+
+    pruned_ry, pruned_rz = prune(ry, threshold), prune(rz, threshold)
+    circuit = _mottonen_circuit(pruned_ry, pruned_rz, global_phase)
+    gates, exact_gates = gate_count(pruned_ry, pruned_rz), gate_count(ry, rz)
+    circuit.metadata = {
+        "approximation": {
+            "threshold": threshold,
+            "fidelity": min(1.0, state_fidelity(threshold)),
+            "gates": gates,
+            "exact_gates": exact_gates,
+            "removed_gates": exact_gates - gates,
+        }
+    }
+    return circuit
+
+
+def _mottonen_circuit(ry, rz, global_phase):
+    q = QuantumRegister(len(ry))
+    circuit = QuantumCircuit(q, global_phase=global_phase)
+    sequence = _GateSequence()
+    for target in reversed(range(len(ry))):
+        controls = q[target + 1 :]
+        parity = sequence.uniformly_controlled_rotation(
+            RYGate, ry[target], controls, q[target], 0, mirrored=False
+        )
+        if rz is not None:
+            parity = sequence.uniformly_controlled_rotation(
+                RZGate, rz[target], controls, q[target], parity, mirrored=True
+            )
+        sequence.change_parity(controls, q[target], parity)
+    sequence.emit(circuit)
+    return circuit
+
+
+def sparse_state_preparation(indices, values, n_qubits):
+    """
+    Prepares a normalized real vector given by its nonzero entries from |0...0> with RY rotations,
+    CNOT and Toffoli gates, one qubit at a time starting with the most significant one.
+    Each rotation is controlled only by the qubits distinguishing its branch from the other nonzero
+    branches, so the classical cost and the number of gates grow with the number of nonzero entries
+    times n instead of 2^n. The qubits below the target are still |0> and serve as ancillas.
+    :param indices: sorted unique indices of the nonzero entries
+    :param values: real values of the entries with norm 1
+    :return: QuantumCircuit of n_qubits qubits
+    """
+    levels = sparse_rotation_angles(indices, values, n_qubits)
+
+    q = QuantumRegister(n_qubits)
+    circuit = QuantumCircuit(q)
+    sequence = _GateSequence()
+    for target in reversed(range(n_qubits)):
+        prefixes, angles = levels[target]
+        sequence.sparse_controlled_rotations(
+            prefixes, angles, q[target + 1 :], q[target], q[:target]
+        )
+    sequence.emit(circuit)
+    return circuit
@@ -0,0 +1,193 @@
+import copy
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime
+from functools import wraps
+from threading import Lock
+
+import numpy as np
+import qiskit
+from flask import current_app
+
+from app.model.circuit_response import CircuitResponse
+from app.services import metrics_service, persistent_cache
+from app.services.cache_service import LRUCache
+from app.services.visualization_service import deferred_visualizations
+
+# approximate size of a cached response apart from its circuit and visualization strings
+RESPONSE_OVERHEAD_BYTES = 1024
+
+
+class EndpointStats:
+    """Hit and miss counters of the generation cache per endpoint"""
+
+    def __init__(self):
+        self._counts = defaultdict(lambda: [0, 0])
+        self._lock = Lock()
+
+    def record(self, endpoint, hit):
+        with self._lock:
+            self._counts[endpoint][0 if hit else 1] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                endpoint: {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses),
+                }
+                for endpoint, (hits, misses) in self._counts.items()
+            }
+
+
+generation_cache = LRUCache()
+endpoint_stats = EndpointStats()
+enabled = True
+metrics_service.register(
+    "generation_cache",
+    lambda: dict(generation_cache.stats(), endpoints=endpoint_stats.stats()),
+)
+
+
+def init_app(app):
+    global enabled
+    enabled = app.config["GENERATION_CACHE_ENABLED"]
+    generation_cache.resize(
+        app.config["GENERATION_CACHE_MAX_ENTRIES"],
+        app.config["GENERATION_CACHE_MAX_BYTES"],
+    )
+
+
+def _canonical(value):
+    """
+    Converts request values to JSON values that are equal for equal requests,
+    e.g., 1 and 1.0 or 0.0 and -0.0, and sorts dict fields
+    """
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        return [str(data.dtype), data.shape, hashlib.sha256(data.tobytes()).hexdigest()]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return _canonical(vars(value)) if hasattr(value, "__dict__") else str(value)
+
+
+def request_key(endpoint, request):
+    """
+    :param endpoint: name of the generator
+    :param request: request object passed to the generator
+    :return: hash of the canonicalized request including the effective output options and
+             the versions the generated circuit depends on
+    """
+    fields = _canonical(vars(request))
+    fields["visualization"] = (
+        fields.get("visualization") or current_app.config["DEFAULT_VISUALIZATION"]
+    )
+    fields["visualization_format"] = fields.get("visualization_format") or "auto"
+    content = json.dumps(
+        [
+            endpoint,
+            fields,
+            current_app.config["API_VERSION"],
+            qiskit.__version__,
+        ],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _value_size(value):
+    """
+    :return: approximate number of bytes a request value keeps alive
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_value_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_value_size(item) for item in value)
+    if hasattr(value, "__dict__"):
+        return _value_size(vars(value))
+    return 8
+
+
+def _size(response):
+    # the echoed request holds the whole input, e.g., the vector of an amplitude encoding
+    return (
+        len(response.circuit or "")
+        + len(response.visualization or "")
+        + _value_size(response.request)
+        + RESPONSE_OVERHEAD_BYTES
+    )
+
+
+def _is_valid(response):
+    # deferred visualizations expire from their store, after which the handle is useless
+    return (
+        response.visualization_id is None
+        or deferred_visualizations.get(response.visualization_id) is not None
+    )
+
+
+def _render_failed(request, response):
+    # a failed or timed out inline render is retried by the next request instead of being cached
+    mode = (
+        getattr(request, "visualization", None)
+        or current_app.config["DEFAULT_VISUALIZATION"]
+    )
+    return mode == "inline" and response.visualization is None
+
+
+def cached(endpoint):
+    """
+    Memoizes a generate_* function. Successful CircuitResponses are cached with their exported circuit,
+    metrics and visualization; streams, error responses and responses whose inline render failed
+    are not cached.
+    Misses of the in-process cache fall back to the persistent cache if one is configured.
+    :param endpoint: name under which hits and misses are reported
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request):
+            if not enabled or getattr(request, "stream", None) is not None:
+                return func(request)
+            key = request_key(endpoint, request)
+            response = generation_cache.get(key)
+            if response is None:
+                response = persistent_cache.store.get("generation:" + key)
+                if response is not None:
+                    generation_cache.put(key, response, _size(response))
+            if response is not None:
+                if _is_valid(response):
+                    endpoint_stats.record(endpoint, hit=True)
+                    response = copy.copy(response)
+                    response.timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+                    return response
+                generation_cache.pop(key)
+            endpoint_stats.record(endpoint, hit=False)
+            response = func(request)
+            if isinstance(response, CircuitResponse) and not _render_failed(
+                request, response
+            ):
+                generation_cache.put(key, response, _size(response))
+                # deferred visualization handles are only known to the current process
+                if response.visualization_id is None:
+                    persistent_cache.store.put("generation:" + key, response)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -5,3 +5,35 @@ def bad_request(message):
     response = jsonify({"code": 400, "error": "bad request", "message": message})
     response.status_code = 400
     return response
+
+
+def not_found(message):
+    response = jsonify({"code": 404, "error": "not found", "message": message})
+    response.status_code = 404
+    return response
+
+
+def unprocessable_entity(message, details=None):
+    payload = {"code": 422, "error": "unprocessable entity", "message": message}
+    if details is not None:
+        payload["details"] = details
+    response = jsonify(payload)
+    response.status_code = 422
+    return response
+
+
+def payload_too_large(message, details=None):
+    payload = {"code": 413, "error": "payload too large", "message": message}
+    if details is not None:
+        payload["details"] = details
+    response = jsonify(payload)
+    response.status_code = 413
+    return response
+
+
+def service_unavailable(message):
+    response = jsonify(
+        {"code": 503, "error": "service unavailable", "message": message}
+    )
+    response.status_code = 503
+    return response
@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+from threading import local
+
+_current = local()
+
+
+class JobCancelled(Exception):
+    """Raised at the next progress report of a job that has been cancelled"""
+
+
+@contextmanager
+def running(job):
+    """
+    Makes job the receiver of report_progress calls in the current thread.
+    :param job: object with an update_progress(stage, completed, total) method
+    """
+    previous = getattr(_current, "job", None)
+    _current.job = job
+    try:
+        yield job
+    finally:
+        _current.job = previous
+
+
+def in_job():
+    """
+    :return: True if the current thread runs a job
+    """
+    return getattr(_current, "job", None) is not None
+
+
+def report_progress(stage, completed=None, total=None):
+    """
+    Reports the progress of a multi-stage build to the job running in the current thread.
+    Does nothing outside of jobs, so builders can call it unconditionally.
+    :param stage: name of the current stage
+    :param completed: number of completed steps of the stage
+    :param total: total number of steps of the stage
+    :raise JobCancelled: if the job has been cancelled
+    """
+    job = getattr(_current, "job", None)
+    if job is not None:
+        job.update_progress(stage, completed, total)
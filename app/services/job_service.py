@@ -0,0 +1,218 @@
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Event, Lock
+
+from app.services import bulk_service, metrics_service
+from app.services.bulk_service import ItemError
+from app.services.job_progress import JobCancelled, running
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+def _timestamp(seconds):
+    if seconds is None:
+        return None
+    return datetime.fromtimestamp(seconds).strftime("%Y-%m-%d_%H-%M-%S")
+
+
+class Job:
+    def __init__(self, request_type, generator, arguments):
+        self.job_id = uuid.uuid4().hex
+        self.request_type = request_type
+        self.generator = generator
+        self.arguments = arguments
+        self.status = QUEUED
+        self.stage = None
+        self.completed = None
+        self.total = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.error_status = None
+        self.cancel_requested = False
+        self.future = None
+        self._finished_event = Event()
+
+    def update_progress(self, stage, completed=None, total=None):
+        if self.cancel_requested:
+            raise JobCancelled()
+        self.stage = stage
+        self.completed = completed
+        self.total = total
+
+    def finish(self, status, result=None, error=None, error_status=None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.error_status = error_status
+        self.finished = time.time()
+        # the arguments are no longer needed and may be large
+        self.arguments = None
+        self._finished_event.set()
+
+    def wait(self, timeout):
+        """
+        :param timeout: seconds to wait at most
+        :return: True if the job has finished
+        """
+        return self._finished_event.wait(timeout)
+
+    def to_json(self):
+        return {
+            "job_id": self.job_id,
+            "type": self.request_type,
+            "status": self.status,
+            "progress": {
+                "stage": self.stage,
+                "completed": self.completed,
+                "total": self.total,
+            },
+            "created": _timestamp(self.created),
+            "started": _timestamp(self.started),
+            "finished": _timestamp(self.finished),
+            "result": self.result,
+            "error": self.error,
+            "error_status": self.error_status,
+        }
+
+
+class JobStore:
+    """
+    Runs generation jobs in a pool of worker threads and keeps their results for ttl seconds
+    after they finished. The store holds at most max_entries jobs; once it is full, the oldest
+    finished jobs are dropped and new jobs are rejected if all stored jobs are still pending.
+    """
+
+    def __init__(self, workers=2, max_entries=1024, ttl=3600):
+        self.workers = workers
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._jobs = OrderedDict()
+        self._lock = Lock()
+        self._executor = None
+        self.submitted = 0
+        self.rejected = 0
+        self.expired = 0
+        self.finished = {DONE: 0, FAILED: 0, CANCELLED: 0}
+
+    def configure(self, workers, max_entries, ttl):
+        with self._lock:
+            if workers != self.workers and self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self.workers = workers
+            self.max_entries = max_entries
+            self.ttl = ttl
+
+    def _expire(self, now):
+        for job_id, job in list(self._jobs.items()):
+            if job.finished is not None and job.finished + self.ttl <= now:
+                del self._jobs[job_id]
+                self.expired += 1
+
+    def _make_room(self):
+        if len(self._jobs) < self.max_entries:
+            return True
+        for job_id, job in self._jobs.items():
+            if job.finished is not None:
+                del self._jobs[job_id]
+                self.expired += 1
+                return True
+        return False
+
+    def submit(self, app, request_type, generator, arguments):
+        """
+        :param app: Flask application whose configuration the job uses
+        :param request_type: path of the endpoint, see bulk_service.GENERATORS
+        :param generator: Generator returned by bulk_service.load_arguments
+        :param arguments: request arguments returned by bulk_service.load_arguments
+        :return: the queued Job, None if the store is full of pending jobs
+        """
+        job = Job(request_type, generator, arguments)
+        with self._lock:
+            self._expire(time.time())
+            if not self._make_room():
+                self.rejected += 1
+                return None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="job"
+                )
+            self._jobs[job.job_id] = job
+            self.submitted += 1
+            job.future = self._executor.submit(self._run, app, job)
+        return job
+
+    def _run(self, app, job):
+        job.started = time.time()
+        job.status = RUNNING
+        try:
+            with app.app_context(), running(job):
+                job.update_progress("started")
+                result = bulk_service.generate(job.generator, job.arguments)
+            self._finish(job, DONE, result=result)
+        except JobCancelled:
+            self._finish(job, CANCELLED)
+        except ItemError as err:
+            self._finish(job, FAILED, error=err.message, error_status=err.status)
+
+    def _finish(self, job, status, **kwargs):
+        job.finish(status, **kwargs)
+        with self._lock:
+            self.finished[status] += 1
+
+    def get(self, job_id):
+        """
+        :return: Job or None if the job is unknown or has expired
+        """
+        with self._lock:
+            self._expire(time.time())
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancels a queued job immediately, a running job at the next progress report of its builder.
+        :return: Job or None if the job is unknown or has expired
+        """
+        job = self.get(job_id)
+        if job is None or job.finished is not None:
+            return job
+        job.cancel_requested = True
+        if job.future.cancel():
+            self._finish(job, CANCELLED)
+        return job
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            return {
+                "workers": self.workers,
+                "queued": statuses.count(QUEUED),
+                "running": statuses.count(RUNNING),
+                "stored": len(statuses),
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "finished": dict(self.finished),
+            }
+
+
+jobs = JobStore()
+metrics_service.register("jobs", jobs.stats)
+
+
+def init_app(app):
+    jobs.configure(
+        app.config["JOB_WORKERS"],
+        app.config["JOB_MAX_ENTRIES"],
+        app.config["JOB_RESULT_TTL"],
+    )
@@ -0,0 +1,20 @@
+_providers = {}
+
+
+def register(name, provider):
+    """
+    :param name: key under which the metrics are reported
+    :param provider: callable returning a dict of counters
+    """
+    _providers[name] = provider
+
+
+def collect(names=None):
+    """
+    :param names: names of the metrics to collect, None for all
+    """
+    return {
+        name: provider()
+        for name, provider in _providers.items()
+        if names is None or name in names
+    }
@@ -0,0 +1,198 @@
+import logging
+import os
+import pickle
+import sqlite3
+import time
+from threading import Lock, local
+
+from app.services import metrics_service
+
+logger = logging.getLogger(__name__)
+
+DATABASE_NAME = "circuit_cache.sqlite3"
+
+# the total size of the values is kept up to date by triggers, so writes do not have to sum it up;
+# values are written with upserts, as REPLACE does not fire delete triggers
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+    "size INTEGER NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)",
+    "CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires)",
+    "CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), "
+    "size INTEGER NOT NULL)",
+    # initializes the total of a database created before it was kept
+    "INSERT OR IGNORE INTO totals SELECT 0, COALESCE(SUM(size), 0) FROM entries",
+    "CREATE TRIGGER IF NOT EXISTS entries_inserted AFTER INSERT ON entries "
+    "BEGIN UPDATE totals SET size = size + NEW.size; END",
+    "CREATE TRIGGER IF NOT EXISTS entries_updated AFTER UPDATE OF size ON entries "
+    "BEGIN UPDATE totals SET size = size - OLD.size + NEW.size; END",
+    "CREATE TRIGGER IF NOT EXISTS entries_deleted AFTER DELETE ON entries "
+    "BEGIN UPDATE totals SET size = size - OLD.size; END",
+)
+
+
+class PersistentCache:
+    """
+    Key/value store in a SQLite database on local disk, shared by all worker processes of a host
+    and kept across restarts. Entries expire after ttl seconds; once the stored values exceed
+    max_bytes, the least recently used entries are deleted. Values are pickled, so the directory
+    must only be writable by the service. The cache is disabled until a directory is configured.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.ttl = 7 * 24 * 3600
+        self.max_bytes = 1024 * 1024 * 1024
+        self._local = local()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def configure(self, directory, ttl, max_bytes):
+        """
+        :param directory: directory of the database file, None disables the cache
+        :param ttl: seconds after which entries expire
+        :param max_bytes: maximum total size of the pickled values
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        if directory is None:
+            self.path = None
+            return
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, DATABASE_NAME)
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("BEGIN IMMEDIATE")
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _connection(self):
+        # sqlite3 connections must not be shared between threads or forked processes
+        connections = getattr(self._local, "connections", None)
+        if connections is None or self._local.pid != os.getpid():
+            connections = self._local.connections = {}
+            self._local.pid = os.getpid()
+        connection = connections.get(self.path)
+        if connection is None:
+            connection = connections[self.path] = sqlite3.connect(self.path, timeout=30)
+        return connection
+
+    def get(self, key):
+        """
+        :param key: cache key
+        :return: cached value or None on a miss or if the cache is disabled
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            connection = self._connection()
+            with connection:
+                row = connection.execute(
+                    "SELECT value FROM entries WHERE key = ? AND expires > ?",
+                    (key, now),
+                ).fetchone()
+                if row is not None:
+                    connection.execute(
+                        "UPDATE entries SET accessed = ? WHERE key = ?", (now, key)
+                    )
+            value = None if row is None else pickle.loads(row[0])
+        except Exception as err:
+            logger.warning("Reading from the persistent cache failed: %r", err)
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        :param key: cache key
+        :param value: picklable value
+        """
+        if not self.enabled:
+            return
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute(
+                    "INSERT INTO entries VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE "
+                    "SET value = excluded.value, size = excluded.size, "
+                    "expires = excluded.expires, accessed = excluded.accessed",
+                    (key, data, len(data), now + self.ttl, now),
+                )
+                self._evict(connection, now)
+        except sqlite3.Error as err:
+            logger.warning("Writing to the persistent cache failed: %r", err)
+
+    def _evict(self, connection, now):
+        evicted = connection.execute(
+            "DELETE FROM entries WHERE expires <= ?", (now,)
+        ).rowcount
+        (total,) = connection.execute("SELECT size FROM totals").fetchone()
+        if total > self.max_bytes:
+            keys = []
+            for key, size in connection.execute(
+                "SELECT key, size FROM entries ORDER BY accessed"
+            ):
+                keys.append((key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+            connection.executemany("DELETE FROM entries WHERE key = ?", keys)
+            evicted += len(keys)
+        with self._lock:
+            self.evictions += evicted
+
+    def clear(self):
+        if self.enabled:
+            with self._connection() as connection:
+                connection.execute("DELETE FROM entries")
+
+    def stats(self):
+        stats = {
+            "enabled": self.enabled,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+        if self.enabled:
+            try:
+                stats["entries"], stats["bytes"] = (
+                    self._connection()
+                    .execute("SELECT (SELECT COUNT(*) FROM entries), size FROM totals")
+                    .fetchone()
+                )
+            except sqlite3.Error as err:
+                logger.warning("Reading from the persistent cache failed: %r", err)
+        return stats
+
+
+store = PersistentCache()
+metrics_service.register("persistent_cache", store.stats)
+
+
+def init_app(app):
+    store.configure(
+        app.config["PERSISTENT_CACHE_DIR"],
+        app.config["PERSISTENT_CACHE_TTL"],
+        app.config["PERSISTENT_CACHE_MAX_BYTES"],
+    )
@@ -0,0 +1,178 @@
+import logging
+import multiprocessing
+import queue
+from threading import Lock
+
+try:
+    import resource
+except ImportError:  # not available on Windows, the RSS cap is not enforced there
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return 0
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _serve(connection, max_renders, max_rss_mb):
+    """
+    Main loop of a render worker process.
+    Renders circuits received over the connection until it is closed or the worker retires.
+    """
+    from app.helpermethods import visualizeQasm
+
+    renders = 0
+    while True:
+        try:
+            circuit, output, time_budget = connection.recv()
+        except EOFError:
+            return
+        try:
+            result = ("done", visualizeQasm(circuit, output, time_budget))
+        except Exception as err:
+            result = ("failed", repr(err))
+        renders += 1
+        retire = renders >= max_renders or (
+            max_rss_mb is not None and _peak_rss_mb() > max_rss_mb
+        )
+        connection.send(result + (retire,))
+        if retire:
+            return
+
+
+class _RenderWorker:
+    def __init__(self, context, max_renders, max_rss_mb):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_serve,
+            args=(child_connection, max_renders, max_rss_mb),
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+
+    def stop(self):
+        self.connection.close()
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(1)
+
+
+class RenderWorkerPool:
+    """
+    Bounded pool of render processes.
+    Each render has a timeout, a worker that overruns it is killed and replaced.
+    Workers are recycled after max_renders renders or once their peak RSS exceeds max_rss_mb.
+    """
+
+    def __init__(
+        self,
+        processes=2,
+        timeout=30,
+        max_renders=100,
+        max_rss_mb=1024,
+        start_method="spawn",
+    ):
+        self._lock = Lock()
+        self._idle = queue.Queue()
+        self._context = multiprocessing.get_context(start_method)
+        self.processes = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.recycled = 0
+        self.configure(processes, timeout, max_renders, max_rss_mb)
+
+    def configure(self, processes, timeout, max_renders, max_rss_mb):
+        with self._lock:
+            self.timeout = timeout
+            self.max_renders = max_renders
+            self.max_rss_mb = max_rss_mb
+            if processes == self.processes:
+                return
+            self._stop_idle()
+            self._idle = queue.Queue()
+            # empty slots, workers are started on first use
+            for _ in range(processes):
+                self._idle.put(None)
+            self.processes = processes
+
+    def render(self, circuit, output="auto", time_budget=3.0):
+        """
+        :param circuit: QuantumCircuit to render
+        :param output: visualization backend, see visualizeQasm
+        :param time_budget: render time budget in seconds used by the auto policy
+        :return: tuple (visualization, backend) or None if the render failed or timed out
+        """
+        idle = self._idle
+        try:
+            worker = idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self.timeouts += 1
+            logger.warning("No render worker available within %ss", self.timeout)
+            return None
+
+        try:
+            if worker is None:
+                worker = _RenderWorker(self._context, self.max_renders, self.max_rss_mb)
+            worker.connection.send((circuit, output, time_budget))
+            if not worker.connection.poll(self.timeout):
+                with self._lock:
+                    self.timeouts += 1
+                logger.warning("Render timed out after %ss", self.timeout)
+                worker.stop()
+                worker = None
+                return None
+            status, visualization, retire = worker.connection.recv()
+            if retire:
+                with self._lock:
+                    self.recycled += 1
+                worker.stop()
+                worker = None
+            if status != "done":
+                with self._lock:
+                    self.failures += 1
+                logger.warning("Render failed: %s", visualization)
+                return None
+            return visualization
+        except (EOFError, OSError) as err:
+            with self._lock:
+                self.failures += 1
+            logger.warning("Render worker died: %s", err)
+            if worker is not None:
+                worker.stop()
+            worker = None
+            return None
+        finally:
+            if idle is self._idle:
+                idle.put(worker)
+            elif worker is not None:
+                # the pool was resized in the meantime
+                worker.stop()
+
+    def shutdown(self):
+        with self._lock:
+            self._stop_idle()
+
+    def _stop_idle(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if worker is not None:
+                worker.stop()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "idle": self._idle.qsize(),
+                "timeouts": self.timeouts,
+                "failures": self.failures,
+                "recycled": self.recycled,
+            }
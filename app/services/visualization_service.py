@@ -0,0 +1,145 @@
+import logging
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from app.helpermethods import visualizeQasm
+from app.services import metrics_service, persistent_cache
+from app.services.cache_service import LRUCache, circuit_hash
+from app.services.render_pool import RenderWorkerPool
+
+logger = logging.getLogger(__name__)
+
+
+class DeferredVisualizationStore:
+    """
+    Renders circuit images in the background and keeps them available under a handle.
+    The store is bounded: once max_entries is reached, the oldest handles are dropped.
+    """
+
+    def __init__(self, max_entries=256, render_threads=1):
+        self.max_entries = max_entries
+        self.render_threads = render_threads
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._executor = None
+
+    def configure(self, max_entries, render_threads):
+        with self._lock:
+            self.max_entries = max_entries
+            if render_threads != self.render_threads and self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self.render_threads = render_threads
+
+    def submit(self, circuit, output="auto"):
+        """
+        :param circuit: QuantumCircuit to render
+        :param output: visualization backend, see visualizeQasm
+        :return: handle that can be resolved with get() once the image is rendered
+        """
+        visualization_id = uuid.uuid4().hex
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.render_threads,
+                    thread_name_prefix="deferred-visualization",
+                )
+            self._entries[visualization_id] = self._executor.submit(
+                render, circuit, output
+            )
+            while len(self._entries) > self.max_entries:
+                _, future = self._entries.popitem(last=False)
+                future.cancel()
+        return visualization_id
+
+    def get(self, visualization_id):
+        """
+        :param visualization_id: handle returned by submit()
+        :return: tuple (status, visualization, visualization_format) with status pending, done or failed;
+                 None if the handle is unknown or has been dropped
+        """
+        with self._lock:
+            future = self._entries.get(visualization_id)
+        if future is None:
+            return None
+        if not future.done():
+            return "pending", None, None
+        if (
+            future.cancelled()
+            or future.exception() is not None
+            or future.result()[0] is None
+        ):
+            return "failed", None, None
+        return ("done",) + future.result()
+
+
+deferred_visualizations = DeferredVisualizationStore()
+render_cache = LRUCache()
+render_pool = RenderWorkerPool(processes=0)
+render_time_budget = 3.0
+metrics_service.register("render_cache", render_cache.stats)
+metrics_service.register("render_pool", render_pool.stats)
+
+
+def init_app(app):
+    global render_time_budget
+    render_time_budget = app.config["VISUALIZATION_TIME_BUDGET"]
+    render_cache.resize(app.config["RENDER_CACHE_MAX_ENTRIES"])
+    render_pool.configure(
+        app.config["RENDER_PROCESSES"],
+        app.config["RENDER_TIMEOUT"],
+        app.config["RENDER_MAX_RENDERS_PER_WORKER"],
+        app.config["RENDER_MAX_RSS_MB"],
+    )
+    deferred_visualizations.configure(
+        app.config["DEFERRED_VISUALIZATION_MAX_ENTRIES"],
+        app.config["DEFERRED_VISUALIZATION_THREADS"],
+    )
+
+
+def render(circuit, output="auto"):
+    """
+    Renders a circuit, reusing the image of an identical circuit if it was rendered before
+    by this process or, if a persistent cache is configured, by another worker.
+    Renders run in the render worker pool if RENDER_PROCESSES > 0, otherwise in the calling thread.
+    :param circuit: QuantumCircuit to render
+    :param output: visualization backend, see visualizeQasm
+    :return: tuple (visualization, visualization_format), (None, None) if rendering failed or timed out
+    """
+    # the time budget decides the backend of auto renders and whether a circuit is too large
+    key = (circuit_hash(circuit), output, render_time_budget)
+    result = render_cache.get(key)
+    if result is None:
+        persistent_key = "render:" + ":".join(str(part) for part in key)
+        result = persistent_cache.store.get(persistent_key)
+        if result is not None:
+            render_cache.put(key, result)
+            return result
+        if render_pool.processes > 0:
+            result = render_pool.render(circuit, output, render_time_budget)
+        else:
+            try:
+                result = visualizeQasm(circuit, output, render_time_budget)
+            except Exception as err:
+                logger.warning("Render failed: %r", err)
+        if result is None:
+            return None, None
+        render_cache.put(key, result)
+        persistent_cache.store.put(persistent_key, result)
+    return result
+
+
+def visualize(circuit, mode, output="auto"):
+    """
+    :param circuit: QuantumCircuit to visualize
+    :param mode: none, inline or deferred
+    :param output: visualization backend, see visualizeQasm
+    :return: tuple (visualization, visualization_format, visualization_id), unused entries are None
+    """
+    if mode == "inline":
+        return render(circuit, output) + (None,)
+    if mode == "deferred":
+        return None, None, deferred_visualizations.submit(circuit, output)
+    return None, None, None
@@ -20,6 +20,110 @@ class Config:
         "license": {"name": "Apache v2 License"},
     }
 
+    # circuit builders run in a pool of worker processes to use all cores, 0 builds in the request thread
+    BUILDER_PROCESSES = int(os.getenv("BUILDER_PROCESSES", os.cpu_count() or 1))
+
+    # limits of a single generation request: circuits whose estimated number of qubits or gates
+    # exceeds the budget are rejected before building, builds running longer than max_seconds
+    # (max_job_seconds for asynchronous jobs) or allocating more than max_memory_mb are aborted;
+    # run time limits require BUILDER_PROCESSES > 0. Endpoint entries override the default.
+    GENERATION_BUDGETS = {
+        "default": {
+            "max_qubits": 1024,
+            "max_gates": 2_000_000,
+            "max_seconds": int(os.getenv("GENERATION_MAX_SECONDS", 120)),
+            "max_job_seconds": int(os.getenv("GENERATION_MAX_JOB_SECONDS", 3600)),
+            "max_memory_mb": int(os.getenv("GENERATION_MAX_MEMORY_MB", 4096)),
+        },
+        # dense vectors are bounded by max_gates, the indices of sparse ones are 64 bit integers
+        "amplitude_encoding": {"max_qubits": 62},
+        "schmidt_decomposition": {"max_qubits": 20},
+        "shor_discrete_log": {"max_qubits": 130},
+    }
+
+    # concurrent requests per generation and rendering endpoint; further requests wait in a
+    # queue of max_queued entries for at most max_wait seconds, and are rejected with 429 if the
+    # queue is full and 503 if they waited too long, both with a Retry-After header
+    ADMISSION_CONTROL_ENABLED = True
+    ADMISSION_LIMITS = {
+        "cheap": {"max_concurrent": 16, "max_queued": 64, "max_wait": 10},
+        "default": {
+            "max_concurrent": max(2, os.cpu_count() or 1),
+            "max_queued": 32,
+            "max_wait": 30,
+        },
+        "expensive": {
+            "max_concurrent": max(1, (os.cpu_count() or 1) // 2),
+            "max_queued": 8,
+            "max_wait": 30,
+        },
+    }
+    # class per URL rule, endpoints not listed belong to "default"
+    ADMISSION_ENDPOINTS = {
+        "/encoding/basis": "cheap",
+        "/encoding/angle": "cheap",
+        "/algorithms/qft": "cheap",
+        "/algorithms/shor/discreteLog": "expensive",
+        "/algorithms/qaoa/tsp": "expensive",
+        "/algorithms/qaoa/knapsack": "expensive",
+        "/algorithms/drawCircuit": "expensive",
+        "/visualization/<visualization_id>": "expensive",
+    }
+
+    # visualization mode used when a request does not specify one: none, inline or deferred
+    DEFAULT_VISUALIZATION = os.getenv("DEFAULT_VISUALIZATION", "inline")
+    # render time budget in seconds used to pick a backend for visualization_format "auto"
+    VISUALIZATION_TIME_BUDGET = 3.0
+    DEFERRED_VISUALIZATION_MAX_ENTRIES = 256
+    DEFERRED_VISUALIZATION_THREADS = 1
+    RENDER_CACHE_MAX_ENTRIES = 512
+    # rendering runs in a pool of worker processes, 0 renders in the request thread
+    RENDER_PROCESSES = int(os.getenv("RENDER_PROCESSES", 2))
+    RENDER_TIMEOUT = 30
+    RENDER_MAX_RENDERS_PER_WORKER = 100
+    RENDER_MAX_RSS_MB = 1024
+
+    # responses of generate_* functions cached in-process, keyed by the canonicalized request
+    GENERATION_CACHE_ENABLED = True
+    GENERATION_CACHE_MAX_ENTRIES = 1024
+    GENERATION_CACHE_MAX_BYTES = int(
+        os.getenv("GENERATION_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+    )
+
+    # parameterized QAOA circuits kept per problem structure, requests only bind the angles
+    QAOA_TEMPLATE_CACHE_MAX_ENTRIES = 64
+    # maximum number of angle sets of a single QAOA parameter sweep
+    QAOA_SWEEP_MAX_POINTS = int(os.getenv("QAOA_SWEEP_MAX_POINTS", 10000))
+
+    # bulk requests are generated by a pool of worker threads, reading at most
+    # BULK_MAX_PENDING items ahead of the finished ones
+    BULK_WORKERS = int(os.getenv("BULK_WORKERS", os.cpu_count() or 4))
+    BULK_MAX_PENDING = 256
+
+    # asynchronous jobs run in a pool of worker threads, their results are kept
+    # JOB_RESULT_TTL seconds; GET /jobs/<id>?wait= blocks at most JOB_MAX_WAIT seconds
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+    JOB_MAX_ENTRIES = 1024
+    JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 3600))
+    JOB_MAX_WAIT = 30
+
+    # optional cache on local disk shared by all workers of a host and kept across restarts,
+    # holding generated circuits and rendered images; disabled unless a directory is set
+    PERSISTENT_CACHE_DIR = os.getenv("PERSISTENT_CACHE_DIR")
+    PERSISTENT_CACHE_TTL = int(os.getenv("PERSISTENT_CACHE_TTL", 7 * 24 * 3600))
+    PERSISTENT_CACHE_MAX_BYTES = int(
+        os.getenv("PERSISTENT_CACHE_MAX_BYTES", 1024 * 1024 * 1024)
+    )
+
+    # number of instructions serialized at once for requests with stream qasm or ndjson
+    STREAM_CHUNK_SIZE = 1000
+
+    # compression of API responses, negotiated via Accept-Encoding (br requires the brotli package)
+    COMPRESSION_ENABLED = True
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY = 5
+
     @staticmethod
     def init_app(app):
         pass
@@ -32,6 +136,8 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     WTF_CSRF_ENABLED = False
+    RENDER_PROCESSES = 0
+    BUILDER_PROCESSES = 0
 
 
 class ProductionConfig(Config):
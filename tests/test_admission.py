@@ -0,0 +1,94 @@
+import unittest
+import os, sys
+import json
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+from app.admission import admission_control
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def post_basis_encoding(self):
+        return self.client.post(
+            "/encoding/basis",
+            data=json.dumps(
+                {
+                    "vector": [1.25],
+                    "integral_bits": 2,
+                    "fractional_bits": 2,
+                    "visualization": "none",
+                }
+            ),
+            content_type="application/json",
+        )
+
+    def test_saturated_endpoint(self):
+        for max_queued, status in ((0, 429), (1, 503)):
+            admission_control.configure(
+                {
+                    "cheap": {
+                        "max_concurrent": 1,
+                        "max_queued": max_queued,
+                        "max_wait": 0.1,
+                    }
+                },
+                {"/encoding/basis": "cheap"},
+            )
+            # a request in flight occupies the only slot
+            limiter = admission_control.limiter("/encoding/basis")
+            self.assertIsNone(limiter.acquire())
+
+            response = self.post_basis_encoding()
+            self.assertEqual(response.status_code, status)
+            self.assertEqual(response.get_json()["code"], status)
+            self.assertGreaterEqual(int(response.headers["Retry-After"]), 1)
+
+            limiter.release(0.5)
+            self.assertEqual(self.post_basis_encoding().status_code, 200)
+
+        stats = self.client.get("/monitoring/metrics").get_json()["admission"]
+        self.assertEqual(stats["/encoding/basis"]["class"], "cheap")
+        self.assertEqual(stats["/encoding/basis"]["rejected_wait_timeout"], 1)
+        self.assertEqual(stats["/encoding/basis"]["queue_depth"], 0)
+        self.assertEqual(stats["/encoding/basis"]["active"], 0)
+        # the monitoring endpoint is not limited
+        self.assertNotIn("/monitoring/metrics", stats)
+
+    def test_slot_held_while_streaming(self):
+        self.app.config["STREAM_CHUNK_SIZE"] = 1
+        limiter = admission_control.limiter("/algorithms/qft")
+        response = self.client.post(
+            "/algorithms/qft",
+            data=json.dumps(
+                {
+                    "n_qubits": 4,
+                    "inverse": False,
+                    "barriers": False,
+                    "visualization": "none",
+                    "stream": "qasm",
+                }
+            ),
+            content_type="application/json",
+            buffered=False,
+        )
+        self.assertTrue(response.is_streamed)
+        chunks = iter(response.response)
+        self.assertTrue(next(chunks))
+        # the stream is still being read
+        self.assertEqual(limiter.stats()["active"], 1)
+        response.close()
+        self.assertEqual(limiter.stats()["active"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -517,6 +517,107 @@ class FlaskClientTestCase(unittest.TestCase):
         self.assertTrue(match is not None)
         self.assertEqual(response.status_code, 200)
 
+    def test_circuit_metrics(self):
+        response = self.client.post(
+            "/algorithms/qft",
+            data=json.dumps(
+                {
+                    "n_qubits": 4,
+                    "inverse": False,
+                    "barriers": True,
+                    "visualization": "none",
+                }
+            ),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {"barrier": 5, "h": 4, "cp": 6, "swap": 2},
+            response.get_json().get("gate_counts"),
+        )
+        self.assertEqual(8, response.get_json().get("two_qubit_gates"))
+        self.assertEqual(12, response.get_json().get("size"))
+        self.assertEqual(4, response.get_json().get("width"))
+        self.assertEqual(11, response.get_json().get("depth"))
+        self.assertEqual(0, response.get_json().get("n_parameters"))
+
+    def test_qpy_format(self):
+        from app.services.algorithms.qft_algorithm import QFTAlgorithm
+        from app.services.circuit_serialization import (
+            compression_available,
+            dump_qpy,
+            load_circuit,
+        )
+
+        expected = QFTAlgorithm.create_circuit(4, False, True)
+        circuit_formats = ["qpy", "qpy+zlib"]
+        if compression_available("zstd"):
+            circuit_formats.append("qpy+zstd")
+        for circuit_format in circuit_formats:
+            response = self.client.post(
+                "/algorithms/qft",
+                data=json.dumps(
+                    {
+                        "n_qubits": 4,
+                        "inverse": False,
+                        "barriers": True,
+                        "circuit_format": circuit_format,
+                        "visualization": "none",
+                    }
+                ),
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual("qpy", response.get_json().get("circuit_language"))
+            circuit = load_circuit(response.get_json().get("circuit"))
+            self.assertEqual(expected, circuit)
+
+        # circuits can be passed as QPY as well
+        oracle = QuantumCircuit(3)
+        oracle.ccx(0, 1, 2)
+        responses = [
+            self.client.post(
+                "/algorithms/grover",
+                data=json.dumps(
+                    {
+                        "oracle": oracle_string,
+                        "iterations": 2,
+                        "reflection_qubits": [0, 1],
+                        "visualization": "none",
+                    }
+                ),
+                content_type="application/json",
+            )
+            for oracle_string in [oracle.qasm(), dump_qpy(oracle, "zlib")]
+        ]
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(
+            responses[0].get_json().get("circuit"),
+            responses[1].get_json().get("circuit"),
+        )
+
+    def test_qpy_decompression_limit(self):
+        import base64
+        import zlib
+        from unittest import mock
+        from app.services import circuit_serialization
+
+        payloads = [zlib.compress]
+        if circuit_serialization.compression_available("zstd"):
+            import zstandard
+
+            payloads.append(zstandard.ZstdCompressor().compress)
+        with mock.patch.object(circuit_serialization, "MAX_DECOMPRESSED_BYTES", 1024):
+            for compress in payloads:
+                bomb = base64.b64encode(compress(b"QISKIT" + bytes(4096))).decode()
+                response = self.client.post(
+                    "/algorithms/grover",
+                    data=json.dumps({"oracle": bomb, "visualization": "none"}),
+                    content_type="application/json",
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("decompress", response.get_json()["message"])
+
     def test_qpe_algorithm(self):
         # Test invalid qasm string
         # suppress message: Error near line ...
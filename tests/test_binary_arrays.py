@@ -0,0 +1,96 @@
+import unittest
+import os, sys
+import base64
+import io
+import json
+import re
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+import numpy as np
+
+
+def npy(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return {"data": base64.b64encode(buffer.getvalue()).decode(), "format": "npy"}
+
+
+def float64(array, shape=None):
+    data = np.asarray(array, dtype="<f8").tobytes()
+    return {"data": base64.b64encode(data).decode(), "shape": shape}
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def post_json(self, url, request):
+        return self.client.post(
+            url, data=json.dumps(request), content_type="application/json"
+        )
+
+    def circuit(self, response):
+        self.assertEqual(response.status_code, 200)
+        # register names are numbered per process
+        return re.sub(r"_\d+|\bq\d+\b", "q", response.get_json()["circuit"])
+
+    def test_binary_vectors(self):
+        vector = [3.14, 2.75, -2.25, 0.1, 1.5]
+        expected = self.post_json("/encoding/amplitude", {"vector": vector})
+        for binary in (float64(vector), npy(np.array(vector))):
+            response = self.post_json("/encoding/amplitude", {"vector": binary})
+            self.assertEqual(self.circuit(expected), self.circuit(response))
+        # binary arrays are echoed in binary
+        self.assertEqual(
+            {**float64(vector, [5]), "format": "float64"},
+            response.get_json()["request"]["vector"],
+        )
+
+        vector = [0.5, 0.5, 0.5, -0.5]
+        expected = self.post_json("/encoding/schmidt", {"vector": vector})
+        response = self.post_json("/encoding/schmidt", {"vector": npy(vector)})
+        self.assertEqual(self.circuit(expected), self.circuit(response))
+
+    def test_binary_matrices(self):
+        adj_matrix = [[0, 1, 1, 0], [1, 0, 1, 1], [1, 1, 0, 1], [0, 1, 1, 0]]
+        request = {"betas": [0.7], "gammas": [0.3], "visualization": "none"}
+        expected = self.post_json(
+            "/algorithms/qaoa/maxcut", dict(request, adj_matrix=adj_matrix)
+        )
+        for binary in (
+            float64(adj_matrix, [4, 4]),
+            npy(np.array(adj_matrix, dtype=np.int32)),
+            npy(np.asfortranarray(adj_matrix, dtype=float)),
+        ):
+            response = self.post_json(
+                "/algorithms/qaoa/maxcut", dict(request, adj_matrix=binary)
+            )
+            self.assertEqual(self.circuit(expected), self.circuit(response))
+
+    def test_invalid_binary_arrays(self):
+        for vector in (
+            {"data": "not base64!"},
+            {"data": base64.b64encode(b"1234567").decode()},
+            float64([1.0, np.nan]),
+            float64([1.0, 2.0], shape=[2, 1]),
+            {**npy(np.array([1.0, 2.0])), "shape": [3]},
+            npy(np.array(["a", "b"], dtype=object)),
+            {**float64([1.0, 2.0]), "format": "pickle"},
+        ):
+            response = self.post_json("/encoding/amplitude", {"vector": vector})
+            self.assertEqual(response.status_code, 422, vector)
+
+        # a matrix needs its shape
+        response = self.post_json(
+            "/algorithms/qaoa/maxcut",
+            {"adj_matrix": float64([0, 1, 1, 0]), "betas": [1], "gammas": [1]},
+        )
+        self.assertEqual(response.status_code, 422)
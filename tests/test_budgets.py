@@ -0,0 +1,90 @@
+import unittest
+import os, sys
+import json
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+from app.services import builder_pool
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+
+    def tearDown(self):
+        self.app_context.pop()
+        builder_pool.init_app(self.app)
+
+    def post_json(self, url, request):
+        return self.client.post(
+            url, data=json.dumps(request), content_type="application/json"
+        )
+
+    def test_estimate_exceeds_budget(self):
+        response = self.post_json(
+            "/algorithms/qft",
+            {
+                "n_qubits": 5000,
+                "inverse": False,
+                "barriers": False,
+                "visualization": "none",
+            },
+        )
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.get_json()["details"]["resource"], "qubits")
+        self.assertEqual(response.get_json()["details"]["estimate"], 5000)
+
+        stats = self.client.get("/monitoring/metrics").get_json()["budgets"]
+        self.assertGreaterEqual(stats["qft"]["rejected_qubits"], 1)
+
+    def test_qpe_estimate_exceeds_budget(self):
+        # the k-th evaluation qubit controls the unitary repeated 2^k times
+        response = self.post_json(
+            "/algorithms/qpe",
+            {
+                "n_eval_qubits": 40,
+                "unitary": 'OPENQASM 2.0; include "qelib1.inc"; qreg q[1]; p(pi/2) q[0];',
+                "visualization": "none",
+            },
+        )
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.get_json()["details"]["resource"], "gates")
+
+    def test_build_exceeds_time_budget(self):
+        self.app.config["GENERATION_BUDGETS"] = dict(
+            self.app.config["GENERATION_BUDGETS"],
+            shor_discrete_log={"max_seconds": 0.5},
+        )
+        builder_pool.pool.configure(1)
+        timeouts = builder_pool.pool.stats()["timeouts"]
+        response = self.post_json(
+            "/algorithms/shor/discreteLog",
+            {"b": 2, "g": 3, "p": 5, "visualization": "none"},
+        )
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.get_json()["details"]["resource"], "time")
+
+        stats = self.client.get("/monitoring/metrics").get_json()["builder_pool"]
+        self.assertEqual(stats["timeouts"], timeouts + 1)
+        self.assertEqual(stats["in_flight"], 0)
+
+    def test_build_exceeds_memory_budget(self):
+        self.app.config["GENERATION_BUDGETS"] = dict(
+            self.app.config["GENERATION_BUDGETS"],
+            shor_discrete_log={"max_memory_mb": 1},
+        )
+        builder_pool.pool.configure(1)
+        response = self.post_json(
+            "/algorithms/shor/discreteLog",
+            {"b": 2, "g": 3, "p": 5, "visualization": "none"},
+        )
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.get_json()["details"]["resource"], "memory")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import os, sys
+import json
+import re
+import time
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+from app.services import builder_pool, generation_cache
+from app.services.job_progress import report_progress, running
+from qiskit import QuantumCircuit
+
+
+def staged_circuit(stages):
+    for stage in range(stages):
+        report_progress("stage", stage, stages)
+        time.sleep(0.3)
+    return QuantumCircuit(1)
+
+
+class RecordingJob:
+    def __init__(self):
+        self.progress = []
+
+    def update_progress(self, stage, completed=None, total=None):
+        self.progress.append((stage, completed, total))
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+
+    def tearDown(self):
+        self.app_context.pop()
+        builder_pool.init_app(self.app)
+
+    def post_json(self, url, request):
+        return self.client.post(
+            url, data=json.dumps(request), content_type="application/json"
+        )
+
+    def test_builder_pool(self):
+        request = {
+            "vector": [0.5, 0.5, 0.5, 0.5, 0.25, 0.75, 0.1, 0.2],
+            "visualization": "none",
+        }
+        expected = self.post_json("/encoding/amplitude", request).get_json()
+
+        builder_pool.pool.configure(1)
+        tasks = builder_pool.pool.stats()["tasks"]
+        generation_cache.generation_cache.clear()
+        response = self.post_json("/encoding/amplitude", request)
+        self.assertEqual(response.status_code, 200)
+        # the circuit shipped back as QPY exports to the same OpenQASM, up to the
+        # per-process counters and object ids qiskit uses to name registers and custom gates
+        self.assertEqual(
+            re.sub(r"_\d+|\bq\d+\b", "", response.get_json()["circuit"]),
+            re.sub(r"_\d+|\bq\d+\b", "", expected["circuit"]),
+        )
+        for key in ("depth", "size", "gate_counts"):
+            self.assertEqual(response.get_json()[key], expected[key])
+
+        stats = self.client.get("/monitoring/metrics").get_json()["builder_pool"]
+        self.assertEqual(stats["processes"], 1)
+        # the export is computed in the build task
+        self.assertEqual(stats["tasks"], tasks + 1)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_progress_forwarding(self):
+        builder_pool.pool.configure(1)
+        job = RecordingJob()
+        with running(job):
+            circuit = builder_pool.build(staged_circuit, 3)
+        self.assertEqual(circuit.num_qubits, 1)
+        for stage in range(3):
+            self.assertIn(("stage", stage, 3), job.progress)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os, sys
+import json
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def test_bulk(self):
+        items = [
+            {
+                "id": "qft",
+                "type": "algorithms/qft",
+                "request": {
+                    "n_qubits": 3,
+                    "inverse": False,
+                    "barriers": False,
+                    "visualization": "none",
+                },
+            },
+            {
+                "id": "basis",
+                "type": "encoding/basis",
+                "request": {
+                    "vector": [1.25],
+                    "integral_bits": 3,
+                    "fractional_bits": 3,
+                    "visualization": "none",
+                },
+            },
+            {"id": "unknown", "type": "algorithms/unknown", "request": {}},
+            {"id": "invalid", "type": "algorithms/qft", "request": {"n_qubits": "x"}},
+            {
+                "id": "hhl",
+                "type": "algorithms/hhl",
+                "request": {"matrix": [[1, 2], [3, 4]], "vector": [0, 1]},
+            },
+        ]
+        body = "\n".join(json.dumps(item) for item in items) + "\n\n{broken\n"
+        response = self.client.post(
+            "/bulk", data=body, content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        results = [json.loads(line) for line in response.get_data(True).splitlines()]
+
+        # failing items do not abort the batch
+        self.assertEqual(len(results), 6)
+        by_line = {result["line"]: result for result in results}
+        self.assertEqual(by_line[1]["id"], "qft")
+        self.assertEqual(by_line[1]["status"], 200)
+        self.assertEqual(by_line[1]["response"]["n_qubits"], 3)
+        self.assertEqual(by_line[2]["status"], 200)
+        self.assertTrue(by_line[2]["response"]["circuit"].startswith("OPENQASM 2.0"))
+        self.assertEqual(by_line[3]["status"], 400)
+        self.assertEqual(by_line[4]["status"], 422)
+        self.assertIn("hermitian", by_line[5]["error"])
+        self.assertEqual(by_line[7]["status"], 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import os, sys
+import json
+import gzip
+import zlib
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def post_qft(self, n_qubits, accept_encoding):
+        return self.client.post(
+            "/algorithms/qft",
+            data=json.dumps(
+                {
+                    "n_qubits": n_qubits,
+                    "inverse": False,
+                    "barriers": False,
+                    "visualization": "none",
+                }
+            ),
+            content_type="application/json",
+            headers={"Accept-Encoding": accept_encoding},
+        )
+
+    def test_gzip_and_deflate(self):
+        uncompressed = self.post_qft(10, "identity")
+        self.assertEqual(uncompressed.status_code, 200)
+        self.assertIsNone(uncompressed.headers.get("Content-Encoding"))
+
+        response = self.post_qft(10, "gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual("gzip", response.headers.get("Content-Encoding"))
+        self.assertTrue("Accept-Encoding" in response.headers.get("Vary"))
+        self.assertTrue(len(response.data) < len(uncompressed.data))
+        self.assertEqual(
+            json.loads(uncompressed.data).get("circuit"),
+            json.loads(gzip.decompress(response.data)).get("circuit"),
+        )
+
+        response = self.post_qft(10, "deflate;q=1.0, gzip;q=0.5")
+        self.assertEqual("deflate", response.headers.get("Content-Encoding"))
+        self.assertEqual(
+            json.loads(uncompressed.data).get("circuit"),
+            json.loads(zlib.decompress(response.data)).get("circuit"),
+        )
+
+    def test_small_responses_uncompressed(self):
+        self.app.config["COMPRESSION_MIN_SIZE"] = 10**6
+        response = self.post_qft(2, "gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.headers.get("Content-Encoding"))
@@ -7,6 +7,10 @@ import re
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(parent_dir)
 from app import create_app
+from app.services.encodings.basis_encoding import BasisEncoding
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Statevector
 
 
 class FlaskClientTestCase(unittest.TestCase):
@@ -50,6 +54,23 @@ class FlaskClientTestCase(unittest.TestCase):
             in response.get_json().values()
         )
 
+    def test_vectorized_basis_encoding(self):
+        # saturated integral parts, negative numbers and fractions needing more than 52 bits
+        vector = [0, 3.14, -2.75, 9.5, -12.0625, 0.1, 2**-60, 1e20, -0.5, 7]
+        for integral_bits, fractional_bits in ((3, 3), (0, 4), (2, 70), (64, 0)):
+            expected = [
+                [int(bit) for bit in bits]
+                for bits in BasisEncoding.basis_encode_list(
+                    vector, integral_bits, fractional_bits
+                )
+            ]
+            self.assertEqual(
+                BasisEncoding.basis_encode_array(
+                    vector, integral_bits, fractional_bits
+                ).tolist(),
+                expected,
+            )
+
     def test_angle_encoding(self):
         # Test x axis
         response = self.client.post(
@@ -81,6 +102,121 @@ class FlaskClientTestCase(unittest.TestCase):
         self.assertTrue("rz(6.28)" in response.get_json().get("circuit"))
         self.assertEqual(response.status_code, 200)
 
+        # Test dense encoding with two features per qubit
+        response = self.client.post(
+            "/encoding/angle",
+            data=json.dumps({"vector": [3.14, 2.25, 1.5], "rotation_axis": "yz"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(2, response.get_json().get("n_qubits"))
+        circuit = response.get_json().get("circuit")
+        self.assertTrue(
+            re.search(
+                r"ry\(6.28\) (\w+)\[0\];\nry\(3.0\) \1\[1\];\nrz\(4.5\) \1\[0\];",
+                circuit,
+            )
+        )
+
+    def test_amplitude_encoding(self):
+        vector = [3.14, 2.75, -2.25, 0.1, 1.5]
+        response = self.client.post(
+            "/encoding/amplitude",
+            data=json.dumps({"vector": vector}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(3, response.get_json().get("n_qubits"))
+        # decomposed into rotations and CNOTs instead of an opaque initialize instruction
+        self.assertEqual({"ry", "cx"}, set(response.get_json().get("gate_counts")))
+        circuit = QuantumCircuit.from_qasm_str(response.get_json().get("circuit"))
+        expected = np.array(vector + [0, 0, 0]) / np.linalg.norm(vector)
+        self.assertTrue(np.allclose(Statevector(circuit).data, expected))
+
+        response = self.client.post(
+            "/encoding/amplitude",
+            data=json.dumps({"vector": [0, 0]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_approximate_amplitude_encoding(self):
+        vector = np.exp(-np.arange(64) / 4) + 0.01 * np.cos(np.arange(64))
+        expected = vector / np.linalg.norm(vector)
+        response = self.client.post(
+            "/encoding/amplitude",
+            data=json.dumps(
+                {"vector": vector.tolist(), "approximation": {"fidelity": 0.99}}
+            ),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        approximation = response.get_json().get("approximation")
+        self.assertGreaterEqual(approximation["fidelity"], 0.99)
+        self.assertLess(approximation["gates"], approximation["exact_gates"])
+        self.assertEqual(
+            approximation["exact_gates"] - approximation["gates"],
+            approximation["removed_gates"],
+        )
+        self.assertEqual(approximation["gates"], response.get_json().get("size"))
+        circuit = QuantumCircuit.from_qasm_str(response.get_json().get("circuit"))
+        fidelity = np.abs(np.vdot(expected, Statevector(circuit).data)) ** 2
+        self.assertAlmostEqual(approximation["fidelity"], fidelity)
+
+        response = self.client.post(
+            "/encoding/amplitude",
+            data=json.dumps(
+                {"vector": vector.tolist(), "approximation": {"threshold": 0.1}}
+            ),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(0.1, response.get_json()["approximation"]["threshold"])
+
+        response = self.client.post(
+            "/encoding/amplitude",
+            data=json.dumps(
+                {
+                    "vector": vector.tolist(),
+                    "approximation": {"threshold": 0.1, "fidelity": 0.9},
+                }
+            ),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_sparse_amplitude_encoding(self):
+        indices, values = [1, 6, 9, 13, 60], [0.5, -1.0, 2.0, 0.25, 1.5]
+        response = self.client.post(
+            "/encoding/amplitude",
+            data=json.dumps({"vector": values, "indices": indices, "size": 64}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(6, response.get_json().get("n_qubits"))
+        circuit = QuantumCircuit.from_qasm_str(response.get_json().get("circuit"))
+        expected = np.zeros(64)
+        expected[indices] = values
+        expected /= np.linalg.norm(expected)
+        self.assertTrue(np.allclose(Statevector(circuit).data, expected))
+
+        # the circuit grows with the number of values, not with the size of the vector
+        response = self.client.post(
+            "/encoding/amplitude",
+            data=json.dumps({"vector": [1, 1], "indices": [3, 2**40]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(41, response.get_json().get("n_qubits"))
+        self.assertLess(response.get_json().get("depth"), 500)
+
+        response = self.client.post(
+            "/encoding/amplitude",
+            data=json.dumps({"vector": [1, 1], "indices": [3, 3]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
     # TODO deprecated tests due to openqasm2 incompatibilities.
     # def test_amplitude_encoding(self):
     #     response = self.client.post(
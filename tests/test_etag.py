@@ -0,0 +1,88 @@
+import unittest
+from unittest import mock
+import os, sys
+import json
+import base64
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+from app.services import algorithm_service
+import numpy as np
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def post_qft(self, n_qubits, **headers):
+        return self.client.post(
+            "/algorithms/qft",
+            data=json.dumps(
+                {
+                    "n_qubits": n_qubits,
+                    "inverse": False,
+                    "barriers": False,
+                    "visualization": "none",
+                }
+            ),
+            content_type="application/json",
+            headers=headers,
+        )
+
+    def test_request_etag(self):
+        response = self.post_qft(3)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertEqual(self.post_qft(3).headers["ETag"], etag)
+        self.assertNotEqual(self.post_qft(4).headers["ETag"], etag)
+
+        # revalidation is answered without generating the circuit
+        with mock.patch.object(algorithm_service, "generate_qft_circuit") as generate:
+            revalidated = self.post_qft(3, **{"If-None-Match": etag})
+            self.assertEqual(revalidated.status_code, 304)
+            self.assertEqual(revalidated.headers["ETag"], etag)
+            self.assertEqual(revalidated.get_data(), b"")
+            generate.assert_not_called()
+
+        changed = self.post_qft(4, **{"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+
+    def test_request_etag_compressed(self):
+        self.app.config["COMPRESSION_MIN_SIZE"] = 0
+        response = self.post_qft(3, **{"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        etag = response.headers["ETag"]
+        self.assertTrue(etag.endswith('-gzip"'))
+
+        revalidated = self.post_qft(
+            3, **{"Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.headers["ETag"], etag)
+
+    def test_request_etag_large_binary_arrays(self):
+        etags = []
+        for middle in (1.0, 2.0):
+            vector = np.ones(4096)
+            vector[2048] = middle
+            data = base64.b64encode(vector.tobytes()).decode()
+            response = self.client.post(
+                "/encoding/amplitude",
+                data=json.dumps({"vector": {"data": data}, "visualization": "none"}),
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 200)
+            etags.append(response.headers["ETag"])
+        self.assertNotEqual(etags[0], etags[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
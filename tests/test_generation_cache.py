@@ -0,0 +1,112 @@
+import unittest
+import os, sys
+import json
+from unittest import mock
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+from app.services import visualization_service
+from app.services.cache_service import LRUCache
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def post_json(self, url, request):
+        return self.client.post(
+            url, data=json.dumps(request), content_type="application/json"
+        )
+
+    def endpoint_stats(self, endpoint):
+        metrics = self.client.get("/monitoring/metrics").get_json()
+        return metrics["generation_cache"]["endpoints"].get(
+            endpoint, {"hits": 0, "misses": 0}
+        )
+
+    def test_generation_cache(self):
+        request = {
+            "adj_matrix": [[0, 1, 1], [1, 0, 1], [1, 1, 0]],
+            "betas": [0.5],
+            "gammas": [1],
+            "visualization": "none",
+        }
+        before = self.endpoint_stats("qaoa_maxcut")
+        first = self.post_json("/algorithms/qaoa/maxcut", request)
+        # field order and 1 versus 1.0 do not matter
+        second = self.post_json(
+            "/algorithms/qaoa/maxcut",
+            dict(reversed(list(dict(request, gammas=[1.0]).items()))),
+        )
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.get_json()["circuit"], second.get_json()["circuit"])
+        self.assertEqual(first.get_json()["depth"], second.get_json()["depth"])
+        after = self.endpoint_stats("qaoa_maxcut")
+        self.assertEqual(after["misses"], before["misses"] + 1)
+        self.assertEqual(after["hits"], before["hits"] + 1)
+
+        # other output options are cached separately
+        third = self.post_json(
+            "/algorithms/qaoa/maxcut", dict(request, circuit_format="openqasm3")
+        )
+        self.assertTrue(third.get_json()["circuit"].startswith("OPENQASM 3"))
+        self.assertEqual(
+            self.endpoint_stats("qaoa_maxcut")["misses"], before["misses"] + 2
+        )
+
+    def test_failed_render_not_cached(self):
+        request = {
+            "n_qubits": 2,
+            "inverse": True,
+            "barriers": False,
+            "visualization": "inline",
+        }
+        before = self.endpoint_stats("qft")
+        with mock.patch.object(
+            visualization_service, "render", return_value=(None, None)
+        ):
+            failed = self.post_json("/algorithms/qft", request)
+        self.assertEqual(failed.status_code, 200)
+        self.assertIsNone(failed.get_json()["visualization"])
+        # the render is retried instead of serving the response without image from the cache
+        retried = self.post_json("/algorithms/qft", request)
+        self.assertIsNotNone(retried.get_json()["visualization"])
+        self.assertEqual(self.endpoint_stats("qft")["misses"], before["misses"] + 2)
+
+    def test_lru_cache_bytes(self):
+        cache = LRUCache(max_entries=10, max_bytes=100)
+        cache.put("a", "a", size=40)
+        cache.put("b", "b", size=40)
+        self.assertEqual(cache.get("a"), "a")
+        cache.put("c", "c", size=40)
+        # b is the least recently used entry
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["bytes"], 80)
+        cache.put("d", "d", size=200)
+        self.assertIsNone(cache.get("d"))
+        self.assertEqual(cache.stats()["evictions"], 4)
+
+    def test_size_includes_request(self):
+        from types import SimpleNamespace
+        import numpy as np
+        from app.services.generation_cache import _size
+
+        small = SimpleNamespace(circuit="qasm", visualization=None, request=[1.0])
+        large = SimpleNamespace(
+            circuit="qasm",
+            visualization=None,
+            request=SimpleNamespace(vector=np.zeros(1024)),
+        )
+        # the echoed input vector is kept alive by the cache entry
+        self.assertGreater(_size(large) - _size(small), 8000)
+
+
+if __name__ == "__main__":
+    unittest.main()
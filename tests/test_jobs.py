@@ -0,0 +1,83 @@
+import unittest
+import os, sys
+import json
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+from app.services import job_service
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+        # a single worker, so the second job stays queued behind the first one
+        job_service.jobs.configure(1, 1024, 3600)
+
+    def tearDown(self):
+        self.app_context.pop()
+        job_service.init_app(self.app)
+
+    def submit(self, request_type, request):
+        return self.client.post(
+            "/jobs",
+            data=json.dumps({"type": request_type, "request": request}),
+            content_type="application/json",
+        )
+
+    def test_job(self):
+        request = {
+            "n_qubits": 4,
+            "inverse": False,
+            "barriers": True,
+            "visualization": "none",
+        }
+        response = self.submit("algorithms/qft", request)
+        self.assertEqual(response.status_code, 202)
+        job = response.get_json()
+        self.assertIn(job["status"], ("queued", "running", "done"))
+        self.assertTrue(response.headers["Location"].endswith(job["job_id"]))
+
+        job = self.client.get(response.headers["Location"] + "?wait=20").get_json()
+        self.assertEqual(job["status"], "done")
+        expected = self.client.post(
+            "/algorithms/qft", data=json.dumps(request), content_type="application/json"
+        ).get_json()
+        self.assertEqual(job["result"]["circuit"], expected["circuit"])
+        self.assertEqual(job["result"]["request"]["n_qubits"], 4)
+
+        self.assertEqual(self.client.get("/jobs/unknown").status_code, 404)
+        self.assertEqual(
+            self.submit("algorithms/qft", {"n_qubits": "x"}).status_code, 422
+        )
+        self.assertEqual(self.submit("algorithms/unknown", {}).status_code, 400)
+
+    def test_cancel(self):
+        shor = self.submit(
+            "algorithms/shor/discreteLog",
+            {"b": 2, "g": 3, "p": 5, "visualization": "none"},
+        ).get_json()
+        qft = self.submit(
+            "algorithms/qft", {"n_qubits": 3, "inverse": False, "barriers": False}
+        ).get_json()
+
+        # the queued job is cancelled at once
+        self.assertEqual(
+            self.client.delete("/jobs/" + qft["job_id"]).get_json()["status"],
+            "cancelled",
+        )
+        # the running job stops at the next progress report of the mod_exp_brg loop
+        self.client.delete("/jobs/" + shor["job_id"])
+        shor = self.client.get("/jobs/" + shor["job_id"] + "?wait=20").get_json()
+        self.assertEqual(shor["status"], "cancelled")
+        self.assertIsNone(shor["result"])
+
+        metrics = self.client.get("/monitoring/metrics").get_json()["jobs"]
+        self.assertGreaterEqual(metrics["finished"]["cancelled"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import os, sys
+import json
+import tempfile
+import pickle
+import time
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+from app.services import generation_cache, persistent_cache
+from app.services.persistent_cache import PersistentCache
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.app = create_app("testing")
+        self.app.config["PERSISTENT_CACHE_DIR"] = self.directory.name
+        persistent_cache.init_app(self.app)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+
+    def tearDown(self):
+        self.app_context.pop()
+        self.app.config["PERSISTENT_CACHE_DIR"] = None
+        persistent_cache.init_app(self.app)
+        self.directory.cleanup()
+
+    def test_persistent_generation_cache(self):
+        request = {
+            "n_qubits": 5,
+            "inverse": True,
+            "barriers": False,
+            "visualization": "inline",
+            "visualization_format": "text",
+        }
+        first = self.client.post(
+            "/algorithms/qft", data=json.dumps(request), content_type="application/json"
+        )
+        self.assertEqual(first.status_code, 200)
+
+        # a fresh worker only has the persistent cache
+        generation_cache.generation_cache.clear()
+        hits = persistent_cache.store.hits
+        second = self.client.post(
+            "/algorithms/qft", data=json.dumps(request), content_type="application/json"
+        )
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(persistent_cache.store.hits, hits + 1)
+        for key in ("circuit", "depth", "gate_counts", "visualization"):
+            self.assertEqual(first.get_json()[key], second.get_json()[key])
+
+        metrics = self.client.get("/monitoring/metrics").get_json()
+        self.assertTrue(metrics["persistent_cache"]["enabled"])
+        # the generated circuit and its rendered image
+        self.assertEqual(metrics["persistent_cache"]["entries"], 2)
+
+    def test_ttl_and_size_cap(self):
+        cache = PersistentCache()
+        cache.configure(self.directory.name, ttl=3600, max_bytes=1000)
+        cache.clear()
+        cache.put("a", "a" * 400)
+        cache.put("b", "b" * 400)
+        self.assertEqual(cache.get("a"), "a" * 400)
+        cache.put("c", "c" * 400)
+        # b is the least recently used entry
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "c" * 400)
+        # the running total follows replaced and evicted entries
+        cache.put("c", "c" * 200)
+        total = sum(
+            len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            for value in ("a" * 400, "c" * 200)
+        )
+        self.assertEqual(cache.stats()["bytes"], total)
+
+        cache.configure(self.directory.name, ttl=0.05, max_bytes=1000)
+        cache.put("d", "d")
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("d"))
+        # expired entries are deleted on the next write
+        cache.put("e", "e")
+        self.assertEqual(cache.stats()["entries"], 3)
+        self.assertEqual(cache.stats()["evictions"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
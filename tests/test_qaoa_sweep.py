@@ -0,0 +1,116 @@
+import unittest
+import os, sys
+import json
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def post_json(self, url, request):
+        return self.client.post(
+            url, data=json.dumps(request), content_type="application/json"
+        )
+
+    def test_maxcut_sweep(self):
+        adj_matrix = [[0, 1, 1, 0], [1, 0, 1, 1], [1, 1, 0, 1], [0, 1, 1, 0]]
+        gammas = [[0.3, 0.4], [0.7, 0.8], [1.1, 1.2]]
+        betas = [[0.1, 0.2], [0.5, 0.6], [0.9, 1.0]]
+        response = self.post_json(
+            "/algorithms/qaoa/maxcut/sweep",
+            {"adj_matrix": adj_matrix, "gammas": gammas, "betas": betas},
+        )
+        self.assertEqual(response.status_code, 200)
+        circuits = response.get_json()["circuits"]
+        self.assertEqual(len(circuits), 3)
+        # every circuit equals the one of a single request with the same angles
+        for circuit, point_gammas, point_betas in zip(circuits, gammas, betas):
+            single = self.post_json(
+                "/algorithms/qaoa/maxcut",
+                {
+                    "adj_matrix": adj_matrix,
+                    "gammas": point_gammas,
+                    "betas": point_betas,
+                    "p": 2,
+                    "visualization": "none",
+                },
+            )
+            self.assertEqual(circuit, single.get_json()["circuit"])
+
+        compact = self.post_json(
+            "/algorithms/qaoa/maxcut/sweep",
+            {
+                "adj_matrix": adj_matrix,
+                "gammas": gammas,
+                "betas": betas,
+                "output": "compact",
+            },
+        ).get_json()
+        self.assertTrue(compact["template"].startswith("OPENQASM 3"))
+        self.assertIsNone(compact["circuits"])
+        self.assertEqual(response.get_json()["n_parameters"], 0)
+        self.assertEqual(compact["n_parameters"], 4)
+        self.assertEqual(
+            sorted(compact["parameters"]), ["beta0", "beta1", "gamma0", "gamma1"]
+        )
+        for row, point_gammas, point_betas in zip(compact["values"], gammas, betas):
+            values = dict(zip(compact["parameters"], row))
+            self.assertEqual(values["gamma1"], point_gammas[1])
+            self.assertEqual(values["beta0"], point_betas[0])
+
+    def test_pauli_operator_sweep(self):
+        request = {
+            "pauli_op_string": "0.5 * ((I^Z^Z) + (Z^I^Z) + (Z^Z^I))",
+            "gammas": [[1.1, 1.3], [0.2, 0.4]],
+            "betas": [[0.5, 0.8], [1.3, 1.6]],
+        }
+        response = self.post_json("/algorithms/qaoa/pauliOperator/sweep", request)
+        self.assertEqual(response.status_code, 200)
+        for circuit, gammas, betas in zip(
+            response.get_json()["circuits"], request["gammas"], request["betas"]
+        ):
+            single = self.post_json(
+                "/algorithms/qaoa/pauliOperator",
+                {
+                    "pauli_op_string": request["pauli_op_string"],
+                    "reps": 2,
+                    "gammas": gammas,
+                    "betas": betas,
+                    "visualization": "none",
+                },
+            )
+            self.assertEqual(circuit, single.get_json()["circuit"])
+
+        # all angle sets need the same number of angles
+        response = self.post_json(
+            "/algorithms/qaoa/pauliOperator/sweep",
+            dict(request, betas=[[0.4, 0.7], [1.4]]),
+        )
+        self.assertEqual(response.status_code, 422)
+
+    def test_empty_angle_sets(self):
+        adj_matrix = [[0, 1], [1, 0]]
+        for gammas, betas in (
+            ([], []),
+            ([[]], [[]]),
+            ([[0.3], [0.4, 0.5]], [[0.1], [0.2]]),
+        ):
+            response = self.post_json(
+                "/algorithms/qaoa/maxcut/sweep",
+                {"adj_matrix": adj_matrix, "gammas": gammas, "betas": betas},
+            )
+            self.assertEqual(response.status_code, 422, gammas)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import os, sys
+import json
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+from app.services import builder_pool
+from app.services.algorithms.pauliParser import PauliParser
+from app.services.algorithms.qaoa_maxcut_algorithm import MaxCutQAOAAlgorithm
+from app.services.algorithms.qaoa_pauliOperator_algorithm import QAOAAlgorithm
+from qiskit.algorithms import QAOA
+from qiskit import QuantumCircuit
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+
+    def tearDown(self):
+        self.app_context.pop()
+        builder_pool.init_app(self.app)
+
+    def template_hits(self):
+        metrics = self.client.get("/monitoring/metrics").get_json()
+        return metrics["qaoa_templates"]["hits"]
+
+    def test_maxcut_template(self):
+        self.check_maxcut_template(
+            [[0, 1, 0, 1], [1, 0, 1, 1], [0, 1, 0, 1], [1, 1, 1, 0]]
+        )
+
+    def test_maxcut_template_in_builder_pool(self):
+        # the templates are kept by the worker process, which reports its hits
+        builder_pool.pool.configure(1)
+        self.check_maxcut_template(
+            [[0, 1, 1, 1], [1, 0, 1, 0], [1, 1, 0, 1], [1, 0, 1, 0]]
+        )
+
+    def check_maxcut_template(self, adj_matrix):
+        hits = self.template_hits()
+        for betas, gammas in (([0.1, 0.2], [0.3, 0.4]), ([0.5, 0.6], [0.7, 0.8])):
+            response = self.client.post(
+                "/algorithms/qaoa/maxcut",
+                data=json.dumps(
+                    {
+                        "adj_matrix": adj_matrix,
+                        "betas": betas,
+                        "gammas": gammas,
+                        "p": 2,
+                        "visualization": "none",
+                    }
+                ),
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 200)
+
+            # the template gives the same circuit as building it from scratch with QAOA
+            reference = QAOA(reps=2).construct_circuit(
+                betas + gammas, MaxCutQAOAAlgorithm.create_operator(adj_matrix)
+            )[0]
+            reference = QAOAAlgorithm.decompose_operator_gates(reference)
+            reference.measure_all()
+            self.assertEqual(response.get_json()["circuit"], reference.qasm())
+        # the second request only bound the angles of the first template
+        self.assertEqual(self.template_hits(), hits + 1)
+
+    def test_pauli_operator_template(self):
+        pauli_op_string = "0.5 * ((I^Z^Z) + (Z^I^Z) + (Z^Z^I)) + 0.3 * (X^Y^Z)"
+        mixer = "(X^X^I) + (I^Y^Y)"
+        hits = self.template_hits()
+        for gammas, betas in (([1.0, 1.2], [0.4, 0.7]), ([0.2, 0.3], [1.4, 1.7])):
+            circuit = QAOAAlgorithm.create_circuit(
+                None,
+                PauliParser.parse(pauli_op_string),
+                PauliParser.parse(mixer),
+                2,
+                gammas,
+                betas,
+            )
+            reference = QAOA(mixer=PauliParser.parse(mixer), reps=2).construct_circuit(
+                betas + gammas, PauliParser.parse(pauli_op_string)
+            )[0]
+            reference = QAOAAlgorithm.decompose_operator_gates(reference)
+            self.assertEqual(circuit.qasm(), reference.qasm())
+        self.assertEqual(self.template_hits(), hits + 1)
+
+    def test_custom_gate_definitions_in_key(self):
+        pauli_op = PauliParser.parse("(Z^Z)")
+        circuits = []
+        for body in ("h a;", "x a;"):
+            initial_state = QuantumCircuit.from_qasm_str(
+                'OPENQASM 2.0;\ninclude "qelib1.inc";\n'
+                "gate prep a { " + body + " }\nqreg q[2];\nprep q[0];\nprep q[1];\n"
+            )
+            circuit = QAOAAlgorithm.create_circuit(
+                initial_state, pauli_op, None, 1, [0.3], [0.7]
+            )
+            circuits.append(circuit.decompose("prep").qasm())
+        # same gate name, different bodies
+        self.assertNotEqual(circuits[0], circuits[1])
+        self.assertIn("x q[0];", circuits[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import os, sys
+import json
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+from qiskit import QuantumCircuit
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+        # export a few instructions per chunk so that the tests span several chunks
+        self.app.config["STREAM_CHUNK_SIZE"] = 5
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def post_maxcut(self, **options):
+        return self.client.post(
+            "/algorithms/qaoa/maxcut",
+            data=json.dumps(
+                dict(
+                    adj_matrix=[[0, 1, 1, 0], [1, 0, 1, 1], [1, 1, 0, 1], [0, 1, 1, 0]],
+                    betas=[0.7],
+                    gammas=[1.2],
+                    visualization="none",
+                    **options
+                )
+            ),
+            content_type="application/json",
+        )
+
+    def test_stream_qasm(self):
+        response = self.post_maxcut()
+        self.assertEqual(response.status_code, 200)
+        expected = response.get_json()["circuit"]
+
+        streamed = self.post_maxcut(stream="qasm")
+        self.assertEqual(streamed.status_code, 200)
+        self.assertTrue(streamed.is_streamed)
+        self.assertEqual(streamed.mimetype, "text/plain")
+        self.assertEqual(streamed.get_data(as_text=True), expected)
+
+    def test_stream_qasm_custom_gates(self):
+        response = self.client.post(
+            "/algorithms/qft",
+            data=json.dumps(
+                {
+                    "n_qubits": 3,
+                    "inverse": False,
+                    "barriers": False,
+                    "visualization": "none",
+                }
+            ),
+            content_type="application/json",
+        )
+        expected = QuantumCircuit.from_qasm_str(response.get_json()["circuit"])
+
+        circuit = QuantumCircuit(3)
+        circuit.h(0)
+        circuit.append(expected.to_gate(label="qft"), [0, 1, 2])
+        circuit.append(expected.inverse().to_gate(label="qft"), [0, 1, 2])
+        circuit.append(expected.to_gate(label="qft"), [2, 1, 0])
+        streamed = self.client.post(
+            "/algorithms/grover",
+            data=json.dumps({"oracle": circuit.qasm(), "stream": "qasm"}),
+            content_type="application/json",
+        )
+        self.assertEqual(streamed.status_code, 200)
+        reference = self.client.post(
+            "/algorithms/grover",
+            data=json.dumps({"oracle": circuit.qasm(), "visualization": "none"}),
+            content_type="application/json",
+        )
+        self.assertEqual(
+            QuantumCircuit.from_qasm_str(streamed.get_data(as_text=True))
+            .decompose(reps=5)
+            .count_ops(),
+            QuantumCircuit.from_qasm_str(reference.get_json()["circuit"])
+            .decompose(reps=5)
+            .count_ops(),
+        )
+
+    def test_stream_ndjson(self):
+        response = self.post_maxcut()
+        streamed = self.post_maxcut(stream="ndjson")
+        self.assertEqual(streamed.status_code, 200)
+        self.assertEqual(streamed.mimetype, "application/x-ndjson")
+        lines = [
+            json.loads(line) for line in streamed.get_data(as_text=True).splitlines()
+        ]
+        header, instructions = lines[0], lines[1:]
+        for key in ("n_qubits", "depth", "size", "gate_counts", "two_qubit_gates"):
+            self.assertEqual(header[key], response.get_json()[key])
+        self.assertEqual(len(instructions), sum(header["gate_counts"].values()))
+        self.assertEqual(
+            instructions[0], {"name": "h", "params": [], "qubits": [0], "clbits": []}
+        )
+        self.assertTrue(
+            all(
+                isinstance(i["params"][0], float)
+                for i in instructions
+                if i["name"] == "rx"
+            )
+        )
+
+    def test_stream_qasm_parameterized(self):
+        response = self.post_maxcut(stream="qasm", parameterized=True)
+        self.assertEqual(response.status_code, 400)
+        response = self.post_maxcut(stream="json")
+        self.assertEqual(response.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
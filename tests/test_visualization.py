@@ -0,0 +1,192 @@
+import unittest
+import os, sys
+import json
+import time
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+from app import create_app
+
+
+class FlaskClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client(use_cookies=True)
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def test_visualization_none(self):
+        response = self.client.post(
+            "/algorithms/qft",
+            data=json.dumps(
+                {
+                    "n_qubits": 3,
+                    "inverse": False,
+                    "barriers": False,
+                    "visualization": "none",
+                }
+            ),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.get_json().get("visualization"))
+        self.assertIsNone(response.get_json().get("visualization_id"))
+
+        # invalid visualization mode
+        response = self.client.post(
+            "/algorithms/qft",
+            data=json.dumps(
+                {
+                    "n_qubits": 3,
+                    "inverse": False,
+                    "barriers": False,
+                    "visualization": "sometimes",
+                }
+            ),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 422)
+
+    def test_visualization_deferred(self):
+        response = self.client.post(
+            "/encoding/angle",
+            data=json.dumps(
+                {
+                    "vector": [3.14, 2.25],
+                    "rotation_axis": "x",
+                    "visualization": "deferred",
+                }
+            ),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.get_json().get("visualization"))
+        visualization_id = response.get_json().get("visualization_id")
+        self.assertIsNotNone(visualization_id)
+
+        for _ in range(600):
+            response = self.client.get("/visualization/" + visualization_id)
+            if response.status_code != 202:
+                break
+            self.assertEqual("pending", response.get_json().get("status"))
+            time.sleep(0.1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual("done", response.get_json().get("status"))
+        self.assertTrue(len(response.get_json().get("visualization")) > 0)
+
+        # unknown handle
+        response = self.client.get("/visualization/unknown")
+        self.assertEqual(response.status_code, 404)
+
+    def test_render_cache(self):
+        draw_request = {
+            "circuit": 'OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[2];\nh q[0];\ncx q[0],q[1];\n',
+            "circuit_format": "openqasm2",
+        }
+        metrics = self.client.get("/monitoring/metrics").get_json()
+        hits = metrics.get("render_cache").get("hits")
+
+        first = self.client.post(
+            "/algorithms/drawCircuit",
+            data=json.dumps(draw_request),
+            content_type="application/json",
+        )
+        second = self.client.post(
+            "/algorithms/drawCircuit",
+            data=json.dumps(draw_request),
+            content_type="application/json",
+        )
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(
+            first.get_json().get("visualization"),
+            second.get_json().get("visualization"),
+        )
+
+        metrics = self.client.get("/monitoring/metrics").get_json()
+        self.assertEqual(hits + 1, metrics.get("render_cache").get("hits"))
+        self.assertTrue("evictions" in metrics.get("render_cache"))
+
+    def test_render_cache_per_time_budget(self):
+        from qiskit import QuantumCircuit
+        from app.services import visualization_service
+
+        circuit = QuantumCircuit(1, name="budget")
+        for _ in range(30):
+            circuit.h(0)
+        budget = visualization_service.render_time_budget
+        try:
+            # too large even for the text drawer within the budget
+            visualization_service.render_time_budget = 0.001
+            self.assertIn("too large", visualization_service.render(circuit)[0])
+            visualization_service.render_time_budget = 3.0
+            self.assertNotIn("too large", visualization_service.render(circuit)[0])
+        finally:
+            visualization_service.render_time_budget = budget
+
+    def test_render_pool(self):
+        from qiskit import QuantumCircuit
+        from app.services.render_pool import RenderWorkerPool
+
+        circuit = QuantumCircuit(2)
+        circuit.h(0)
+        circuit.cx(0, 1)
+
+        # workers are recycled after each render
+        pool = RenderWorkerPool(processes=1, timeout=120, max_renders=1)
+        try:
+            self.assertIsNotNone(pool.render(circuit))
+            self.assertIsNotNone(pool.render(circuit))
+            self.assertEqual(2, pool.stats().get("recycled"))
+
+            # a render that overruns its timeout is dropped without an image
+            pool.configure(1, 0.001, 1, 1024)
+            self.assertIsNone(pool.render(circuit))
+            self.assertEqual(1, pool.stats().get("timeouts"))
+            self.assertEqual(1, pool.stats().get("idle"))
+        finally:
+            pool.shutdown()
+
+    def test_visualization_formats(self):
+        qft_request = {"n_qubits": 3, "inverse": False, "barriers": False}
+
+        response = self.client.post(
+            "/algorithms/qft",
+            data=json.dumps(dict(qft_request, visualization_format="text")),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual("text", response.get_json().get("visualization_format"))
+        self.assertTrue("┤ H ├" in response.get_json().get("visualization"))
+
+        response = self.client.post(
+            "/algorithms/qft",
+            data=json.dumps(dict(qft_request, visualization_format="svg")),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual("svg", response.get_json().get("visualization_format"))
+        self.assertTrue("<svg" in response.get_json().get("visualization"))
+
+        # large circuits fall back to the text drawer
+        response = self.client.post(
+            "/algorithms/qft",
+            data=json.dumps(dict(n_qubits=30, inverse=False, barriers=False)),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual("text", response.get_json().get("visualization_format"))
+
+    def test_select_backend(self):
+        from qiskit import QuantumCircuit
+        from app.helpermethods import select_backend
+
+        circuit = QuantumCircuit(1)
+        for _ in range(20):
+            circuit.h(0)
+        self.assertEqual("latex", select_backend(circuit, time_budget=3.0))
+        self.assertEqual("svg", select_backend(circuit, time_budget=1.0))
+        self.assertEqual("text", select_backend(circuit, time_budget=0.1))
+        self.assertIsNone(select_backend(circuit, time_budget=0.01))